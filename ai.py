@@ -0,0 +1,67 @@
+import time
+
+import telemetry
+
+# --- GEMINI ACCESS (streaming + latency telemetry) ---
+DOCTOR_PREAMBLE = ("Respond as a professional medical doctor. Patient name: {name}. "
+                   "Provide a preliminary analysis based on the symptoms. "
+                   "Use professional medical terminology but keep it understandable. ")
+IMAGE_HINT = "Analyze the provided medical visual. "
+
+
+def build_prompt(name, txt, has_image=False, context=""):
+    """Single-turn prompt; `context` is a Conversation.context() block placed before the new message."""
+    prompt = DOCTOR_PREAMBLE.format(name=name)
+    if has_image: prompt += IMAGE_HINT
+    if context: prompt += f"\n\n{context}\n\nPatient's new message: "
+    return prompt + txt
+
+
+class StreamStats:
+    """Timing for one streamed request; ttft/total are seconds, None until known."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.ttft = None
+        self.total = None
+        self.chunks = 0
+        self.completed = False
+
+
+def cancel_stream(resp):
+    # Stop the underlying server stream when the consumer walks away mid-answer.
+    it = getattr(resp, "_iterator", None)
+    cancel = getattr(it, "cancel", None)
+    if callable(cancel):
+        try: cancel()
+        except Exception: pass
+
+
+def finish_stats(stats):
+    """Close out a stream's timing: total, plus ttft / latency telemetry or a cancellation count."""
+    stats.total = time.perf_counter() - stats.started
+    if stats.ttft is not None: telemetry.observe("ai.ttft", stats.ttft * 1000)
+    if stats.completed: telemetry.observe("ai.generate_content", stats.total * 1000)
+    else: telemetry.incr("ai.cancelled")
+
+
+def stream_reply(model, content, stats):
+    """Yield answer text chunks straight from generate_content(stream=True).
+
+    The app streams through scheduler.Scheduler.stream instead; this direct
+    path is the unscheduled baseline in benchmarks/bench_scheduler.py.
+    Closing the generator early cancels the stream and leaves
+    stats.completed False.
+    """
+    resp = model.generate_content(content, stream=True)
+    try:
+        for chunk in resp:
+            text = chunk.text
+            if not text: continue
+            if stats.ttft is None: stats.ttft = time.perf_counter() - stats.started
+            stats.chunks += 1
+            yield text
+        stats.completed = True
+    finally:
+        finish_stats(stats)
+        if not stats.completed: cancel_stream(resp)
@@ -0,0 +1,109 @@
+"""Consultation archival: space reclaimed and history read latency before/after retention.
+
+Seeds two years of consultations (LLM-sized answers), measures the file
+size and history reads, archives everything older than --days, runs the
+incremental vacuum, and measures again. "recent page" only touches live
+rows; "oldest page" lands in the archive afterwards and pays for
+decompression.
+
+    python benchmarks/bench_archive.py --rows 200000 --users 500 --days 180
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import db
+import retention
+import rollups
+
+WORDS = ("blood pressure sugar fever headache dose tablet daily morning evening rest water sleep symptoms doctor "
+         "consult recommended avoid increase decrease monitor weeks days pain mild severe chronic diet exercise "
+         "vitamin infection allergy cough throat stomach heart rate test results normal range follow up").split()
+OLDEST = '''SELECT id FROM (SELECT id FROM consultations WHERE username=:user
+                           UNION ALL SELECT id FROM consultations_archive WHERE username=:user)
+            ORDER BY id LIMIT 1 OFFSET :n'''
+
+
+def text(rng, words):
+    out = []
+    while len(out) < words:
+        s = [rng.choice(WORDS) for _ in range(rng.randint(8, 18))]
+        out += [s[0].capitalize()] + s[1:-1] + [s[-1] + "."]
+    return " ".join(out)
+
+
+def seed(n, users, rng):
+    start = datetime.datetime.now() - datetime.timedelta(days=730)
+    step = datetime.timedelta(days=730) / n
+    with db.get_pool().write() as c:
+        c.executemany(db.SQL_INSERT_CONSULT,
+                      ((f"user{rng.randrange(users)}", (start + step * i).strftime("%Y-%m-%d %H:%M"),
+                        text(rng, rng.randint(10, 30)), text(rng, rng.randint(150, 400))) for i in range(n)))
+
+
+def pct(xs, p):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(p * len(xs)))]
+
+
+def timed(fn, *args):
+    t = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - t) * 1000
+
+
+def measure(users, samples):
+    rng = random.Random(1)
+    recent, oldest, full = [], [], []
+    for _ in range(samples):
+        user = f"user{rng.randrange(users)}"
+        recent.append(timed(db.get_history_chat_page, user))
+        # Cursor just past the user's PAGE_SIZE oldest rows.
+        cursor = db.get_pool().read(OLDEST, {"user": user, "n": db.PAGE_SIZE})[0][0]
+        oldest.append(timed(db.get_history_chat_page, user, cursor))
+    for _ in range(max(1, samples // 10)):
+        full.append(timed(db.get_history_chat, f"user{rng.randrange(users)}"))
+    return recent, oldest, full
+
+
+def report(label, path, times):
+    size = sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+    cells = "".join(f" {pct(xs, 0.5):>8.2f} {pct(xs, 0.95):>8.2f}" for xs in times)
+    print(f"{label:<8} {size / 2 ** 20:>9.1f}{cells}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=200000)
+    ap.add_argument("--users", type=int, default=500)
+    ap.add_argument("--days", type=int, default=180)
+    ap.add_argument("--samples", type=int, default=300)
+    args = ap.parse_args()
+    db.WRITE_BEHIND = False
+    path = os.path.join(tempfile.mkdtemp(), "archive.db")
+    db.set_pool(db.ConnectionPool(path))
+    db.init_db()
+    rollups.init_rollups()
+    t = time.perf_counter()
+    seed(args.rows, args.users, random.Random(7))
+    db.get_pool().connection().execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+    print(f"seeded {args.rows} consultations over 2 years in {time.perf_counter() - t:.1f}s "
+          f"(codec {db.archive_codec()}, auto_vacuum {retention.report()['auto_vacuum']})")
+
+    print(f"{'':<8} {'file MB':>9} {'recent page p50/p95':>17} {'oldest page p50/p95':>17} {'full history p50/p95':>17}")
+    report("before", path, measure(args.users, args.samples))
+    s = retention.run(args.days, pause=0)
+    report("after", path, measure(args.users, args.samples))
+    print(f"\narchived {s['archived']} rows in {s['seconds']:.1f}s: text {s['raw_bytes'] / 2 ** 20:.1f} MB -> "
+          f"{s['stored_bytes'] / 2 ** 20:.1f} MB ({s['raw_bytes'] / max(1, s['stored_bytes']):.1f}x), "
+          f"reclaimed {s['bytes_reclaimed'] / 2 ** 20:.1f} MB "
+          f"({s['file_bytes_before'] / 2 ** 20:.1f} -> {s['file_bytes_after'] / 2 ** 20:.1f} MB on disk)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Concurrent read/write throughput: connect-per-call (legacy) vs the pooled WAL layer.
+
+    python benchmarks/bench_db.py --threads 8 --ops 500
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import db
+
+
+# The pre-pool query, before archived consultations were merged into history reads.
+LEGACY_HISTORY = 'SELECT date, question, answer FROM consultations WHERE username=? ORDER BY id DESC'
+
+def legacy_write(path, user, i):
+    conn = sqlite3.connect(path)
+    c = conn.cursor()
+    c.execute(db.SQL_INSERT_CONSULT, (user, "2024-01-01 00:00", f"q{i}", "a" * 400))
+    conn.commit()
+    conn.close()
+
+def legacy_read(path, user):
+    conn = sqlite3.connect(path)
+    c = conn.cursor()
+    c.execute(LEGACY_HISTORY + " LIMIT 20", (user,))
+    data = c.fetchall()
+    conn.close()
+    return data
+
+def pooled_write(path, user, i):
+    with db.get_pool().write() as c:
+        c.execute(db.SQL_INSERT_CONSULT, (user, "2024-01-01 00:00", f"q{i}", "a" * 400))
+
+def pooled_read(path, user):
+    return db.get_pool().read(db.SQL_HISTORY_CHAT + " LIMIT 20", {"user": user})
+
+
+def run(name, write, read, threads, ops, write_ratio):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    if name == "pooled":
+        db.set_pool(db.ConnectionPool(path))
+        db.init_db()
+    else:
+        conn = sqlite3.connect(path)
+        conn.execute('''CREATE TABLE consultations (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT,
+                        date TEXT, question TEXT, answer TEXT)''')
+        conn.commit()
+        conn.close()
+
+    errors = []
+    every = max(1, round(1 / write_ratio)) if write_ratio else 0
+
+    def worker(t):
+        user = f"user{t}"
+        for i in range(ops):
+            try:
+                if every and i % every == 0: write(path, user, i)
+                else: read(path, user)
+            except sqlite3.OperationalError as e: errors.append(str(e))
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    t0 = time.perf_counter()
+    for t in pool: t.start()
+    for t in pool: t.join()
+    elapsed = time.perf_counter() - t0
+    if name == "pooled": db.get_pool().close_all()
+    total = threads * ops
+    print(f"{name:<8} {total:>7} ops  {elapsed:7.2f}s  {total / elapsed:9.0f} ops/s  {len(errors)} lock errors")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--threads", type=int, default=8)
+    ap.add_argument("--ops", type=int, default=500)
+    ap.add_argument("--write-ratio", type=float, default=0.25)
+    args = ap.parse_args()
+    run("legacy", legacy_write, legacy_read, args.threads, args.ops, args.write_ratio)
+    run("pooled", pooled_write, pooled_read, args.threads, args.ops, args.write_ratio)
+
+
+if __name__ == "__main__":
+    main()
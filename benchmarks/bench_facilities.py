@@ -0,0 +1,69 @@
+"""Facility locator: grid index build time and k-nearest / radius latency vs a full numpy scan.
+
+    python benchmarks/bench_facilities.py --facilities 500000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import facilities
+
+# Rough bounding box of Indonesia; points cluster around a few hundred "towns".
+LAT, LON = (-11.0, 6.0), (95.0, 141.0)
+
+
+def pct(xs, p):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(p * len(xs)))]
+
+
+def report(name, lat):
+    print(f"{name:<22} p50 {pct(lat, 0.5) * 1000:.3f} ms  p95 {pct(lat, 0.95) * 1000:.3f} ms")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--facilities", type=int, default=500000)
+    ap.add_argument("--queries", type=int, default=1000)
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--radius", type=float, default=10.0)
+    args = ap.parse_args()
+    rng = np.random.default_rng(16)
+    n = args.facilities
+    towns = np.column_stack([rng.uniform(*LAT, 400), rng.uniform(*LON, 400)])
+    home = towns[rng.integers(0, len(towns), n)]
+    frame = pd.DataFrame({"name": [f"Facility {i}" for i in range(n)], "type": "Clinic",
+                          "lat": home[:, 0] + rng.normal(0, 0.3, n), "lon": home[:, 1] + rng.normal(0, 0.3, n),
+                          "address": ""})
+
+    t0 = time.perf_counter()
+    index = facilities.FacilityIndex(frame)
+    print(f"build: {n:,} facilities in {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    queries = np.column_stack([rng.uniform(*LAT, args.queries), rng.uniform(*LON, args.queries)])
+    near, within, scan, found = [], [], [], 0
+    for qlat, qlon in queries:
+        t0 = time.perf_counter()
+        idx, dist = index.nearest(qlat, qlon, args.k)
+        near.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        found += len(index.within(qlat, qlon, args.radius)[0])
+        within.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        full = facilities.haversine_km(qlat, qlon, index.lat, index.lon)
+        best = np.partition(full, args.k - 1)[:args.k]
+        scan.append(time.perf_counter() - t0)
+        assert np.allclose(np.sort(best), dist), (qlat, qlon)
+    report(f"nearest k={args.k}", near)
+    report(f"within {args.radius:g} km", within)
+    report("full scan k-nearest", scan)
+    print(f"avg {found / args.queries:.1f} facilities per radius query; all nearest results match the full scan")
+
+
+if __name__ == "__main__":
+    main()
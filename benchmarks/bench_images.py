@@ -0,0 +1,65 @@
+"""Upload preprocessing: payload size and time for typical phone-camera images.
+
+    python benchmarks/bench_images.py --max-side 1024 --format WEBP
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import PIL.Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import imaging
+
+# (label, width, height, format) roughly matching 12MP/48MP phone output and screenshots
+CASES = [
+    ("12MP JPEG", 4032, 3024, "JPEG"),
+    ("48MP JPEG", 8064, 6048, "JPEG"),
+    ("12MP PNG", 4032, 3024, "PNG"),
+    ("screenshot PNG", 1170, 2532, "PNG"),
+]
+
+
+def synth(w, h, fmt):
+    # Smooth gradient plus sensor-like noise, so codecs see photo-like content.
+    y, x = np.mgrid[0:h, 0:w]
+    base = np.stack([x * 255 // w, y * 255 // h, (x + y) * 255 // (w + h)], axis=-1)
+    noise = np.random.default_rng(0).integers(-12, 12, size=(h, w, 3))
+    img = PIL.Image.fromarray(np.clip(base + noise, 0, 255).astype("uint8"))
+    buf = io.BytesIO()
+    exif = PIL.Image.Exif()
+    exif[0x010F] = "PhoneMaker"  # Make
+    if fmt == "JPEG": img.save(buf, fmt, quality=92, exif=exif)
+    else: img.save(buf, fmt)
+    return buf.getvalue()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--max-side", type=int, default=imaging.MAX_SIDE)
+    ap.add_argument("--format", default=imaging.OUTPUT_FORMAT, choices=sorted(imaging.MIME))
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+    print(f"{'case':<16}{'raw KB':>10}{'out KB':>10}{'ratio':>8}{'ms':>9}{'cached ms':>11}  exif")
+    for label, w, h, fmt in CASES:
+        raw = synth(w, h, fmt)
+        times = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            out = imaging.preprocess(raw, max_side=args.max_side, fmt=args.format)
+            times.append((time.perf_counter() - t0) * 1000)
+        state = {}
+        imaging.session_preprocess(state, raw, max_side=args.max_side, fmt=args.format)
+        t0 = time.perf_counter()
+        imaging.session_preprocess(state, raw, max_side=args.max_side, fmt=args.format)
+        cached = (time.perf_counter() - t0) * 1000
+        has_exif = bool(PIL.Image.open(io.BytesIO(out.data)).getexif())
+        print(f"{label:<16}{len(raw) / 1024:>10.0f}{len(out.data) / 1024:>10.0f}"
+              f"{len(raw) / len(out.data):>7.1f}x{min(times):>9.1f}{cached:>11.2f}  {has_exif}")
+
+
+if __name__ == "__main__":
+    main()
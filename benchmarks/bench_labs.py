@@ -0,0 +1,101 @@
+"""Lab PDF pipeline: blob-store ingest throughput, dedup, and process-pool extraction.
+
+Writes synthetic lab reports as raw PDF (no PDF library needed to generate
+them), streams them through labs.store_blob and waits for extraction. Peak
+RSS of this process is reported to show it stays flat as files grow.
+
+    python benchmarks/bench_labs.py --pages 20 200 2000
+"""
+import argparse
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import db
+import labs
+
+PANEL = [("Hemoglobin", "g/dL", 12.0, 16.0), ("Hematocrit", "%", 36, 46), ("WBC", "10^3/uL", 4.0, 10.0),
+         ("Platelets", "10^3/uL", 150, 400), ("Glucose (fasting)", "mg/dL", 70, 99), ("Sodium", "mmol/L", 135, 145),
+         ("Potassium", "mmol/L", 3.5, 5.1), ("Creatinine", "mg/dL", 0.6, 1.2), ("ALT", "U/L", 7, 56),
+         ("LDL-C", "mg/dL", 70, 130)]
+
+
+def write_pdf(path, pages, seed=0, pad_kb=0):
+    """Minimal valid PDF, one lab panel per page, written object by object.
+
+    pad_kb adds an unreferenced binary stream per page, standing in for the
+    scanned images that make real reports large.
+    """
+    rng = random.Random(seed)
+    offsets = []
+    with open(path, "wb") as f:
+        def obj(num, body):
+            offsets.append((num, f.tell()))
+            f.write(f"{num} 0 obj\n".encode() + body + b"\nendobj\n")
+        f.write(b"%PDF-1.4\n")
+        kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(pages))
+        pad = os.urandom(pad_kb * 1024)
+        obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        obj(2, f"<< /Type /Pages /Count {pages} /Kids [{kids}] >>".encode())
+        obj(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        for i in range(pages):
+            lines = [f"Laboratory Report - Page {i + 1}"]
+            for test, unit, lo, hi in PANEL:
+                lines.append(f"{test} {rng.uniform(lo * 0.8, hi * 1.2):.1f} {unit} {lo} - {hi}")
+            text = "BT /F1 11 Tf 14 TL 50 780 Td " + " ".join(f"({l}) Tj T*" for l in lines) + " ET"
+            obj(4 + 2 * i, f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> "
+                           f"/Contents {5 + 2 * i} 0 R >>".encode())
+            obj(5 + 2 * i, f"<< /Length {len(text)} >>\nstream\n{text}\nendstream".encode())
+            if pad: obj(4 + 2 * pages + i, f"<< /Length {len(pad)} >>\nstream\n".encode() + pad + b"\nendstream")
+        xref = f.tell()
+        f.write(f"xref\n0 {len(offsets) + 1}\n0000000000 65535 f \n".encode())
+        for _, off in sorted(offsets): f.write(f"{off:010d} 00000 n \n".encode())
+        f.write(f"trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+
+
+def rss_peak_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, nargs="+", default=[20, 200, 2000])
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--pad-kb", type=int, default=64, help="filler bytes per page, to make files large")
+    args = ap.parse_args()
+    tmp = tempfile.mkdtemp()
+    db.WRITE_BEHIND = False
+    db.set_pool(db.ConnectionPool(os.path.join(tmp, "labs.db")))
+    db.init_db()
+    labs.init_labs()
+    pipeline = labs.Pipeline(args.workers, root=os.path.join(tmp, "blobs"))
+
+    for pages in args.pages:
+        src = os.path.join(tmp, f"report_{pages}.pdf")
+        write_pdf(src, pages, seed=pages, pad_kb=args.pad_kb)
+        size = os.path.getsize(src)
+        t0 = time.perf_counter()
+        with open(src, "rb") as f: sha, _, stored = labs.store_blob(f, root=pipeline.root)
+        store_s = time.perf_counter() - t0
+        with open(src, "rb") as f: _, _, again = labs.store_blob(f, root=pipeline.root)
+        labs.add_document("bench", sha, os.path.basename(src), size)
+        t0 = time.perf_counter()
+        pipeline.submit(sha)
+        while True:
+            status, n_pages, n_values, error = db.get_pool().read(
+                "SELECT status, pages, n_values, error FROM lab_jobs WHERE sha256=?", (sha,))[0]
+            if status not in labs.PENDING: break
+            time.sleep(0.05)
+        print(f"{pages:>5} pages {size / 2 ** 20:6.1f} MB  store {size / 2 ** 20 / store_s:6.0f} MB/s  "
+              f"duplicate stored again: {again}  extract {status} in {time.perf_counter() - t0:.1f}s "
+              f"({n_pages} pages, {n_values} values{', ' + error if error else ''})  peak RSS {rss_peak_mb():.0f} MB")
+    pipeline.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Reference store at scale: index build time and exact/prefix/fuzzy lookup latency.
+
+    python benchmarks/bench_reference.py --entries 50000
+"""
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import reference
+
+CATEGORIES = ["Cardiology", "Dermatology", "Endocrinology", "Gastroenterology", "Internal Medicine",
+              "Neurology", "Oncology", "Pediatrics", "Psychiatry", "Pulmonology"]
+
+
+def word(rng):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 11)))
+
+
+def pct(xs, p):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(p * len(xs)))]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--entries", type=int, default=50000)
+    ap.add_argument("--queries", type=int, default=300)
+    args = ap.parse_args()
+    rng = random.Random(3)
+    vocab = [word(rng) for _ in range(20000)]
+    src = os.path.join(tempfile.mkdtemp(), "corpus.jsonl")
+    with open(src, "w", encoding="utf-8") as f:
+        for _ in range(args.entries):
+            f.write(json.dumps({"category": rng.choice(CATEGORIES),
+                                "term": " ".join(rng.choices(vocab, k=2)).title(),
+                                "body": " ".join(rng.choices(vocab, k=40))}) + "\n")
+
+    t0 = time.perf_counter()
+    n = reference.build_index(src)
+    print(f"built index for {n} entries in {time.perf_counter() - t0:.1f}s "
+          f"({os.path.getsize(reference.index_path(src)) / 2 ** 20:.1f} MB on disk)")
+    store = reference.ReferenceStore(src)
+
+    def typo(w):
+        i = rng.randrange(len(w))
+        return w[:i] + rng.choice(string.ascii_lowercase) + w[i + 1:]
+
+    kinds = {"exact": lambda w: w, "prefix": lambda w: w[:4], "fuzzy": typo}
+    for kind, make in kinds.items():
+        lat = []
+        for _ in range(args.queries):
+            q = make(rng.choice(vocab))
+            store.expand.cache_clear()
+            t0 = time.perf_counter()
+            store.search(q)
+            lat.append((time.perf_counter() - t0) * 1000)
+        print(f"{kind:<7} p50 {pct(lat, 0.5):6.2f} ms   p95 {pct(lat, 0.95):6.2f} ms")
+    lat = []
+    for cat, _ in store.categories:
+        t0 = time.perf_counter()
+        store.browse(cat, ("m", 0))
+        lat.append((time.perf_counter() - t0) * 1000)
+    print(f"browse  p50 {pct(lat, 0.5):6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Reminder engine tick latency as active schedules grow, vs scanning every schedule per tick.
+
+Each run seeds N medication schedules spread over a week, of which a fixed
+number fall due every simulated second. Engine ticks should cost the same at
+10k and 1M schedules; the scan grows with N.
+
+    python benchmarks/bench_reminders.py --schedules 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import db
+import reminders
+
+WEEK = 7 * 86400
+
+
+def pct(xs, p):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(p * len(xs)))]
+
+
+def seed(n, t0, ticks, per_tick, rng):
+    hot = ticks * per_tick
+    rows = ((f"user{i % 50000}", f"Med {i}", "10mg", "08:00", "2024-01-01", None,
+             t0 + 1 + i // per_tick if i < hot else t0 + ticks + 60 + rng.randrange(WEEK)) for i in range(n))
+    with db.get_pool().write() as c:
+        c.executemany('''INSERT INTO medications(username, name, dose, times, start_date, end_date, next_due)
+                         VALUES (?,?,?,?,?,?,?)''', rows)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--schedules", type=int, nargs="+", default=[10000, 100000, 1000000])
+    ap.add_argument("--ticks", type=int, default=60)
+    ap.add_argument("--per-tick", type=int, default=20, help="doses falling due each simulated second")
+    args = ap.parse_args()
+    db.WRITE_BEHIND = False
+    print(f"{'schedules':>10} {'seed s':>7} {'recover ms':>11} {'tick p50':>9} {'tick p95':>9} {'fired':>6} {'scan p50':>9}")
+    for n in args.schedules:
+        db.set_pool(db.ConnectionPool(os.path.join(tempfile.mkdtemp(), "rem.db")))
+        db.init_db()
+        reminders.init_reminders()
+        t0 = int(time.time()) - 86400
+        s = time.perf_counter()
+        seed(n, t0, args.ticks, args.per_tick, random.Random(n))
+        seeded = time.perf_counter() - s
+
+        # grace=inf: the simulated clock is in the past, still remind for every dose.
+        engine = reminders.ReminderEngine(grace=float("inf"))
+        s = time.perf_counter()
+        engine.recover(t0)
+        recover_ms = (time.perf_counter() - s) * 1000
+        lat, fired = [], 0
+        for k in range(1, args.ticks + 1):
+            s = time.perf_counter()
+            fired += engine.tick(t0 + k)
+            lat.append((time.perf_counter() - s) * 1000)
+
+        scan = []
+        for k in range(5):
+            s = time.perf_counter()
+            now = t0 + k
+            due = [i for i, nd in db.get_pool().read('SELECT id, next_due FROM medications') if nd is not None and nd <= now]
+            scan.append((time.perf_counter() - s) * 1000)
+        print(f"{n:>10,} {seeded:>7.1f} {recover_ms:>11.1f} {pct(lat, 0.5):>7.2f}ms {pct(lat, 0.95):>7.2f}ms "
+              f"{fired:>6} {pct(scan, 0.5):>7.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
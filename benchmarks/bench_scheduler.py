@@ -0,0 +1,90 @@
+"""AI scheduler under a traffic spike: direct per-session calls vs the shared worker pool.
+
+The fake model enforces a concurrency quota (429 beyond --quota in flight).
+A share of prompts repeat across sessions so in-flight coalescing shows up.
+
+    python benchmarks/bench_scheduler.py --sessions 40 --quota 4
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import ai
+import scheduler
+import telemetry
+from fake_model import FakeGenerativeModel
+
+POPULAR = ["What are the symptoms of dengue fever?", "Is paracetamol safe with ibuprofen?",
+           "How much water should I drink a day?"]
+
+
+def pct(xs, p):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(p * len(xs)))] if xs else 0.0
+
+
+def spike(args, call):
+    """Every session fires its requests at once; returns (latencies of successes, error names)."""
+    lat, errors, lock = [], [], threading.Lock()
+    start = threading.Barrier(args.sessions)
+
+    def session(i):
+        rng = random.Random(i)
+        start.wait()
+        for r in range(args.requests):
+            prompt = rng.choice(POPULAR) if rng.random() < args.repeat else f"session {i} question {r}"
+            stats = ai.StreamStats()
+            try:
+                for _ in call(f"user{i}", [prompt], stats): pass
+                with lock: lat.append(stats.total)
+            except Exception as e:
+                with lock: errors.append(type(e).__name__)
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(args.sessions)]
+    t0 = time.perf_counter()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    return lat, errors, time.perf_counter() - t0
+
+
+def report(name, model, lat, errors, wall):
+    kinds = {e: errors.count(e) for e in sorted(set(errors))}
+    print(f"{name:<10} ok {len(lat):>4}  failed {len(errors):>4} {kinds or ''}")
+    print(f"{'':<10} latency p50 {pct(lat, 0.5):.2f}s  p95 {pct(lat, 0.95):.2f}s  wall {wall:.1f}s  "
+          f"upstream calls {model.calls} (429s {model.rejected}, peak concurrency {model.peak})")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessions", type=int, default=40)
+    ap.add_argument("--requests", type=int, default=2)
+    ap.add_argument("--quota", type=int, default=4, help="fake model max concurrent calls")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--repeat", type=float, default=0.3, help="share of prompts drawn from a popular set")
+    ap.add_argument("--ttft", type=float, default=0.1)
+    ap.add_argument("--latency", type=float, default=0.5)
+    args = ap.parse_args()
+
+    model = FakeGenerativeModel(args.ttft, args.latency, 600, max_concurrent=args.quota)
+    lat, errors, wall = spike(args, lambda user, content, stats: ai.stream_reply(model, content, stats))
+    report("direct", model, lat, errors, wall)
+
+    model = FakeGenerativeModel(args.ttft, args.latency, 600, max_concurrent=args.quota)
+    sched = scheduler.Scheduler(model, workers=args.workers, maxsize=args.sessions * args.requests,
+                                deadline=120, backoff_base=0.2)
+    lat, errors, wall = spike(args, sched.stream)
+    report("scheduler", model, lat, errors, wall)
+    snap, wait = sched.snapshot(), telemetry.histogram("ai.queue_wait").summary()
+    print(f"{'':<10} coalesced {snap['coalesced']}  retries {snap['retries']}  rate limited {snap['rate_limited']}  "
+          f"queue wait p50 {wait['p50']:.0f} ms  p95 {wait['p95']:.0f} ms")
+    sched.close()
+
+
+if __name__ == "__main__":
+    main()
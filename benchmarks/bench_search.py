@@ -0,0 +1,77 @@
+"""FTS5 consultation search at scale: backfill cost and per-user query latency vs LIKE.
+
+    python benchmarks/bench_search.py --rows 200000 --users 200
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import db
+import search
+
+TERMS = ("headache fever cough fatigue nausea migraine rash dizziness insomnia anxiety chest pain "
+         "hypertension diabetes glucose asthma allergy eczema reflux back joint swelling vomiting "
+         "palpitations shortness breath sore throat sinus congestion blurred vision tingling").split()
+FILLER = ("patient reports symptoms for several days with mild intensity and no prior history "
+          "recommend hydration rest monitoring and clinical follow up if persistent").split()
+
+
+def text(rng, n):
+    return " ".join(rng.choice(TERMS) if rng.random() < 0.05 else rng.choice(FILLER) for _ in range(n))
+
+
+def pct(xs, p):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(p * len(xs)))]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=100000)
+    ap.add_argument("--users", type=int, default=1000)
+    ap.add_argument("--queries", type=int, default=300)
+    args = ap.parse_args()
+    rng = random.Random(7)
+    db.WRITE_BEHIND = False
+    db.set_pool(db.ConnectionPool(os.path.join(tempfile.mkdtemp(), "search.db")))
+    db.init_db()
+
+    t0 = time.perf_counter()
+    with db.get_pool().write() as c:
+        c.executemany(db.SQL_INSERT_CONSULT,
+                      ((f"user{rng.randrange(args.users)}", "2024-01-01 09:00", text(rng, 12), text(rng, 120))
+                       for _ in range(args.rows)))
+    print(f"seeded {args.rows} rows in {time.perf_counter() - t0:.1f}s")
+
+    t0 = time.perf_counter()
+    search.init_search()
+    steps = 0
+    while search.backfill_step(): steps += 1
+    print(f"incremental backfill: {steps} batches in {time.perf_counter() - t0:.1f}s")
+
+    fts, like = [], []
+    for _ in range(args.queries):
+        user = f"user{rng.randrange(args.users)}"
+        q = " ".join(rng.sample(TERMS, 2))
+        t0 = time.perf_counter()
+        search.search_consultations(user, q)
+        fts.append((time.perf_counter() - t0) * 1000)
+        a, b = q.split()
+        where = '''FROM consultations WHERE username=?
+                   AND (question LIKE ? OR answer LIKE ?) AND (question LIKE ? OR answer LIKE ?)'''
+        params = (user, f"%{a}%", f"%{a}%", f"%{b}%", f"%{b}%")
+        t0 = time.perf_counter()
+        # Same work the Records page needs: total hit count plus the first page.
+        db.get_pool().read("SELECT COUNT(*) " + where, params)
+        db.get_pool().read("SELECT id, date, question " + where + " ORDER BY id DESC LIMIT 10", params)
+        like.append((time.perf_counter() - t0) * 1000)
+    for name, xs in (("fts5 ranked", fts), ("LIKE scan", like)):
+        print(f"{name:<12} p50 {pct(xs, 0.5):7.2f} ms   p95 {pct(xs, 0.95):7.2f} ms   max {max(xs):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
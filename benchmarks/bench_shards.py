@@ -0,0 +1,93 @@
+"""Write throughput across processes: one SQLite file vs hash-sharded storage.
+
+Each of P processes (think one Streamlit server each) commits consultations
+for random users, one transaction per insert, with FTS triggers on. On one
+file every process queues on the same writer lock; with N shards only
+processes writing to the same shard contend. The gain depends on how long
+the lock is held compared with the CPU work per insert. With cheap commits
+on few cores, extra shards are only overhead; with slow flushes
+(--synchronous FULL on network disks, or simulated with --commit-ms) or
+many cores, throughput grows with the shard count.
+
+    python benchmarks/bench_shards.py --procs 8 --shards 1 2 4 8 --seconds 5
+    python benchmarks/bench_shards.py --procs 8 --commit-ms 2
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import db
+import search
+
+
+def backend(kind, root, shards, sync):
+    pragmas = tuple(p for p in db.PRAGMAS if "synchronous" not in p) + (f"PRAGMA synchronous={sync}",)
+    if kind == "sqlite": return db.SQLiteBackend(os.path.join(root, "single.db"), pragmas=pragmas)
+    return db.ShardedBackend(root, shards, pragmas=pragmas)
+
+
+def worker(kind, root, shards, sync, hold, users, start, seconds, seed, out):
+    db.WRITE_BEHIND = False
+    db.set_backend(backend(kind, root, shards, sync))
+    rng = random.Random(seed)
+    answer = "Rest, drink plenty of water and monitor your temperature. " * 20
+    lat = []
+    while time.time() < start: time.sleep(0.001)
+    end = start + seconds
+    while True:
+        t0 = time.perf_counter()
+        if time.time() >= end: break
+        user = f"user{rng.randrange(users)}"
+        # The same transaction save_consultation runs without write-behind, optionally holding the lock longer.
+        with db.pool_for(user).write() as c:
+            c.execute(db.SQL_INSERT_CONSULT, (user, time.strftime("%Y-%m-%d %H:%M"), "fever and headache since yesterday", answer))
+            if hold: time.sleep(hold / 1000)
+        lat.append((time.perf_counter() - t0) * 1000)
+    db.get_backend().close()
+    out.put(lat)
+
+
+def run(kind, shards, sync, hold, procs, users, seconds):
+    root = tempfile.mkdtemp()
+    db.set_backend(backend(kind, root, shards, sync))
+    db.init_db()
+    if search.fts5_available(): search.init_search()
+    db.get_backend().close()
+    ctx = multiprocessing.get_context("spawn")
+    out = ctx.Queue()
+    start = time.time() + 2.0
+    ps = [ctx.Process(target=worker, args=(kind, root, shards, sync, hold, users, start, seconds, i, out)) for i in range(procs)]
+    for p in ps: p.start()
+    lat = sorted(x for _ in ps for x in out.get())
+    for p in ps: p.join()
+    return len(lat) / seconds, lat[len(lat) // 2], lat[min(len(lat) - 1, int(len(lat) * 0.99))]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--procs", type=int, default=8)
+    ap.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    ap.add_argument("--users", type=int, default=1000)
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--synchronous", default="NORMAL", choices=["NORMAL", "FULL"],
+                    help="FULL fsyncs every commit, so the writer lock is held across disk flushes")
+    ap.add_argument("--commit-ms", type=float, default=0.0,
+                    help="extra time each transaction holds the writer lock, standing in for slow (network) disk flushes")
+    args = ap.parse_args()
+    print(f"{args.procs} processes, one transaction per insert, synchronous={args.synchronous}, "
+          f"+{args.commit_ms:g} ms per commit, {os.cpu_count()} CPUs")
+    print(f"{'layout':<12} {'inserts/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    rate, p50, p99 = run("sqlite", 1, args.synchronous, args.commit_ms, args.procs, args.users, args.seconds)
+    print(f"{'single file':<12} {rate:>10.0f} {p50:>8.2f} {p99:>8.2f}")
+    for n in args.shards:
+        rate, p50, p99 = run("sharded", n, args.synchronous, args.commit_ms, args.procs, args.users, args.seconds)
+        print(f"{f'{n} shards':<12} {rate:>10.0f} {p50:>8.2f} {p99:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
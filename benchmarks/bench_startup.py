@@ -0,0 +1,61 @@
+"""Cold-start import cost and per-rerun overhead of app5.py.
+
+    python benchmarks/bench_startup.py --reruns 20
+
+Import timings run in fresh interpreters; rerun timings drive the app
+headlessly through streamlit.testing's AppTest.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+EAGER = ["streamlit", "streamlit_option_menu", "google.generativeai", "PIL.Image", "pandas", "numpy"]
+LAZY = ["streamlit", "streamlit_option_menu", "bootstrap", "db", "services", "views"]
+
+
+def import_ms(modules, repeat):
+    code = ("import time; t=time.perf_counter()\n"
+            + "".join(f"import {m}\n" for m in modules)
+            + "print((time.perf_counter()-t)*1000)")
+    runs = [float(subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                                 text=True, check=True).stdout) for _ in range(repeat)]
+    return min(runs)
+
+
+def rerun_ms(reruns):
+    from streamlit.testing.v1 import AppTest
+    import bootstrap
+    at = AppTest.from_file(os.path.join(ROOT, "app5.py"), default_timeout=30)
+    t0 = time.perf_counter()
+    at.run()
+    first = (time.perf_counter() - t0) * 1000
+    times = []
+    for _ in range(reruns):
+        t0 = time.perf_counter()
+        at.run()
+        times.append((time.perf_counter() - t0) * 1000)
+    times.sort()
+    return first, times[len(times) // 2], bootstrap.REPORT
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--reruns", type=int, default=20)
+    args = ap.parse_args()
+    print(f"eager module-load imports : {import_ms(EAGER, args.repeat):8.1f} ms")
+    print(f"lazy module-load imports  : {import_ms(LAZY, args.repeat):8.1f} ms")
+    first, median, report = rerun_ms(args.reruns)
+    print(f"first run (cold)          : {first:8.1f} ms")
+    print(f"rerun median (Dashboard)  : {median:8.1f} ms")
+    print(f"pre-render overhead       : {report['rerun_ms'] or 0:8.1f} ms")
+    for name, ms in report["steps"].items(): print(f"  bootstrap {name:<14} : {ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
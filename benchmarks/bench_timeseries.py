@@ -0,0 +1,57 @@
+"""Wearable CSV ingestion and chart downsampling: a year of minute-level steps + heart rate.
+
+    python benchmarks/bench_timeseries.py --days 365
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import db
+import timeseries
+
+RANGES = {"24h": 86400, "7d": 7 * 86400, "30d": 30 * 86400, "365d": 365 * 86400}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--days", type=int, default=365)
+    ap.add_argument("--queries", type=int, default=50)
+    args = ap.parse_args()
+    tmp = tempfile.mkdtemp()
+    db.WRITE_BEHIND = False
+    db.set_pool(db.ConnectionPool(os.path.join(tmp, "ts.db")))
+    db.init_db()
+    db.init_timeseries()
+
+    n = args.days * 1440
+    rng = np.random.default_rng(7)
+    idx = pd.date_range(end=pd.Timestamp.now("UTC").floor("min"), periods=n, freq="min")
+    path = os.path.join(tmp, "wearable.csv")
+    pd.DataFrame({"timestamp": idx.strftime("%Y-%m-%dT%H:%M:%SZ"), "steps": rng.poisson(6, n),
+                  "heart_rate": rng.normal(72, 8, n).round(1)}).to_csv(path, index=False)
+    print(f"csv: {n:,} rows, {os.path.getsize(path) / 2 ** 20:.0f} MB")
+
+    stats = timeseries.ingest_csv("bench", path)
+    print(f"ingest: {stats['samples']:,} samples in {stats['seconds']:.1f}s ({stats['samples_per_s']:,.0f}/s)")
+    print(f"db size: {os.path.getsize(os.path.join(tmp, 'ts.db')) / 2 ** 20:.0f} MB")
+
+    end = int(idx[-1].timestamp()) + 60
+    for name, span in RANGES.items():
+        lat = []
+        for _ in range(args.queries):
+            t0 = time.perf_counter()
+            s = timeseries.series("bench", "steps", end - span, end)
+            lat.append(time.perf_counter() - t0)
+        raw = min(span, args.days * 86400) // 60
+        print(f"series {name:>5}: {len(s)} points from {raw:,} raw samples, "
+              f"median {np.median(lat) * 1000:.1f} ms, max {max(lat) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Caller-side latency and insert throughput: synchronous commits vs the write-behind queue.
+
+    python benchmarks/bench_writebehind.py --threads 8 --ops 500
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import db
+
+
+def run(label, write_behind, threads, ops):
+    db.WRITE_BEHIND = write_behind
+    db.set_pool(db.ConnectionPool(os.path.join(tempfile.mkdtemp(), "bench.db")))
+    db.init_db()
+    lat = [[] for _ in range(threads)]
+
+    def worker(t):
+        for i in range(ops):
+            t0 = time.perf_counter()
+            if i % 5 == 0: db.save_mental_test(f"user{t}", i % 10, "Nominal")
+            else: db.save_consultation(f"user{t}", f"question {i}", "answer " * 80)
+            lat[t].append((time.perf_counter() - t0) * 1000)
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    t0 = time.perf_counter()
+    for t in pool: t.start()
+    for t in pool: t.join()
+    if write_behind: db.get_writer().flush(timeout=60)
+    elapsed = time.perf_counter() - t0
+    flat = sorted(x for l in lat for x in l)
+    p95 = flat[int(len(flat) * 0.95) - 1]
+    print(f"{label:<13} {len(flat) / elapsed:9.0f} inserts/s   caller p50 {statistics.median(flat):6.3f} ms"
+          f"   p95 {p95:6.3f} ms")
+    if write_behind: print(f"{'':<13} {db.get_writer().stats}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--threads", type=int, default=8)
+    ap.add_argument("--ops", type=int, default=500)
+    args = ap.parse_args()
+    run("synchronous", False, args.threads, args.ops)
+    run("write-behind", True, args.threads, args.ops)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Local stand-in for google.generativeai.GenerativeModel with tunable latency and size.
+
+With max_concurrent set, calls beyond that many in flight fail immediately
+with ResourceExhausted (HTTP 429), the way Gemini rejects over-quota traffic.
+Pass shared=multiprocessing.Array("i", 4) to count calls and enforce the
+quota across processes.
+"""
+import threading
+import time
+
+
+class _Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class ResourceExhausted(Exception):
+    code = 429
+
+
+class FakeGenerativeModel:
+    def __init__(self, ttft=0.3, latency=1.5, response_chars=1200, chunk_chars=80, max_concurrent=None, shared=None):
+        self.ttft = ttft
+        self.latency = latency
+        self.response_chars = response_chars
+        self.chunk_chars = chunk_chars
+        self.max_concurrent = max_concurrent
+        # calls, rejected, active, peak
+        self._state = shared if shared is not None else [0, 0, 0, 0]
+        self._lock = shared.get_lock() if shared is not None else threading.Lock()
+
+    calls = property(lambda self: self._state[0])
+    rejected = property(lambda self: self._state[1])
+    peak = property(lambda self: self._state[3])
+
+    def _answer(self, content):
+        prompt = content[0] if isinstance(content, (list, tuple)) else str(content)
+        seed = f"Preliminary assessment for: {prompt[-60:]}. "
+        body = (seed + "Clinical correlation and follow-up are advised. ") * (self.response_chars // 40 + 1)
+        return body[:self.response_chars]
+
+    def _enter(self):
+        with self._lock:
+            s = self._state
+            s[0] += 1
+            if self.max_concurrent is not None and s[2] >= self.max_concurrent:
+                s[1] += 1
+                raise ResourceExhausted("429 Resource has been exhausted (e.g. check quota).")
+            s[2] += 1
+            s[3] = max(s[3], s[2])
+
+    def _exit(self):
+        with self._lock: self._state[2] -= 1
+
+    def generate_content(self, content, stream=False, **kwargs):
+        self._enter()
+        text = self._answer(content)
+        if not stream:
+            try: time.sleep(self.latency)
+            finally: self._exit()
+            return _Chunk(text)
+        return self._stream(text)
+
+    def _stream(self, text):
+        try:
+            pieces = [text[i:i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)]
+            gap = max(0.0, self.latency - self.ttft) / max(1, len(pieces) - 1)
+            time.sleep(self.ttft)
+            for i, piece in enumerate(pieces):
+                if i: time.sleep(gap)
+                yield _Chunk(piece)
+        finally: self._exit()
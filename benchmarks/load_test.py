@@ -0,0 +1,209 @@
+"""Headless load test: N simulated users driving app5.py through Streamlit's AppTest.
+
+Each user runs in its own process, the way sessions spread over several
+Streamlit servers; AppTest is not thread-safe, so users never share one.
+Each registers, signs in, chats with a local fake Gemini model, takes the
+PHQ screening and browses Records. Per-process results are merged, printed
+and written as JSON so runs can be compared over time.
+
+    python benchmarks/load_test.py --users 8 --messages 5 --out bench_results.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("MEDICARE_DB", os.path.join(tempfile.mkdtemp(), "loadtest.db"))
+
+APP = os.path.join(ROOT, "app5.py")
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f: return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}
+        self.errors = []
+
+    def run(self, at, page):
+        t0 = time.perf_counter()
+        at.run()
+        self.samples.setdefault(page, []).append((time.perf_counter() - t0) * 1000)
+        self.errors.extend(f"{page}: {e.message}" for e in at.exception)
+        return at
+
+
+def summarize(samples):
+    out = {}
+    for page, xs in sorted(samples.items()):
+        xs = sorted(xs)
+        q = lambda p: xs[min(len(xs) - 1, int(p * len(xs)))]
+        out[page] = {"runs": len(xs), "mean_ms": sum(xs) / len(xs), "p50_ms": q(0.5),
+                     "p95_ms": q(0.95), "max_ms": xs[-1]}
+    return out
+
+def merge_histograms(states):
+    """Fold telemetry histogram states from several processes into one summary each (buckets add up exactly)."""
+    import telemetry
+    merged = {}
+    for name, (count, total, peak, buckets) in (kv for st in states for kv in st.items()):
+        h = merged.setdefault(name, telemetry.Histogram())
+        h.count += count
+        h.total += total
+        h.max = max(h.max, peak)
+        for b, n in buckets.items(): h.buckets[b] = h.buckets.get(b, 0) + n
+    return {name: h.summary() for name, h in sorted(merged.items())}
+
+
+def _button(at, label):
+    return next(b for b in at.button if b.label == label)
+
+def _goto(rec, at, page):
+    at.query_params["page"] = page
+    return rec.run(at, page)
+
+def simulate_user(i, rec, messages):
+    from streamlit.testing.v1 import AppTest
+    user, pwd = f"bench_user_{i}_{int(time.time() * 1000)}", "s3cret-pass"
+    at = AppTest.from_file(APP, default_timeout=120)
+    rec.run(at, "Dashboard")
+
+    _button(at, "Sign In / Register").click()
+    rec.run(at, "Auth")
+    at.text_input(key="reg_user").input(user)
+    at.text_input(key="reg_name").input(f"Bench User {i}")
+    at.text_input(key="reg_pass").input(pwd)
+    at.text_input(key="reg_conf").input(pwd)
+    _button(at, "Create Account").click()
+    rec.run(at, "Register")
+    at.text_input(key="log_user").input(user)
+    at.text_input(key="log_pass").input(pwd)
+    _button(at, "Authenticate").click()
+    rec.run(at, "Login")
+
+    _goto(rec, at, "AI Consult")
+    for m in range(messages):
+        # Only context-free opening questions are cacheable. Every user opens with the same
+        # one, so users whose turn comes after the first answer is stored hit the answer
+        # cache; follow-ups carry the conversation and always reach the model.
+        at.chat_input[0].set_value("Persistent headache and mild fever" if m == 0 else f"Still feverish on day {m + 1}")
+        rec.run(at, "AI Consult (message)")
+
+    _goto(rec, at, "Mental Test")
+    at.selectbox[0].select("Several days")
+    at.selectbox[1].select("More than half the days")
+    _button(at, "Process Evaluation").click()
+    rec.run(at, "Mental Test (submit)")
+
+    _goto(rec, at, "Records")
+    for _ in range(2): rec.run(at, "Records")
+    for page in ("Dashboard", "BMI Check", "Dictionary", "Find Hospital"): _goto(rec, at, page)
+
+
+def worker(i, args, shared, ready, out):
+    """One simulated user in a fresh process; puts its samples, errors and telemetry on `out`."""
+    import bootstrap
+    import db
+    import services
+    import telemetry
+    from fake_model import FakeGenerativeModel
+    fake = FakeGenerativeModel(args.ttft, args.latency, args.response_chars, max_concurrent=args.quota, shared=shared)
+    bootstrap.build_model = lambda api_key: fake
+    rec = Recorder()
+    rss0 = rss_mb()
+    ready.wait()
+    try: simulate_user(i, rec, args.messages)
+    except Exception as e: rec.errors.append(f"user aborted: {e!r}")
+    if db.WRITE_BEHIND: db.get_writer().flush(timeout=60)
+    hists = telemetry.histograms().items()
+    out.put({"samples": rec.samples, "errors": rec.errors, "scheduler": services.get_scheduler().snapshot(),
+             "histograms": {n: (h.count, h.total, h.max, dict(h.buckets)) for n, h in hists if h.count},
+             "rss_start_mb": rss0, "rss_end_mb": rss_mb()})
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=4)
+    ap.add_argument("--messages", type=int, default=4)
+    ap.add_argument("--ttft", type=float, default=0.2, help="fake model time to first token (s)")
+    ap.add_argument("--latency", type=float, default=0.8, help="fake model total latency (s)")
+    ap.add_argument("--response-chars", type=int, default=1500)
+    ap.add_argument("--quota", type=int, default=None, help="fake model max concurrent calls (across all users) before 429s")
+    ap.add_argument("--out", default="bench_results.json")
+    args = ap.parse_args()
+
+    import db
+    import services
+    # Schema first, so the users do not all race to create it.
+    services.get_storage()
+
+    ctx = multiprocessing.get_context("spawn")
+    shared, ready, out = ctx.Array("i", 4), ctx.Barrier(args.users + 1), ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(i, args, shared, ready, out)) for i in range(args.users)]
+    for p in procs: p.start()
+    # The clock starts once every process has imported the app's dependencies.
+    ready.wait()
+    t0 = time.perf_counter()
+    parts = [out.get() for _ in procs]
+    wall = time.perf_counter() - t0
+    for p in procs: p.join()
+    errors = [e for r in parts for e in r["errors"]]
+    errors += [f"user process exited with {p.exitcode}" for p in procs if p.exitcode]
+
+    samples = {}
+    for r in parts:
+        for page, xs in r["samples"].items(): samples.setdefault(page, []).extend(xs)
+    hists = merge_histograms([r["histograms"] for r in parts])
+    sched = {}
+    for r in parts:
+        for k, v in r["scheduler"].items():
+            sched[k] = sched.get(k, 0) + v if isinstance(v, (int, float)) and not isinstance(v, bool) else v or sched.get(k)
+
+    counts = [shard.read("SELECT (SELECT COUNT(*) FROM consultations), (SELECT COUNT(*) FROM mental_logs)")[0]
+              for shard in db.shard_pools()]
+    rows = [sum(c) for c in zip(*counts)]
+    db_calls = sum(h["count"] for n, h in hists.items() if n.startswith("db."))
+    calls, rejected, _, peak = shared[:]
+    growth = [r["rss_end_mb"] - r["rss_start_mb"] for r in parts]
+    result = {
+        "at": time.time(),
+        "python": platform.python_version(),
+        "config": vars(args),
+        "wall_s": wall,
+        "pages": summarize(samples),
+        "db": {"consultations": rows[0], "mental_logs": rows[1], "helper_calls": db_calls,
+               "helper_calls_per_s": db_calls / wall,
+               "helpers": {n: h for n, h in hists.items() if n.startswith("db.")}},
+        "model": {"calls": calls, "rejected": rejected, "peak_concurrency": peak,
+                  "scheduler": sched, "queue_wait": hists.get("ai.queue_wait")},
+        "memory": {"processes": len(parts), "rss_end_mb_max": max(r["rss_end_mb"] for r in parts),
+                   "growth_mb_mean": sum(growth) / len(growth), "growth_mb_max": max(growth)},
+        "errors": errors,
+    }
+    with open(args.out, "w", encoding="utf-8") as f: json.dump(result, f, indent=2)
+
+    print(f"{args.users} users in {wall:.1f}s  model calls {calls} (429s {rejected}, peak {peak})"
+          f"  errors {len(errors)}")
+    print(f"{'page':<24}{'runs':>6}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for page, s in result["pages"].items():
+        print(f"{page:<24}{s['runs']:>6}{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['max_ms']:>10.1f}")
+    print(f"db helper calls/s {result['db']['helper_calls_per_s']:.1f}   "
+          f"rss growth per process {result['memory']['growth_mb_mean']:.1f} MB   -> {args.out}")
+    for e in errors: print(f"  {e}")
+
+
+if __name__ == "__main__":
+    main()
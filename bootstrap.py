@@ -0,0 +1,39 @@
+import os
+import re
+import time
+from contextlib import contextmanager
+
+# --- PROCESS BOOTSTRAP (one-time setup + timing report) ---
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+MODEL_NAME = "gemini-1.5-flash"
+
+REPORT = {"process_start": time.time(), "steps": {}, "reruns": 0, "rerun_ms": None}
+
+
+@contextmanager
+def step(name):
+    t0 = time.perf_counter()
+    try: yield
+    finally: REPORT["steps"][name] = (time.perf_counter() - t0) * 1000
+
+def record_rerun(started):
+    REPORT["reruns"] += 1
+    REPORT["rerun_ms"] = (time.perf_counter() - started) * 1000
+
+def minify_css(css):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{};,>])\s*", r"\1", css).strip()
+
+def load_theme(name="theme.css"):
+    with step("theme"):
+        with open(os.path.join(ASSET_DIR, name), encoding="utf-8") as f: css = minify_css(f.read())
+        return (f"<style>{css}</style>"
+                "<div class=\"glow-orb orb-1\"></div><div class=\"glow-orb orb-2\"></div>")
+
+def build_model(api_key):
+    # google.generativeai is the slowest import in the app; only pay for it here.
+    with step("model"):
+        import google.generativeai as genai
+        if api_key: genai.configure(api_key=api_key)
+        return genai.GenerativeModel(MODEL_NAME)
@@ -0,0 +1,80 @@
+import re
+from collections import deque
+
+# --- CONSULTATION CONTEXT (bounded per-session chat state) ---
+CONTEXT_TOKENS = 2000
+SUMMARY_TOKENS = 500
+KEEP_MESSAGES = 60
+VISIBLE = 8
+GIST_CHARS = 160
+ROLE_LABEL = {"user": "Patient", "assistant": "Doctor"}
+
+
+def estimate_tokens(text):
+    # ~4 characters per token for English prose; good enough for budgeting
+    # without a count_tokens round trip per message.
+    return len(text) // 4 + 1
+
+def gist(text, limit=GIST_CHARS):
+    """First sentence of text, whitespace-collapsed and capped at limit characters."""
+    text = " ".join(text.split())
+    m = re.match(r"(.+?[.!?])(\s|$)", text)
+    first = m.group(1) if m else text
+    return first if len(first) <= limit else first[:limit - 1].rstrip() + "…"
+
+
+class Conversation:
+    """Chat history for one session, bounded three ways.
+
+    - messages: the last `keep` messages, for display only.
+    - window: the most recent turns sent verbatim to the model, capped at
+      context_tokens.
+    - summary: one-line gists of turns that fell out of the window, oldest
+      dropped first once past summary_tokens.
+    """
+
+    def __init__(self, context_tokens=CONTEXT_TOKENS, summary_tokens=SUMMARY_TOKENS, keep=KEEP_MESSAGES):
+        self.context_tokens = context_tokens
+        self.summary_tokens = summary_tokens
+        self.messages = deque(maxlen=keep)
+        self.window = deque()
+        self.window_used = 0
+        self.summary = deque()
+        self.summary_used = 0
+        self.total = 0
+
+    def add(self, role, content):
+        self.messages.append({"role": role, "content": content})
+        self.total += 1
+        text = content[:self.context_tokens * 4]
+        tokens = estimate_tokens(text)
+        self.window.append((role, text, tokens))
+        self.window_used += tokens
+        while self.window_used > self.context_tokens and len(self.window) > 1:
+            self._fold(*self.window.popleft())
+
+    def _fold(self, role, text, tokens):
+        self.window_used -= tokens
+        line = f"{ROLE_LABEL[role]}: {gist(text)}"
+        cost = estimate_tokens(line)
+        self.summary.append((line, cost))
+        self.summary_used += cost
+        while self.summary_used > self.summary_tokens and self.summary:
+            self.summary_used -= self.summary.popleft()[1]
+
+    def context(self):
+        """Prompt block with the rolling summary and recent turns; empty for a fresh conversation."""
+        parts = []
+        if self.summary:
+            parts.append("Summary of earlier discussion:\n" + "\n".join(f"- {line}" for line, _ in self.summary))
+        if self.window:
+            parts.append("Recent conversation:\n" + "\n".join(f"{ROLE_LABEL[r]}: {t}" for r, t, _ in self.window))
+        return "\n\n".join(parts)
+
+    def tail(self, n=VISIBLE):
+        """The last n messages kept for display, oldest first."""
+        n = min(n, len(self.messages))
+        return [self.messages[i] for i in range(len(self.messages) - n, len(self.messages))]
+
+    def __len__(self):
+        return len(self.messages)
@@ -0,0 +1,442 @@
+import sqlite3
+import hashlib
+import zlib
+import datetime
+import itertools
+import threading
+import time
+import os
+from contextlib import contextmanager
+
+import telemetry
+from writebehind import WriteBehind
+
+# --- STORAGE LAYER (pooled, WAL-mode SQLite) ---
+DB_PATH = os.environ.get("MEDICARE_DB", "medicare_pro.db")
+STORAGE = os.environ.get("MEDICARE_STORAGE", "sqlite")
+SHARD_DIR = os.environ.get("MEDICARE_SHARD_DIR", "shards")
+SHARDS = int(os.environ.get("MEDICARE_SHARDS", "4"))
+CATALOG = "catalog.db"
+ID_BITS = 40
+SHARD_BITS = 8
+ROUTE_CACHE = 100000
+BUSY_TIMEOUT_MS = 5000
+WRITE_RETRIES = 5
+STATEMENT_CACHE = 256
+WRITE_BEHIND = os.environ.get("MEDICARE_WRITE_BEHIND", "1") != "0"
+ARCHIVE_CODEC = os.environ.get("MEDICARE_ARCHIVE_CODEC", "zlib")
+ZLIB_LEVEL = 9
+ZSTD_LEVEL = 19
+
+PRAGMAS = (
+    # Only takes effect on a brand-new file (it must precede WAL); older files
+    # need one full VACUUM to switch, see `python retention.py vacuum --full`.
+    "PRAGMA auto_vacuum=INCREMENTAL",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=134217728",
+)
+
+# Statements are kept as constants so sqlite3's per-connection statement
+# cache hands back the already-prepared statement on every call.
+SQL_INSERT_USER = 'INSERT INTO users(username, password, nama_lengkap) VALUES (?,?,?)'
+SQL_LOGIN = 'SELECT * FROM users WHERE username =? AND password = ?'
+SQL_INSERT_CONSULT = 'INSERT INTO consultations(username, date, question, answer) VALUES (?,?,?,?)'
+SQL_INSERT_MENTAL = 'INSERT INTO mental_logs(username, date, score, category) VALUES (?,?,?,?)'
+# Consultation reads cover the live table and the compressed archive (see retention.py).
+# Live rows carry a NULL codec; unpack() runs in the outer query, i.e. only on rows returned.
+SQL_HISTORY_CHAT = ('''SELECT date, unpack(codec, question), unpack(codec, answer) FROM (
+                          SELECT id, date, question, answer, NULL AS codec FROM consultations WHERE username=:user
+                          UNION ALL
+                          SELECT id, date, question, answer, codec FROM consultations_archive WHERE username=:user)
+                      ORDER BY id DESC''')
+SQL_HISTORY_MENTAL = 'SELECT date, score, category FROM mental_logs WHERE username=? ORDER BY id DESC'
+# Each side is limited first, so a page reads at most one page from either table.
+SQL_PAGE_CHAT = ('''SELECT id, date, unpack(codec, question), unpack(codec, answer) FROM (
+                       SELECT * FROM (SELECT id, date, question, answer, NULL AS codec FROM consultations
+                                      WHERE username=:user AND id<:before ORDER BY id DESC LIMIT :n)
+                       UNION ALL
+                       SELECT * FROM (SELECT id, date, question, answer, codec FROM consultations_archive
+                                      WHERE username=:user AND id<:before ORDER BY id DESC LIMIT :n)
+                       ORDER BY id DESC LIMIT :n)
+                    ORDER BY id DESC''')
+SQL_PAGE_MENTAL = ('SELECT id, date, score, category FROM mental_logs '
+                   'WHERE username=:user AND id<:before ORDER BY id DESC LIMIT :n')
+
+PAGE_SIZE = 20
+_NO_CURSOR = 2 ** 63 - 1
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("zstd-compressed archives need zstandard (pip install zstandard)")
+    return zstandard
+
+def archive_codec():
+    """The configured archive codec, falling back to zlib when zstandard is not installed."""
+    if ARCHIVE_CODEC == "zstd":
+        try: _zstd()
+        except RuntimeError: return "zlib"
+        return "zstd"
+    return "zlib"
+
+def pack(text, codec="zlib"):
+    if text is None: return None
+    raw = text.encode("utf-8")
+    if codec == "zstd": return _zstd().ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    return zlib.compress(raw, ZLIB_LEVEL)
+
+def unpack(codec, blob):
+    """Inverse of pack(); registered as the SQL function unpack(codec, blob) on every pooled connection.
+
+    A NULL codec means the value was never compressed and is returned as is.
+    """
+    if blob is None or codec is None: return blob
+    if codec == "zlib": return zlib.decompress(blob).decode("utf-8")
+    if codec == "zstd": return _zstd().ZstdDecompressor().decompress(blob).decode("utf-8")
+    raise ValueError(f"unknown archive codec {codec!r}")
+
+
+def _is_busy(exc):
+    msg = str(exc).lower()
+    return "locked" in msg or "busy" in msg
+
+
+class ConnectionPool:
+    """One tuned connection per thread, shared by every session in the process.
+
+    Streamlit runs each script rerun on a fresh thread, so connections owned by
+    finished threads are parked and handed to the next thread instead of being
+    closed and reopened.
+    """
+
+    def __init__(self, path=DB_PATH, pragmas=PRAGMAS, uri=False):
+        self.path = path
+        self.pragmas = pragmas
+        self.uri = uri
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._owned = {}
+        self._idle = []
+        self.opened = 0
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None,
+                               check_same_thread=False, cached_statements=STATEMENT_CACHE, uri=self.uri)
+        for pragma in self.pragmas: conn.execute(pragma)
+        conn.create_function("unpack", 2, unpack, deterministic=True)
+        self.opened += 1
+        return conn
+
+    def _reap(self):
+        for t in [t for t in self._owned if not t.is_alive()]:
+            self._idle.append(self._owned.pop(t))
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None: return conn
+        with self._lock:
+            self._reap()
+            conn = self._idle.pop() if self._idle else None
+            if conn is None: conn = self._open()
+            self._owned[threading.current_thread()] = conn
+        self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def write(self):
+        """Run the block in a BEGIN IMMEDIATE transaction, retrying while the writer lock is held."""
+        conn = self.connection()
+        for attempt in range(WRITE_RETRIES):
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                break
+            except sqlite3.OperationalError as e:
+                if not _is_busy(e) or attempt == WRITE_RETRIES - 1: raise
+                time.sleep(0.05 * 2 ** attempt)
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def read(self, sql, params=()):
+        return self.connection().execute(sql, params).fetchall()
+
+    def close_all(self):
+        with self._lock:
+            for conn in list(self._owned.values()) + self._idle: conn.close()
+            self._owned.clear()
+            self._idle.clear()
+        self._local = threading.local()
+
+
+# --- STORAGE BACKENDS (where each user's rows live) ---
+# Per-user tables (these, plus the rollups and search index derived from
+# them) live on the user's shard; everything else lives on `main`.
+USER_TABLES = ("users", "consultations", "mental_logs", "consultations_archive")
+
+def shard_hash(username, n):
+    # crc32 rather than hash(): placement must agree across processes and restarts.
+    return zlib.crc32(username.encode("utf-8")) % n
+
+def shard_file(k):
+    return f"shard-{k:03d}.db"
+
+
+class SQLiteBackend:
+    """Today's layout: every table in one file, so main is also the only shard."""
+    kind = "sqlite"
+
+    def __init__(self, path=DB_PATH, pool=None, pragmas=PRAGMAS):
+        self.main = pool or ConnectionPool(path, pragmas)
+
+    def shards(self):
+        return [self.main]
+
+    def pools(self):
+        return list({id(p): p for p in [self.main, *self.shards()]}.values())
+
+    def shard_of(self, username):
+        return 0
+
+    def pool_for(self, username):
+        return self.shards()[self.shard_of(username)]
+
+    def assign(self, username):
+        return self.shard_of(username)
+
+    def id_base(self, shard):
+        """First AUTOINCREMENT id of a shard's per-user tables."""
+        return 0
+
+    def close(self):
+        for pool in self.pools(): pool.close_all()
+
+
+class MemoryBackend(SQLiteBackend):
+    """A private in-memory database for tests; shared cache so every pooled connection sees it."""
+    kind = "memory"
+    _names = itertools.count()
+
+    def __init__(self):
+        # Shared-cache readers would otherwise fail with "table is locked" during any write.
+        pool = ConnectionPool(f"file:medicare-mem-{next(self._names)}?mode=memory&cache=shared",
+                              PRAGMAS + ("PRAGMA read_uncommitted=1",), uri=True)
+        super().__init__(pool=pool)
+
+
+class ShardedBackend(SQLiteBackend):
+    """Per-user tables spread over N SQLite files so their writers don't share one lock.
+
+    catalog.db in `root` holds the shard list, the routing table and the
+    shared tables. A user's shard comes from `routes`, written at
+    registration, and falls back to crc32(username) % N. The routing table
+    lets reshard.py re-place users without depending on the hash. Shard k
+    of layout generation g hands out ids from ((g << 8) | k) << 40, so ids
+    stay unique across shards and across re-shards.
+    """
+    kind = "sharded"
+
+    def __init__(self, root=SHARD_DIR, shards=SHARDS, generation=1, pragmas=PRAGMAS):
+        os.makedirs(root, exist_ok=True)
+        self.root = root
+        super().__init__(os.path.join(root, CATALOG), pragmas=pragmas)
+        with self.main.write() as c:
+            c.execute('CREATE TABLE IF NOT EXISTS shards (shard INTEGER PRIMARY KEY, path TEXT, generation INTEGER)')
+            c.execute('CREATE TABLE IF NOT EXISTS routes (username TEXT PRIMARY KEY, shard INTEGER) WITHOUT ROWID')
+            if not c.execute('SELECT 1 FROM shards').fetchone():
+                c.executemany('INSERT INTO shards VALUES (?, ?, ?)', [(k, shard_file(k), generation) for k in range(shards)])
+        rows = self.main.read('SELECT shard, path, generation FROM shards ORDER BY shard')
+        self.generation = rows[0][2]
+        self._shards = [ConnectionPool(os.path.join(root, path), pragmas) for _, path, _ in rows]
+        self._routes = {}
+
+    def shards(self):
+        return self._shards
+
+    def shard_of(self, username):
+        k = self._routes.get(username)
+        if k is None:
+            row = self.main.read('SELECT shard FROM routes WHERE username=?', (username,))
+            k = row[0][0] if row else shard_hash(username, len(self._shards))
+            if len(self._routes) >= ROUTE_CACHE: self._routes.clear()
+            self._routes[username] = k
+        return k
+
+    def assign(self, username):
+        """Pin the user to their shard in the routing table; called at registration."""
+        k = self.shard_of(username)
+        with self.main.write() as c: c.execute('INSERT OR IGNORE INTO routes VALUES (?, ?)', (username, k))
+        return k
+
+    def id_base(self, shard):
+        return ((self.generation << SHARD_BITS) | shard) << ID_BITS
+
+
+def make_backend(kind=None):
+    kind = kind or STORAGE
+    if kind == "sqlite": return SQLiteBackend()
+    if kind == "memory": return MemoryBackend()
+    if kind == "sharded": return ShardedBackend()
+    raise ValueError(f"unknown MEDICARE_STORAGE {kind!r} (sqlite, memory or sharded)")
+
+
+_backend = None
+_writer = None
+_pool_lock = threading.Lock()
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _pool_lock:
+            if _backend is None: _backend = make_backend()
+    return _backend
+
+def set_backend(backend):
+    global _backend
+    flush_writes()
+    with _pool_lock:
+        old, _backend = _backend, backend
+    if old is not None:
+        keep = {id(p) for p in backend.pools()}
+        for pool in old.pools():
+            if id(pool) not in keep: pool.close_all()
+    return backend
+
+def get_pool():
+    """The pool for shared (not per-user) tables."""
+    return get_backend().main
+
+def set_pool(pool):
+    set_backend(SQLiteBackend(pool=pool))
+    return pool
+
+def pool_for(username):
+    return get_backend().pool_for(username)
+
+def shard_pools():
+    """Every pool holding per-user tables; one per shard."""
+    return get_backend().shards()
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        with _pool_lock:
+            if _writer is None: _writer = WriteBehind(pool_for)
+    return _writer
+
+def _enqueue(username, sql, params):
+    if WRITE_BEHIND: get_writer().submit(username, sql, params)
+    else:
+        with pool_for(username).write() as c: c.execute(sql, params)
+
+def sync(username):
+    """Read-your-writes: wait only for this user's queued inserts, if any."""
+    if _writer is not None and _writer.pending(username): _writer.sync(username)
+
+def flush_writes():
+    """Wait until every queued write-behind insert is committed (no-op when none were queued)."""
+    if _writer is not None: _writer.flush()
+
+# --- DATA ACCESS HELPERS ---
+@telemetry.timed("db.init_db")
+def init_db():
+    backend = get_backend()
+    for k, pool in enumerate(backend.shards()): _init_shard(pool, backend.id_base(k))
+
+def _init_shard(pool, id_base=0):
+    with pool.write() as c:
+        c.execute('''CREATE TABLE IF NOT EXISTS users
+                     (username TEXT PRIMARY KEY, password TEXT, nama_lengkap TEXT)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS consultations
+                     (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT,
+                      date TEXT, question TEXT, answer TEXT)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS mental_logs
+                     (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT,
+                      date TEXT, score INTEGER, category TEXT)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS consultations_archive
+                     (id INTEGER PRIMARY KEY, username TEXT, date TEXT, codec TEXT,
+                      question BLOB, answer BLOB, raw_bytes INTEGER)''')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_consultations_user_id ON consultations(username, id)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_consultations_archive_user_id ON consultations_archive(username, id)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_mental_logs_user_id ON mental_logs(username, id)')
+        for t in ("consultations", "mental_logs") if id_base else ():
+            # Raise the AUTOINCREMENT counter to the shard's base (rows copied in by reshard.py sit below it).
+            c.execute('UPDATE sqlite_sequence SET seq=? WHERE name=? AND seq < ?', (id_base, t, id_base))
+            c.execute('INSERT INTO sqlite_sequence(name, seq) SELECT ?, ? WHERE NOT EXISTS '
+                      '(SELECT 1 FROM sqlite_sequence WHERE name=?)', (t, id_base, t))
+
+def init_timeseries():
+    # Schema for timeseries.py, kept here so booting the app does not import pandas.
+    with get_pool().write() as c:
+        c.execute('''CREATE TABLE IF NOT EXISTS samples
+                     (username TEXT, metric INTEGER, ts INTEGER, value REAL,
+                      PRIMARY KEY (username, metric, ts)) WITHOUT ROWID''')
+        for tier in ("samples_hourly", "samples_daily"):
+            c.execute(f'''CREATE TABLE IF NOT EXISTS {tier}
+                          (username TEXT, metric INTEGER, ts INTEGER, vmin REAL, vmax REAL, vsum REAL, n INTEGER,
+                           PRIMARY KEY (username, metric, ts)) WITHOUT ROWID''')
+
+def make_hashes(password):
+    return hashlib.sha256(str.encode(password)).hexdigest()
+
+def _now():
+    return datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+
+@telemetry.timed("db.add_user")
+def add_user(username, password, nama):
+    get_backend().assign(username)
+    try:
+        with pool_for(username).write() as c:
+            c.execute(SQL_INSERT_USER, (username, make_hashes(password), nama))
+        return True
+    except sqlite3.IntegrityError: return False
+
+@telemetry.timed("db.login_user")
+def login_user(username, password):
+    return pool_for(username).read(SQL_LOGIN, (username, make_hashes(password)))
+
+@telemetry.timed("db.save_consultation")
+def save_consultation(username, question, answer):
+    _enqueue(username, SQL_INSERT_CONSULT, (username, _now(), question, answer))
+
+@telemetry.timed("db.save_mental_test")
+def save_mental_test(username, score, category):
+    _enqueue(username, SQL_INSERT_MENTAL, (username, _now(), score, category))
+
+@telemetry.timed("db.get_history_chat")
+def get_history_chat(username):
+    sync(username)
+    return pool_for(username).read(SQL_HISTORY_CHAT, {"user": username})
+
+@telemetry.timed("db.get_history_mental")
+def get_history_mental(username):
+    sync(username)
+    return pool_for(username).read(SQL_HISTORY_MENTAL, (username,))
+
+def _page(sql, username, before, limit):
+    sync(username)
+    rows = pool_for(username).read(sql, {"user": username, "before": _NO_CURSOR if before is None else before, "n": limit + 1})
+    if len(rows) > limit: return rows[:limit], rows[limit - 1][0]
+    return rows, None
+
+@telemetry.timed("db.get_history_chat_page")
+def get_history_chat_page(username, before=None, limit=PAGE_SIZE):
+    """Newest-first page of consultations (live and archived) with id < before.
+
+    Returns (rows, next_cursor); rows are (id, date, question, answer) and
+    next_cursor is None on the last page.
+    """
+    return _page(SQL_PAGE_CHAT, username, before, limit)
+
+@telemetry.timed("db.get_history_mental_page")
+def get_history_mental_page(username, before=None, limit=PAGE_SIZE):
+    """Same as get_history_chat_page for mental_logs; rows are (id, date, score, category)."""
+    return _page(SQL_PAGE_MENTAL, username, before, limit)
@@ -0,0 +1,169 @@
+"""Streaming export of consultations / mental_logs to CSV, JSON Lines or Parquet.
+
+    python export.py consultations --format csv --out consultations.csv
+    python export.py mental_logs --user alice --format jsonl --out alice_mental.jsonl
+    python export.py consultations --format parquet --out consultations.parquet   (needs pyarrow)
+
+Rows are streamed from cursors with fetchmany, so memory stays constant
+regardless of table size. Archived consultations are included, decompressed.
+"""
+import argparse
+import csv
+import heapq
+import io
+import itertools
+import json
+import sys
+import time
+
+import db
+
+# --- BULK EXPORT ---
+CHUNK = 2000
+DATASETS = {
+    "consultations": ("id", "username", "date", "question", "answer"),
+    "mental_logs": ("id", "username", "date", "score", "category"),
+}
+FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson", "parquet": "application/vnd.apache.parquet"}
+
+
+def _where(username):
+    return (" WHERE username=?", (username,)) if username else ("", ())
+
+def _tables(dataset):
+    # Consultations past the retention age live compressed in consultations_archive (see retention.py).
+    return (dataset, "consultations_archive") if dataset == "consultations" else (dataset,)
+
+def _pools(username):
+    return [db.pool_for(username)] if username else db.shard_pools()
+
+def count_rows(dataset, username=None):
+    where, params = _where(username)
+    return sum(pool.read(f"SELECT COUNT(*) FROM {t}{where}", params)[0][0] for pool in _pools(username) for t in _tables(dataset))
+
+def _select(dataset, table):
+    cols = DATASETS[dataset]
+    if table == "consultations_archive": cols = [f"unpack(codec, {c})" if c in ("question", "answer") else c for c in cols]
+    return f"SELECT {', '.join(cols)} FROM {table}"
+
+def _rows(pool, sql, params, chunk):
+    cur = pool.connection().execute(sql, params)
+    try:
+        while True:
+            rows = cur.fetchmany(chunk)
+            if not rows: return
+            yield from rows
+    finally: cur.close()
+
+def iter_chunks(dataset, username=None, chunk=CHUNK):
+    """Yield lists of row tuples, `chunk` at a time, in id order."""
+    where, params = _where(username)
+    # One cursor per shard and table, merged on id (unique across shards), so rows stream in order without a sort.
+    rows = heapq.merge(*(_rows(pool, f"{_select(dataset, t)}{where} ORDER BY id", params, chunk)
+                         for pool in _pools(username) for t in _tables(dataset)))
+    while True:
+        batch = list(itertools.islice(rows, chunk))
+        if not batch: return
+        yield batch
+
+
+class _Counting:
+    """Wraps a binary sink to count bytes written."""
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.bytes = 0
+
+    def write(self, b):
+        self.bytes += len(b)
+        return self.sink.write(b)
+
+    def __getattr__(self, name):
+        return getattr(self.sink, name)
+
+
+def _write_csv(out, cols, chunks, tick):
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+    w = csv.writer(text)
+    w.writerow(cols)
+    for rows in chunks:
+        w.writerows(rows)
+        tick(len(rows))
+    text.detach()
+
+def _write_jsonl(out, cols, chunks, tick):
+    for rows in chunks:
+        out.write("".join(json.dumps(dict(zip(cols, r)), ensure_ascii=False) + "\n" for r in rows).encode("utf-8"))
+        tick(len(rows))
+
+def _write_parquet(out, cols, chunks, tick):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+    types = {"id": pa.int64(), "score": pa.int64()}
+    schema = pa.schema([(c, types.get(c, pa.string())) for c in cols])
+    with pq.ParquetWriter(out, schema, compression="zstd") as w:
+        for rows in chunks:
+            # One row group per chunk keeps only `chunk` rows in memory at a time.
+            w.write_batch(pa.record_batch([list(col) for col in zip(*rows)], schema=schema))
+            tick(len(rows))
+
+WRITERS = {"csv": _write_csv, "jsonl": _write_jsonl, "parquet": _write_parquet}
+
+
+def export(dataset, out, fmt="csv", username=None, chunk=CHUNK, progress=None):
+    """Stream a dataset into the binary file object `out`; returns throughput stats.
+
+    progress(done, total) is called after every chunk.
+    """
+    if dataset not in DATASETS: raise ValueError(f"unknown dataset {dataset!r}")
+    if fmt not in WRITERS: raise ValueError(f"unknown format {fmt!r}")
+    if username: db.sync(username)
+    else: db.flush_writes()
+    total = count_rows(dataset, username)
+    stats = {"dataset": dataset, "format": fmt, "rows": 0, "total": total}
+    sink = _Counting(out)
+    t0 = time.perf_counter()
+
+    def tick(n):
+        stats["rows"] += n
+        if progress: progress(stats["rows"], total)
+
+    WRITERS[fmt](sink, DATASETS[dataset], iter_chunks(dataset, username, chunk), tick)
+    stats["seconds"] = time.perf_counter() - t0
+    stats["bytes"] = sink.bytes
+    stats["rows_per_s"] = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Export MediCare Pro records.")
+    ap.add_argument("dataset", choices=sorted(DATASETS))
+    ap.add_argument("--format", default="csv", choices=sorted(FORMATS))
+    ap.add_argument("--user", help="only this username's records")
+    ap.add_argument("--out", help="output file (default: stdout, not for parquet)")
+    ap.add_argument("--chunk", type=int, default=CHUNK)
+    ap.add_argument("--db", help="database path (default: MEDICARE_DB or medicare_pro.db)")
+    args = ap.parse_args(argv)
+    if args.db: db.set_pool(db.ConnectionPool(args.db))
+    if args.format == "parquet" and not args.out: ap.error("--out is required for parquet")
+
+    last = [0.0]
+    def progress(done, total):
+        now = time.perf_counter()
+        if now - last[0] > 0.5 or done == total:
+            last[0] = now
+            print(f"\r{done}/{total} rows", end="", file=sys.stderr, flush=True)
+
+    out = open(args.out, "wb") if args.out else sys.stdout.buffer
+    try: stats = export(args.dataset, out, args.format, args.user, args.chunk, progress)
+    finally:
+        if args.out: out.close()
+    print(f"\nexported {stats['rows']} rows, {stats['bytes'] / 2 ** 20:.1f} MB in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_s']:.0f} rows/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
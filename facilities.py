@@ -0,0 +1,114 @@
+"""Facility locator: an in-memory grid index over a facility CSV.
+
+Each source row has name, type, lat, lon and address. Points are bucketed
+into fixed-size lat/lon cells and sorted by cell id, so a bounding box is a
+handful of contiguous slices found with binary search; only those candidates
+get exact great-circle distances.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+import telemetry
+
+# --- FACILITY SPATIAL INDEX ---
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+SOURCE = os.environ.get("MEDICARE_FACILITIES", os.path.join(DATA_DIR, "facilities.csv"))
+COLUMNS = ("name", "type", "lat", "lon", "address")
+CELL_DEG = 0.1
+EARTH_KM = 6371.0088
+KM_PER_DEG = np.pi * EARTH_KM / 180
+
+
+def load(source=SOURCE):
+    frame = pd.read_csv(source, dtype={"name": str, "type": str, "address": str})
+    missing = [c for c in COLUMNS if c not in frame.columns]
+    if missing: raise ValueError(f"{source}: missing columns {', '.join(missing)}")
+    frame = frame.dropna(subset=["lat", "lon"])
+    return frame[(frame.lat.abs() <= 90) & (frame.lon.abs() <= 180)]
+
+def haversine_km(lat, lon, lats, lons):
+    """Great-circle distance from one point to arrays of points, all in degrees."""
+    p1, p2 = np.radians(lat), np.radians(lats)
+    a = np.sin((p2 - p1) / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(np.radians(lons - lon) / 2) ** 2
+    return 2 * EARTH_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class FacilityIndex:
+    """Immutable grid index; build once per process and share it across sessions."""
+
+    def __init__(self, frame, cell_deg=CELL_DEG):
+        self.cell = cell_deg
+        self.ny, self.nx = int(np.ceil(180 / cell_deg)), int(np.ceil(360 / cell_deg))
+        iy, ix = self._cell(frame.lat.to_numpy(float), frame.lon.to_numpy(float))
+        keys = iy * self.nx + ix
+        order = np.argsort(keys, kind="stable")
+        self.frame = frame.iloc[order].reset_index(drop=True)
+        self.keys = keys[order]
+        self.lat = self.frame.lat.to_numpy(float)
+        self.lon = self.frame.lon.to_numpy(float)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _cell(self, lat, lon):
+        iy = np.clip(((np.asarray(lat) + 90) // self.cell).astype("int64"), 0, self.ny - 1)
+        ix = np.clip(((np.asarray(lon) + 180) // self.cell).astype("int64"), 0, self.nx - 1)
+        return iy, ix
+
+    def _box(self, lat, lon, dlat, dlon):
+        """Indices of every point whose cell overlaps the lat/lon box (no wrap at the antimeridian)."""
+        (y0, y1), (x0, x1) = self._cell([lat - dlat, lat + dlat], [lon - dlon, lon + dlon])
+        rows = np.arange(y0, y1 + 1) * self.nx
+        lo = np.searchsorted(self.keys, rows + x0, "left")
+        hi = np.searchsorted(self.keys, rows + x1, "right")
+        spans = [np.arange(a, b) for a, b in zip(lo.tolist(), hi.tolist()) if b > a]
+        return np.concatenate(spans) if spans else np.empty(0, dtype="int64")
+
+    def _radius_box(self, lat, radius_km):
+        dlat = radius_km / KM_PER_DEG
+        edge = min(abs(lat) + dlat, 89.9)
+        return dlat, min(180.0, dlat / np.cos(np.radians(edge)))
+
+    def rows(self, hits):
+        """Materialize a (positions, distances) result as a DataFrame with a distance_km column."""
+        idx, dist = hits
+        out = self.frame.iloc[idx].copy()
+        out["distance_km"] = dist
+        return out.reset_index(drop=True)
+
+    def _within(self, lat, lon, radius_km, limit=None):
+        idx = self._box(lat, lon, *self._radius_box(lat, radius_km))
+        dist = haversine_km(lat, lon, self.lat[idx], self.lon[idx])
+        keep = dist <= radius_km
+        idx, dist = idx[keep], dist[keep]
+        order = np.argsort(dist, kind="stable")[:limit]
+        return idx[order], dist[order]
+
+    @telemetry.timed("facilities.within")
+    def within(self, lat, lon, radius_km, limit=None):
+        """Facilities within radius_km, nearest first, as (positions, distances); see rows()."""
+        return self._within(lat, lon, radius_km, limit)
+
+    @telemetry.timed("facilities.nearest")
+    def nearest(self, lat, lon, k=10):
+        """The k nearest facilities, nearest first, as (positions, distances).
+
+        Grows a cell window until it holds k candidates, then re-queries the
+        circle through the k-th candidate so nothing just outside the window
+        can be missed.
+        """
+        k = min(k, len(self))
+        if k <= 0: return np.empty(0, dtype="int64"), np.empty(0)
+        span = self.cell
+        while True:
+            idx = self._box(lat, lon, span, span)
+            if len(idx) >= k or span >= 180: break
+            span *= 2
+        dist = haversine_km(lat, lon, self.lat[idx], self.lon[idx])
+        return self._within(lat, lon, float(np.partition(dist, k - 1)[k - 1]), limit=k)
+
+
+def build(source=SOURCE):
+    return FacilityIndex(load(source))
@@ -0,0 +1,60 @@
+import hashlib
+import io
+
+import PIL.Image
+import PIL.ImageOps
+
+# --- UPLOAD PREPROCESSING (downsample, strip EXIF, re-encode) ---
+MAX_SIDE = 1024
+THUMB_SIDE = 150
+OUTPUT_FORMAT = "WEBP"
+QUALITY = 82
+SESSION_SLOTS = 4
+
+MIME = {"WEBP": "image/webp", "JPEG": "image/jpeg", "PNG": "image/png"}
+
+
+class ProcessedImage:
+    def __init__(self, data, thumb, mime, size, source_bytes, source_hash):
+        self.data = data
+        self.thumb = thumb
+        self.mime = mime
+        self.size = size
+        self.source_bytes = source_bytes
+        self.source_hash = source_hash
+        self.hash = hashlib.sha256(data).hexdigest()
+
+    def blob(self):
+        """Inline part for generate_content; sent as-is, no re-encode by the SDK."""
+        return {"mime_type": self.mime, "data": self.data}
+
+
+def _encode(img, fmt, quality):
+    if fmt == "JPEG" and img.mode not in ("RGB", "L"): img = img.convert("RGB")
+    buf = io.BytesIO()
+    # No exif= argument, so metadata (GPS, device, timestamps) is dropped.
+    if fmt == "WEBP": img.save(buf, fmt, quality=quality, method=4)
+    else: img.save(buf, fmt, quality=quality, optimize=True)
+    return buf.getvalue()
+
+def preprocess(raw, max_side=MAX_SIDE, fmt=OUTPUT_FORMAT, quality=QUALITY, thumb_side=THUMB_SIDE, source_hash=None):
+    """Downsample, strip EXIF and re-encode raw upload bytes."""
+    src = PIL.Image.open(io.BytesIO(raw))
+    src.draft("RGB", (max_side, max_side))  # JPEG: decode at a reduced scale when possible
+    img = PIL.ImageOps.exif_transpose(src)
+    if img.mode not in ("RGB", "RGBA", "L"): img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+    img.thumbnail((max_side, max_side), PIL.Image.LANCZOS)
+    data = _encode(img, fmt, quality)
+    thumb = img.copy()
+    thumb.thumbnail((thumb_side, thumb_side), PIL.Image.LANCZOS)
+    return ProcessedImage(data, _encode(thumb, fmt, quality), MIME[fmt], img.size, len(raw),
+                          source_hash or hashlib.sha256(raw).hexdigest())
+
+def session_preprocess(state, raw, **opts):
+    """preprocess() memoized per session on the raw upload hash, keeping the last few uploads."""
+    slots = state.setdefault("img_cache", {})
+    key = hashlib.sha256(raw).hexdigest()
+    hit = slots.pop(key, None) or preprocess(raw, source_hash=key, **opts)
+    slots[key] = hit
+    while len(slots) > SESSION_SLOTS: slots.pop(next(iter(slots)))
+    return hit
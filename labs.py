@@ -0,0 +1,211 @@
+"""Lab result documents: content-addressed blob store plus background value extraction.
+
+Uploads are streamed to disk in fixed-size chunks while being hashed, and
+identical files are stored once. Text extraction and lab-value parsing run
+in a process pool (needs pypdf). Each worker writes its results straight to
+SQLite, so the Streamlit process never holds a parsed document.
+"""
+import datetime
+import hashlib
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import db
+import telemetry
+
+# --- LAB DOCUMENT PIPELINE ---
+BLOB_DIR = os.environ.get("MEDICARE_BLOBS", "lab_blobs")
+CHUNK = 1 << 20
+WORKERS = int(os.environ.get("MEDICARE_LAB_WORKERS", "2"))
+TASKS_PER_CHILD = 50
+MAX_PAGES = 500
+PAGE_BATCH = 10
+PENDING = ("queued", "running")
+
+_NUM = r"[<>]?\d+(?:[.,]\d+)?"
+# "Hemoglobin  13.5  g/dL  12.0 - 16.0  L"  /  "Glucose (fasting): 105 mg/dL (70-99) H"
+VALUE_LINE = re.compile(
+    rf"^(?P<test>[A-Za-z][A-Za-z0-9 ,()/%+\-.]*?[A-Za-z)%])\s*:?\s+"
+    rf"(?P<flag0>\b[HL]\b\s+)?(?P<value>{_NUM})\s*(?P<flag1>\b[HL]\b|\*)?\s*"
+    rf"(?P<unit>[xX]?10\^\d+/\S+|(?![\d<>(≤≥])[^\s()]+)?\s*"
+    rf"(?:\(?\s*(?:(?P<lo>{_NUM})\s*[-–]\s*(?P<hi>{_NUM})|[<≤]\s*(?P<hi1>{_NUM})|[>≥]\s*(?P<lo1>{_NUM}))\s*\)?)?\s*"
+    rf"(?P<flag2>\b[HL]\b|High|Low)?\s*$")
+_NOT_TESTS = r"(page|date|time|age|dob|phone|tel|fax|id|mrn|no|room|bed)"
+SKIP_TESTS = re.compile(rf"^{_NOT_TESTS}\b|\b{_NOT_TESTS}$", re.I)
+
+
+def init_labs():
+    with db.get_pool().write() as c:
+        c.execute('''CREATE TABLE IF NOT EXISTS lab_documents
+                     (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT, sha256 TEXT, filename TEXT,
+                      size INTEGER, uploaded TEXT, UNIQUE (username, sha256))''')
+        c.execute('''CREATE TABLE IF NOT EXISTS lab_jobs
+                     (sha256 TEXT PRIMARY KEY, status TEXT, pages INTEGER, n_values INTEGER, error TEXT,
+                      queued TEXT, finished TEXT)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS lab_values
+                     (sha256 TEXT, page INTEGER, test TEXT, value REAL, unit TEXT,
+                      ref_low REAL, ref_high REAL, flag TEXT)''')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_lab_values_sha ON lab_values(sha256, page)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_lab_values_test ON lab_values(test COLLATE NOCASE)')
+
+def blob_path(sha, root=None):
+    root = root or BLOB_DIR
+    return os.path.join(root, sha[:2], sha[2:] + ".pdf")
+
+@telemetry.timed("labs.store_blob")
+def store_blob(fileobj, root=None, chunk=CHUNK):
+    """Stream fileobj into the store; returns (sha256, size, stored) where stored is False for a duplicate."""
+    root = root or BLOB_DIR
+    os.makedirs(root, exist_ok=True)
+    h, size = hashlib.sha256(), 0
+    fd, tmp = tempfile.mkstemp(dir=root, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                buf = fileobj.read(chunk)
+                if not buf: break
+                h.update(buf)
+                out.write(buf)
+                size += len(buf)
+        sha = h.hexdigest()
+        path = blob_path(sha, root)
+        if os.path.exists(path):
+            os.remove(tmp)
+            return sha, size, False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp, path)
+        return sha, size, True
+    except BaseException:
+        if os.path.exists(tmp): os.remove(tmp)
+        raise
+
+def _now():
+    return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+def add_document(username, sha, filename, size):
+    with db.get_pool().write() as c:
+        c.execute('''INSERT INTO lab_documents(username, sha256, filename, size, uploaded) VALUES (?,?,?,?,?)
+                     ON CONFLICT(username, sha256) DO UPDATE SET filename=excluded.filename''',
+                  (username, sha, filename, size, _now()))
+
+
+def _number(text):
+    return float(text.lstrip("<>").replace(",", "."))
+
+def parse_values(text):
+    """Yield (test, value, unit, ref_low, ref_high, flag) for every line that looks like a lab result."""
+    for line in text.splitlines():
+        line = " ".join(line.split())
+        if len(line) > 160: continue
+        m = VALUE_LINE.match(line)
+        if not m or SKIP_TESTS.search(m["test"]): continue
+        value = _number(m["value"])
+        lo = _number(m["lo"] or m["lo1"]) if m["lo"] or m["lo1"] else None
+        hi = _number(m["hi"] or m["hi1"]) if m["hi"] or m["hi1"] else None
+        flag = (m["flag0"] or m["flag1"] or m["flag2"] or "").strip()[:1].upper() or None
+        if flag == "*": flag = None
+        if flag is None:
+            if lo is not None and value < lo: flag = "L"
+            elif hi is not None and value > hi: flag = "H"
+        yield m["test"].strip(" .:"), value, m["unit"], lo, hi, flag
+
+def extract(sha, path, db_path):
+    """Process-pool entry point: parse one blob page by page and record the results."""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise RuntimeError("Lab result extraction needs pypdf (pip install pypdf)")
+    pool = db.ConnectionPool(db_path)
+    try:
+        with pool.write() as c: c.execute("UPDATE lab_jobs SET status='running' WHERE sha256=?", (sha,))
+        reader = PdfReader(path)
+        pages, n = min(len(reader.pages), MAX_PAGES), 0
+        with pool.write() as c: c.execute("DELETE FROM lab_values WHERE sha256=?", (sha,))
+        for start in range(0, pages, PAGE_BATCH):
+            # Parse outside any transaction and write each batch in a short one, so
+            # a slow PDF never holds the writer lock other tables share.
+            rows = [(sha, i + 1, *v) for i in range(start, min(start + PAGE_BATCH, pages))
+                    for v in parse_values(reader.pages[i].extract_text() or "")]
+            with pool.write() as c: c.executemany("INSERT INTO lab_values VALUES (?,?,?,?,?,?,?,?)", rows)
+            n += len(rows)
+        with pool.write() as c:
+            c.execute("UPDATE lab_jobs SET status='done', pages=?, n_values=?, error=NULL, finished=? WHERE sha256=?",
+                      (pages, n, _now(), sha))
+        return pages, n
+    finally: pool.close_all()
+
+
+class Pipeline:
+    """Queues extraction jobs onto a process pool; one job per distinct blob."""
+
+    def __init__(self, workers=WORKERS, db_path=None, root=None):
+        self.workers = workers
+        self.db_path = db_path or db.get_pool().path
+        self.root = root or BLOB_DIR
+        self._executor = None
+        self._lock = threading.Lock()
+        # Jobs that were queued or mid-flight when the last process exited.
+        for (sha,) in db.get_pool().read("SELECT sha256 FROM lab_jobs WHERE status IN ('queued', 'running')"):
+            self._start(sha)
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that runs Streamlit's threads is unsafe.
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                                     max_tasks_per_child=TASKS_PER_CHILD)
+            return self._executor
+
+    def submit(self, sha, retry=False):
+        """Queue extraction for a blob unless it is already done or pending; returns True if queued."""
+        with db.get_pool().write() as c:
+            row = c.execute("SELECT status FROM lab_jobs WHERE sha256=?", (sha,)).fetchone()
+            if row and not (retry and row[0] == "failed"): return False
+            c.execute('''INSERT OR REPLACE INTO lab_jobs(sha256, status, queued) VALUES (?, 'queued', ?)''',
+                      (sha, _now()))
+        self._start(sha)
+        return True
+
+    def _start(self, sha):
+        fut = self._pool().submit(extract, sha, blob_path(sha, self.root), self.db_path)
+        fut.add_done_callback(lambda f: self._done(sha, f))
+
+    def _done(self, sha, fut):
+        err = fut.exception()
+        telemetry.incr("labs.failed" if err else "labs.extracted")
+        if err is None: return
+        with db.get_pool().write() as c:
+            c.execute("UPDATE lab_jobs SET status='failed', error=?, finished=? WHERE sha256=?",
+                      (str(err) or type(err).__name__, _now(), sha))
+
+    def close(self):
+        if self._executor is not None: self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def documents(username):
+    """(id, filename, size, uploaded, status, pages, n_values, error, sha256), newest first."""
+    return db.get_pool().read('''SELECT d.id, d.filename, d.size, d.uploaded, j.status, j.pages, j.n_values, j.error, d.sha256
+                                 FROM lab_documents d LEFT JOIN lab_jobs j ON j.sha256 = d.sha256
+                                 WHERE d.username=? ORDER BY d.id DESC''', (username,))
+
+def values(sha):
+    return db.get_pool().read('''SELECT page, test, value, unit, ref_low, ref_high, flag FROM lab_values
+                                 WHERE sha256=? ORDER BY page, rowid''', (sha,))
+
+def tests(username):
+    """Distinct tests across the user's documents with how many results each has."""
+    return db.get_pool().read('''SELECT v.test, COUNT(*) FROM lab_documents d JOIN lab_values v ON v.sha256 = d.sha256
+                                 JOIN lab_jobs j ON j.sha256 = d.sha256 AND j.status = 'done'
+                                 WHERE d.username=? GROUP BY v.test COLLATE NOCASE ORDER BY 2 DESC, 1''', (username,))
+
+def trend(username, test):
+    """(uploaded, value, unit, flag) for one test across the user's documents, oldest first."""
+    return db.get_pool().read('''SELECT d.uploaded, v.value, v.unit, v.flag FROM lab_documents d
+                                 JOIN lab_values v ON v.sha256 = d.sha256
+                                 JOIN lab_jobs j ON j.sha256 = d.sha256 AND j.status = 'done'
+                                 WHERE d.username=? AND v.test = ? COLLATE NOCASE ORDER BY d.uploaded''',
+                              (username, test))
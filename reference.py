@@ -0,0 +1,152 @@
+"""Medical reference store: an on-disk SQLite/FTS5 index built from a JSONL corpus.
+
+    python reference.py build [source.jsonl]
+
+Each source line is {"category": ..., "term": ..., "body": ...}. The index is
+rebuilt automatically when the source file is newer than it.
+"""
+import functools
+import json
+import os
+import re
+import sqlite3
+import sys
+
+import db
+import telemetry
+
+# --- MEDICAL REFERENCE STORE ---
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+SOURCE = os.environ.get("MEDICARE_REFERENCE", os.path.join(DATA_DIR, "encyclopedia.jsonl"))
+BUILD_BATCH = 5000
+BROWSE_PAGE = 20
+SEARCH_LIMIT = 25
+READONLY_PRAGMAS = ("PRAGMA query_only=ON", "PRAGMA cache_size=-8000", "PRAGMA mmap_size=268435456")
+
+
+def index_path(source=SOURCE):
+    return os.path.splitext(source)[0] + ".db"
+
+def _read_source(source):
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line: continue
+            e = json.loads(line)
+            yield e["category"].strip(), e["term"].strip(), e["body"].strip()
+
+def build_index(source=SOURCE, index=None):
+    """Stream the corpus into a fresh index file, then swap it in atomically."""
+    index = index or index_path(source)
+    tmp = f"{index}.building-{os.getpid()}"
+    if os.path.exists(tmp): os.remove(tmp)
+    conn = sqlite3.connect(tmp, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("BEGIN")
+    conn.execute("CREATE TABLE entries (id INTEGER PRIMARY KEY, category TEXT, term TEXT, body TEXT)")
+    rows, n = iter(_read_source(source)), 0
+    while True:
+        batch = [r for _, r in zip(range(BUILD_BATCH), rows)]
+        if not batch: break
+        conn.executemany("INSERT INTO entries(category, term, body) VALUES (?,?,?)", batch)
+        n += len(batch)
+    conn.execute("CREATE INDEX idx_entries_category_term ON entries(category, term COLLATE NOCASE)")
+    conn.execute('''CREATE VIRTUAL TABLE entries_fts USING fts5(term, body, content='entries', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2', prefix='2 3')''')
+    conn.execute("INSERT INTO entries_fts(entries_fts) VALUES ('rebuild')")
+    conn.execute("INSERT INTO entries_fts(entries_fts) VALUES ('optimize')")
+    conn.execute("CREATE VIRTUAL TABLE entries_vocab USING fts5vocab(entries_fts, 'row')")
+    conn.execute('''CREATE TABLE categories AS
+                    SELECT category, COUNT(*) AS entries FROM entries GROUP BY category ORDER BY category''')
+    conn.execute("COMMIT")
+    conn.execute("ANALYZE")
+    conn.close()
+    os.replace(tmp, index)
+    return n
+
+def ensure_index(source=SOURCE):
+    index = index_path(source)
+    if not os.path.exists(index) or os.path.getmtime(index) < os.path.getmtime(source):
+        build_index(source, index)
+    return index
+
+
+def _edit_distance(a, b, limit):
+    # Banded Levenshtein; returns limit + 1 as soon as the distance must exceed limit.
+    if abs(len(a) - len(b)) > limit: return limit + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+        if min(cur) > limit: return limit + 1
+        prev = cur
+    return prev[-1]
+
+
+class ReferenceStore:
+    """Read-only view of the index; only the rows a query returns are ever loaded."""
+
+    def __init__(self, source=SOURCE):
+        self.index = ensure_index(source)
+        self.pool = db.ConnectionPool(f"file:{self.index}?mode=ro", pragmas=READONLY_PRAGMAS, uri=True)
+        self.categories = self.pool.read("SELECT category, entries FROM categories")
+        self.expand = functools.lru_cache(maxsize=4096)(self._expand)
+
+    def browse(self, category, after=("", 0), limit=BROWSE_PAGE):
+        """Alphabetical keyset page of a category: (rows, next_cursor).
+
+        Terms repeat within a category, so the cursor is (term, id). The
+        plain term bound lets SQLite seek the index; the row value alone scans.
+        """
+        term, last = after
+        rows = self.pool.read('''SELECT id, term, body FROM entries
+                                 WHERE category=? AND term COLLATE NOCASE >= ? AND (term COLLATE NOCASE, id) > (?, ?)
+                                 ORDER BY term COLLATE NOCASE, id LIMIT ?''', (category, term, term, last, limit + 1))
+        if len(rows) > limit: return rows[:limit], (rows[limit - 1][1], rows[limit - 1][0])
+        return rows, None
+
+    def _vocab(self, sql, params):
+        return [r[0] for r in self.pool.read(sql, params)]
+
+    def _expand(self, token, last):
+        """FTS expression for one query token: exact, else prefix, else fuzzy (edit distance 1-2).
+
+        The last token is always prefix-matched so results follow the user's typing.
+        """
+        exact = bool(self._vocab("SELECT term FROM entries_vocab WHERE term=?", (token,)))
+        if exact and not last: return f'"{token}"'
+        if len(token) >= 2 and (exact or self._vocab("SELECT term FROM entries_vocab WHERE term > ? AND term < ? LIMIT 1",
+                                                     (token, token + "\uffff"))):
+            return f'"{token}"*'
+        if exact: return f'"{token}"'
+        limit = 1 if len(token) <= 5 else 2
+        cands = self._vocab('''SELECT term FROM entries_vocab WHERE term >= ? AND term < ?
+                               AND length(term) BETWEEN ? AND ? ORDER BY doc DESC''',
+                            (token[0], chr(ord(token[0]) + 1), len(token) - limit, len(token) + limit))
+        close = [c for c in cands if _edit_distance(token, c, limit) <= limit][:8]
+        return "(" + " OR ".join(f'"{c}"' for c in close) + ")" if close else None
+
+    @telemetry.timed("reference.search")
+    def search(self, text, category=None, limit=SEARCH_LIMIT):
+        tokens = re.findall(r"\w+", text.lower())
+        if not tokens: return []
+        parts = [self.expand(t, i == len(tokens) - 1) for i, t in enumerate(tokens)]
+        if None in parts: return []
+        sql = '''SELECT e.id, e.category, e.term, e.body FROM entries_fts
+                 CROSS JOIN entries e ON e.id = entries_fts.rowid
+                 WHERE entries_fts MATCH ?'''
+        params = [" AND ".join(parts)]
+        if category:
+            sql += " AND e.category = ?"
+            params.append(category)
+        sql += " ORDER BY bm25(entries_fts, 5.0, 1.0) LIMIT ?"
+        return self.pool.read(sql, params + [limit])
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "build":
+        src = sys.argv[2] if len(sys.argv) > 2 else SOURCE
+        print(f"indexed {build_index(src)} entries -> {index_path(src)}")
+    else: print(__doc__)
@@ -0,0 +1,262 @@
+"""Medication schedules, appointments and the reminder engine that fires them.
+
+Every schedule row carries its next due time (epoch seconds, NULL once it
+will never fire again) behind a partial index. The engine keeps only the
+next HORIZON seconds of due events in a heap. A tick pops what is due and
+advances those rows, so its cost depends on the events due, not on how many
+schedules exist. Reloading the window from the index is also how the
+engine recovers after a restart.
+"""
+import datetime
+import heapq
+import threading
+import time
+
+import db
+import telemetry
+
+# --- REMINDER ENGINE ---
+TICK = 1.0
+HORIZON = 600
+MAX_PER_TICK = 5000
+GRACE = 3600
+INBOX_LIMIT = 20
+MED, APPT = "med", "appt"
+_STALE = object()
+
+
+def init_reminders():
+    with db.get_pool().write() as c:
+        c.execute('''CREATE TABLE IF NOT EXISTS medications
+                     (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT, name TEXT, dose TEXT, times TEXT,
+                      start_date TEXT, end_date TEXT, next_due INTEGER)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS appointments
+                     (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT, practitioner TEXT, reason TEXT,
+                      at INTEGER, remind_before INTEGER, status TEXT DEFAULT 'scheduled', next_due INTEGER)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS dose_log
+                     (med_id INTEGER, due INTEGER, taken_at TEXT, PRIMARY KEY (med_id, due)) WITHOUT ROWID''')
+        c.execute('''CREATE TABLE IF NOT EXISTS reminders
+                     (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT, kind TEXT, ref_id INTEGER,
+                      due INTEGER, message TEXT, seen INTEGER DEFAULT 0)''')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_medications_next_due ON medications(next_due) WHERE next_due IS NOT NULL')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_medications_user ON medications(username, id)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_appointments_next_due ON appointments(next_due) WHERE next_due IS NOT NULL')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_appointments_user_at ON appointments(username, at)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_reminders_unseen ON reminders(username, id) WHERE seen = 0')
+
+
+def parse_times(text):
+    """'08:00, 20:30' -> ['08:00', '20:30'] (sorted, validated)."""
+    out = set()
+    for part in text.replace(";", ",").split(","):
+        part = part.strip()
+        if part: out.add(datetime.datetime.strptime(part, "%H:%M").strftime("%H:%M"))
+    if not out: raise ValueError("at least one dose time (HH:MM) is required")
+    return sorted(out)
+
+def next_dose(times, start_date, end_date, after):
+    """First dose time strictly after `after` (epoch s, local time) within [start_date, end_date], or None."""
+    day = max(datetime.date.fromisoformat(start_date), datetime.date.fromtimestamp(after))
+    last = datetime.date.fromisoformat(end_date) if end_date else None
+    slots = [datetime.time.fromisoformat(t) for t in times.split(",")]
+    for _ in range(2):
+        if last and day > last: return None
+        for t in slots:
+            ts = int(datetime.datetime.combine(day, t).timestamp())
+            if ts > after: return ts
+        day += datetime.timedelta(days=1)
+    return None
+
+def appointment_due(at, remind_before, now):
+    due = at - remind_before
+    return due if at > now else None
+
+def _label(ts):
+    return datetime.datetime.fromtimestamp(ts).strftime("%a %d %b, %H:%M")
+
+
+# --- SCHEDULE ACCESS ---
+def add_medication(username, name, dose, times, start_date, end_date=None, now=None):
+    times = ",".join(parse_times(times) if isinstance(times, str) else sorted(times))
+    due = next_dose(times, start_date, end_date, (now or time.time()) - 1)
+    with db.get_pool().write() as c:
+        cur = c.execute('''INSERT INTO medications(username, name, dose, times, start_date, end_date, next_due)
+                           VALUES (?,?,?,?,?,?,?)''', (username, name, dose, times, start_date, end_date, due))
+    return cur.lastrowid, due
+
+def delete_medication(username, med_id):
+    with db.get_pool().write() as c:
+        c.execute('DELETE FROM medications WHERE id=? AND username=?', (med_id, username))
+
+def medications(username):
+    """(id, name, dose, times, start_date, end_date, next_due), oldest first."""
+    return db.get_pool().read('''SELECT id, name, dose, times, start_date, end_date, next_due FROM medications
+                                 WHERE username=? ORDER BY id''', (username,))
+
+def doses_on(username, day):
+    """(med_id, name, dose, due, taken_at) for every dose scheduled on `day` (a date)."""
+    out = []
+    lo = int(datetime.datetime.combine(day, datetime.time()).timestamp())
+    for med_id, name, dose, times, start, end, _ in medications(username):
+        if day < datetime.date.fromisoformat(start) or (end and day > datetime.date.fromisoformat(end)): continue
+        for t in times.split(","):
+            out.append((med_id, name, dose, int(datetime.datetime.combine(day, datetime.time.fromisoformat(t)).timestamp())))
+    taken = dict(((m, d), at) for m, d, at in db.get_pool().read(
+        '''SELECT l.med_id, l.due, l.taken_at FROM dose_log l JOIN medications m ON m.id = l.med_id
+           WHERE m.username=? AND l.due >= ? AND l.due < ?''', (username, lo, lo + 86400)))
+    return sorted([(m, n, d, due, taken.get((m, due))) for m, n, d, due in out], key=lambda r: r[3])
+
+def mark_dose(med_id, due, taken):
+    with db.get_pool().write() as c:
+        if taken: c.execute('INSERT OR IGNORE INTO dose_log VALUES (?,?,?)',
+                           (med_id, due, datetime.datetime.now().strftime("%Y-%m-%d %H:%M")))
+        else: c.execute('DELETE FROM dose_log WHERE med_id=? AND due=?', (med_id, due))
+
+def add_appointment(username, practitioner, reason, at, remind_before=3600, now=None):
+    due = appointment_due(at, remind_before, now or time.time())
+    with db.get_pool().write() as c:
+        cur = c.execute('''INSERT INTO appointments(username, practitioner, reason, at, remind_before, next_due)
+                           VALUES (?,?,?,?,?,?)''', (username, practitioner, reason, at, remind_before, due))
+    return cur.lastrowid, due
+
+def cancel_appointment(username, appt_id):
+    with db.get_pool().write() as c:
+        c.execute("UPDATE appointments SET status='cancelled', next_due=NULL WHERE id=? AND username=?",
+                  (appt_id, username))
+
+def appointments(username):
+    """(id, practitioner, reason, at, status), soonest first."""
+    return db.get_pool().read('''SELECT id, practitioner, reason, at, status FROM appointments
+                                 WHERE username=? ORDER BY at''', (username,))
+
+def upcoming_appointments(username, now=None):
+    """(count, first `at`) of scheduled appointments still ahead."""
+    return db.get_pool().read('''SELECT COUNT(*), MIN(at) FROM appointments
+                                 WHERE username=? AND status='scheduled' AND at > ?''',
+                              (username, int(now or time.time())))[0]
+
+def unseen(username, limit=INBOX_LIMIT):
+    """Unseen reminders, oldest first, marked seen as they are returned."""
+    rows = db.get_pool().read('''SELECT id, kind, due, message FROM reminders WHERE username=? AND seen=0
+                                 ORDER BY id LIMIT ?''', (username, limit))
+    if rows:
+        with db.get_pool().write() as c: c.executemany('UPDATE reminders SET seen=1 WHERE id=?', [(r[0],) for r in rows])
+    return rows
+
+
+class ReminderEngine:
+    """Fires due medication doses and appointment reminders into the reminders inbox.
+
+    The heap holds every schedule due before `loaded_until`. Entries made
+    stale by edits are dropped when they fire, because the conditional
+    UPDATE on next_due no longer matches.
+    """
+
+    def __init__(self, horizon=HORIZON, tick=TICK, clock=time.time, grace=GRACE):
+        self.horizon = horizon
+        self.interval = tick
+        self.clock = clock
+        self.grace = grace
+        self._heap = []
+        self._lock = threading.Lock()
+        self.loaded_until = None
+        self.stats = {"fired": 0, "skipped_stale": 0, "skipped_late": 0, "loaded": 0, "ticks": 0}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._heap)
+
+    def _load(self, lo, hi):
+        # Range scans on the partial next_due indexes; lo=None also picks up anything overdue.
+        rows = []
+        for kind, table in ((MED, "medications"), (APPT, "appointments")):
+            if lo is None: sql, params = f'SELECT next_due, id FROM {table} WHERE next_due < ?', (hi,)
+            else: sql, params = f'SELECT next_due, id FROM {table} WHERE next_due >= ? AND next_due < ?', (lo, hi)
+            rows += [(due, kind, i) for due, i in db.get_pool().read(sql, params)]
+        with self._lock:
+            for item in rows: heapq.heappush(self._heap, item)
+            self.loaded_until = hi
+            self.stats["loaded"] += len(rows)
+        return len(rows)
+
+    @telemetry.timed("reminders.recover")
+    def recover(self, now=None):
+        """Rebuild the heap from the index: everything due within the horizon, including overdue rows."""
+        now = int(now if now is not None else self.clock())
+        with self._lock: self._heap = []
+        return self._load(None, now + self.horizon)
+
+    def notify(self, kind, ref_id, due):
+        """Tell the engine about a new or rescheduled row; later due times are picked up by the next refill."""
+        if due is None: return
+        with self._lock:
+            if self.loaded_until is not None and due < self.loaded_until:
+                heapq.heappush(self._heap, (due, kind, ref_id))
+
+    def _pop_due(self, now):
+        out = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now and len(out) < MAX_PER_TICK:
+                out.append(heapq.heappop(self._heap))
+        return out
+
+    def _fire(self, c, now, due, kind, ref_id):
+        if kind == MED:
+            row = c.execute('SELECT username, name, dose, times, start_date, end_date FROM medications WHERE id=? AND next_due=?',
+                            (ref_id, due)).fetchone()
+            if row is None: return _STALE
+            username, name, dose, times, start, end = row
+            nxt = next_dose(times, start, end, max(due, now - self.grace))
+            c.execute('UPDATE medications SET next_due=? WHERE id=?', (nxt, ref_id))
+            msg = f"Time for {name} {dose} ({_label(due)})"
+        else:
+            row = c.execute("SELECT username, practitioner, at FROM appointments WHERE id=? AND next_due=? AND status='scheduled'",
+                            (ref_id, due)).fetchone()
+            if row is None: return _STALE
+            username, practitioner, at = row
+            nxt = None
+            c.execute('UPDATE appointments SET next_due=NULL WHERE id=?', (ref_id,))
+            msg = f"Upcoming appointment with {practitioner} at {_label(at)}"
+        if due < now - self.grace:
+            # Long overdue (e.g. the server was down): advance without reminding.
+            self.stats["skipped_late"] += 1
+        else:
+            c.execute('INSERT INTO reminders(username, kind, ref_id, due, message) VALUES (?,?,?,?,?)',
+                      (username, kind, ref_id, due, msg))
+            self.stats["fired"] += 1
+        return nxt
+
+    def tick(self, now=None):
+        """Fire everything due at `now`; returns the number of events processed."""
+        now = int(now if now is not None else self.clock())
+        if self.loaded_until is None: self.recover(now)
+        elif now + self.horizon // 2 >= self.loaded_until: self._load(self.loaded_until, now + self.horizon)
+        due = self._pop_due(now)
+        self.stats["ticks"] += 1
+        if not due: return 0
+        with telemetry.timed("reminders.tick"):
+            requeue = []
+            with db.get_pool().write() as c:
+                for item in due:
+                    nxt = self._fire(c, now, *item)
+                    if nxt is _STALE: self.stats["skipped_stale"] += 1
+                    elif nxt is not None: requeue.append((nxt, item[1], item[2]))
+        for nxt, kind, ref_id in requeue: self.notify(kind, ref_id, nxt)
+        return len(due)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try: self.tick()
+            except Exception: telemetry.incr("reminders.errors")
+
+    def start(self):
+        if self._thread is None:
+            self.recover()
+            self._thread = threading.Thread(target=self._run, name="reminders", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None: self._thread.join(self.interval * 2)
@@ -0,0 +1,163 @@
+"""Re-shard MediCare Pro storage offline into a new hash-sharded layout.
+
+    python reshard.py --shards 8 --to shards8                          from the single file (MEDICARE_DB)
+    python reshard.py --shards 16 --to shards16 --from-dir shards8     from an existing sharded layout
+
+Stop the app first. Per-user tables and their daily rollups are copied to
+crc32(username) % N, and every registered user gets a route. Shared tables
+are copied as-is into the new catalog. The search index is rebuilt on the
+new shards. The source is left as it was, apart from its rollups being
+brought up to date first. When the copy finishes, set
+MEDICARE_STORAGE=sharded and MEDICARE_SHARD_DIR to the new directory.
+"""
+import argparse
+import os
+import sys
+import time
+
+import db
+import rollups
+import search
+
+# --- RESHARD (offline migration between storage layouts) ---
+CHUNK = 5000
+CATALOG_TABLES = ("shards", "routes")
+# Rebuilt on the target instead of copied (meta holds per-shard watermarks).
+DERIVED_TABLES = ("meta",)
+# Rollups are copied, not refolded, so archived consultations stay counted. The
+# SYSTEM rows of several source shards can land on one target shard, hence the upsert.
+ROLLUPS = {
+    "daily_usage": ("username, day", ("consultations", "screenings", "score_sum")),
+    "daily_categories": ("username, day, category", ("n",)),
+}
+
+
+def _columns(pool, table):
+    return [r[1] for r in pool.read(f"PRAGMA table_info({table})")]
+
+def _stream(pool, sql):
+    cur = pool.connection().execute(sql)
+    try:
+        while True:
+            rows = cur.fetchmany(CHUNK)
+            if not rows: return
+            yield rows
+    finally: cur.close()
+
+def copy_user_rows(source, target, table, progress=None):
+    """Copy one per-user table from every source shard to each row's target shard; returns rows copied."""
+    pools = [p for p in source.shards() if p.read("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,))]
+    if not pools: return 0
+    cols = _columns(pools[0], table)
+    sql = f"INSERT INTO {table}({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})"
+    if table in ROLLUPS:
+        key, sums = ROLLUPS[table]
+        sql += f" ON CONFLICT({key}) DO UPDATE SET " + ", ".join(f"{c} = {c} + excluded.{c}" for c in sums)
+    user = cols.index("username")
+    n = 0
+    for pool in pools:
+        for rows in _stream(pool, f"SELECT {', '.join(cols)} FROM {table}"):
+            groups = {}
+            for r in rows: groups.setdefault(target.shard_of(r[user]), []).append(r)
+            for k, part in groups.items():
+                with target.shards()[k].write() as c: c.executemany(sql, part)
+            n += len(rows)
+            if progress: progress(table, n)
+    return n
+
+def _shared_tables(pool):
+    skip = set(db.USER_TABLES) | set(ROLLUPS) | set(CATALOG_TABLES) | set(DERIVED_TABLES)
+    rows = pool.read("SELECT name, sql FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
+    # FTS5 shadow tables belong to the indexes, which are rebuilt per shard.
+    return [(name, sql) for name, sql in rows
+            if name not in skip and not name.startswith(("consultations_fts", "consultations_archive_fts"))]
+
+def copy_shared(source, target, progress=None):
+    """Recreate every shared table (schema, indexes, rows) in the target catalog; returns {table: rows}."""
+    tables = _shared_tables(source.main)
+    names = [name for name, _ in tables]
+    indexes = [sql for name, sql in source.main.read("SELECT tbl_name, sql FROM sqlite_master "
+                                                     "WHERE type='index' AND sql IS NOT NULL") if name in names]
+    with target.main.write() as c:
+        for _, sql in tables: c.execute(sql)
+        for sql in indexes: c.execute(sql)
+    counts = {}
+    for name in names:
+        cols = _columns(source.main, name)
+        sql = f"INSERT INTO {name}({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})"
+        counts[name] = 0
+        for rows in _stream(source.main, f"SELECT {', '.join(cols)} FROM {name}"):
+            with target.main.write() as c: c.executemany(sql, rows)
+            counts[name] += len(rows)
+            if progress: progress(name, counts[name])
+    # Keep AUTOINCREMENT counters too, so ids of deleted rows are never handed out again.
+    if source.main.read("SELECT 1 FROM sqlite_master WHERE name='sqlite_sequence'"):
+        seqs = [(seq, name, seq) for name, seq in source.main.read("SELECT name, seq FROM sqlite_sequence") if name in names]
+        if seqs:
+            with target.main.write() as c: c.executemany("UPDATE sqlite_sequence SET seq=? WHERE name=? AND seq < ?", seqs)
+    return counts
+
+def _count(backend, table):
+    return sum(pool.read(f"SELECT COUNT(*) FROM {table}")[0][0] for pool in backend.shards())
+
+def migrate(source, root, shards, progress=None):
+    """Copy `source` (a storage backend) into a new sharded layout under `root`; returns per-table row counts."""
+    if os.path.exists(os.path.join(root, db.CATALOG)): raise ValueError(f"{root} already holds a sharded layout")
+    t0 = time.perf_counter()
+    # Fold any pending rows on the source so the copied rollups cover every copied row.
+    db.set_backend(source)
+    rollups.init_rollups()
+    rollups.refresh(force=True)
+
+    target = db.set_backend(db.ShardedBackend(root, shards, getattr(source, "generation", 0) + 1))
+    db.init_db()
+    rollups.init_rollups()
+    counts = {t: copy_user_rows(source, target, t, progress) for t in db.USER_TABLES + tuple(ROLLUPS)}
+    users = [u for pool in target.shards() for (u,) in pool.read("SELECT username FROM users")]
+    with target.main.write() as c:
+        c.executemany("INSERT OR IGNORE INTO routes VALUES (?, ?)", [(u, target.shard_of(u)) for u in users])
+    counts.update(copy_shared(source, target, progress))
+    for pool in target.shards():
+        with pool.write() as c:
+            # Every copied row is already in the copied rollups.
+            for key, table in (("rollup_consultations_upto", "consultations"), ("rollup_mental_upto", "mental_logs")):
+                c.execute(f"INSERT OR REPLACE INTO meta VALUES (?, (SELECT COALESCE(MAX(id), 0) FROM {table}))", (key,))
+    db.init_db()
+    if search.fts5_available() and search.init_search():
+        while search.backfill_step(): pass
+
+    for table in db.USER_TABLES:
+        if _count(target, table) != counts[table]: raise RuntimeError(f"{table}: row count mismatch after copy")
+    counts["seconds"] = time.perf_counter() - t0
+    return counts
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Re-shard MediCare Pro storage into a new directory (offline).")
+    ap.add_argument("--to", required=True, help="new shard directory")
+    ap.add_argument("--shards", type=int, required=True)
+    src = ap.add_mutually_exclusive_group()
+    src.add_argument("--from-db", help="single-file source (default: MEDICARE_DB or medicare_pro.db)")
+    src.add_argument("--from-dir", help="sharded source directory")
+    args = ap.parse_args(argv)
+    if not 1 <= args.shards < 1 << db.SHARD_BITS: ap.error(f"--shards must be 1..{(1 << db.SHARD_BITS) - 1}")
+    if args.from_dir and not os.path.exists(os.path.join(args.from_dir, db.CATALOG)):
+        ap.error(f"{args.from_dir} has no {db.CATALOG}")
+    if not args.from_dir and not os.path.exists(args.from_db or db.DB_PATH): ap.error(f"{args.from_db or db.DB_PATH} not found")
+    source = db.ShardedBackend(args.from_dir) if args.from_dir else db.SQLiteBackend(args.from_db or db.DB_PATH)
+
+    last = [0.0]
+    def progress(table, n):
+        now = time.perf_counter()
+        if now - last[0] > 0.5:
+            last[0] = now
+            print(f"\r{table}: {n} rows", end="", file=sys.stderr, flush=True)
+
+    counts = migrate(source, args.to, args.shards, progress)
+    print(f"\rcopied in {counts.pop('seconds'):.1f}s to {args.shards} shards under {args.to}:", file=sys.stderr)
+    for table, n in counts.items(): print(f"  {table}: {n}", file=sys.stderr)
+    print(f"now run with MEDICARE_STORAGE=sharded MEDICARE_SHARD_DIR={args.to}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
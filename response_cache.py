@@ -0,0 +1,127 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import db
+import ai
+
+# --- AI RESPONSE CACHE (memory LRU in front of SQLite) ---
+MEM_ITEMS = 256
+TTL_SECONDS = 7 * 24 * 3600
+MAX_DISK_BYTES = 64 * 1024 * 1024
+PRUNE_EVERY = 50
+NAME_SLOT = "⟨patient⟩"
+
+SQL_CACHE_GET = 'SELECT answer, created FROM ai_cache WHERE key=?'
+SQL_CACHE_TOUCH = 'UPDATE ai_cache SET last_hit=?, hits=hits+1 WHERE key=?'
+SQL_CACHE_PUT = ('INSERT OR REPLACE INTO ai_cache(key, answer, created, last_hit, hits, size) '
+                 'VALUES (?,?,?,?,0,?)')
+
+
+def normalize(text):
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+def make_key(txt, image_hash=None):
+    """Key on the fixed doctor preamble + normalized symptoms (+ image content hash).
+
+    The patient name is deliberately left out so identical questions from
+    different patients share an entry; see anonymize()/personalize().
+    """
+    h = hashlib.sha256()
+    h.update(normalize(ai.DOCTOR_PREAMBLE + (ai.IMAGE_HINT if image_hash else "")).encode())
+    h.update(b"\0" + normalize(txt).encode())
+    if image_hash: h.update(b"\0" + image_hash.encode())
+    return h.hexdigest()
+
+def _name_parts(name):
+    return [t for t in re.findall(r"\w+", name or "") if len(t) > 1]
+
+def anonymize(answer, name):
+    """Swap the patient's name for NAME_SLOT, the full name first and then each part as a whole word.
+
+    Returns None when a name part still shows up in another form (e.g. a
+    different case), so the answer is never shared with other patients.
+    """
+    parts = _name_parts(name)
+    if not parts: return answer
+    answer = re.sub(r"\b" + r"\W+".join(map(re.escape, parts)) + r"\b", NAME_SLOT, answer)
+    answer = re.sub(r"\b(?:" + "|".join(map(re.escape, parts)) + r")\b", NAME_SLOT, answer)
+    if re.search(r"\b(?:" + "|".join(map(re.escape, parts)) + r")\b", answer, re.IGNORECASE): return None
+    return answer
+
+def personalize(answer, name):
+    return answer.replace(NAME_SLOT, name or "Patient")
+
+
+class ResponseCache:
+    def __init__(self, mem_items=MEM_ITEMS, ttl=TTL_SECONDS, max_bytes=MAX_DISK_BYTES):
+        self.mem_items = mem_items
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._mem = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.counters = {"mem_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        with db.get_pool().write() as c:
+            c.execute('''CREATE TABLE IF NOT EXISTS ai_cache
+                         (key TEXT PRIMARY KEY, answer TEXT, created REAL,
+                          last_hit REAL, hits INTEGER, size INTEGER)''')
+            c.execute('CREATE INDEX IF NOT EXISTS idx_ai_cache_last_hit ON ai_cache(last_hit)')
+
+    def _remember(self, key, answer, created):
+        with self._lock:
+            self._mem[key] = (answer, created)
+            self._mem.move_to_end(key)
+            while len(self._mem) > self.mem_items: self._mem.popitem(last=False)
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit and now - hit[1] < self.ttl:
+                self._mem.move_to_end(key)
+                self.counters["mem_hits"] += 1
+                return hit[0]
+            if hit: del self._mem[key]
+        rows = db.get_pool().read(SQL_CACHE_GET, (key,))
+        if rows and now - rows[0][1] < self.ttl:
+            with db.get_pool().write() as c: c.execute(SQL_CACHE_TOUCH, (now, key))
+            self._remember(key, rows[0][0], rows[0][1])
+            with self._lock: self.counters["disk_hits"] += 1
+            return rows[0][0]
+        with self._lock: self.counters["misses"] += 1
+        return None
+
+    def put(self, key, answer):
+        now = time.time()
+        with db.get_pool().write() as c:
+            c.execute(SQL_CACHE_PUT, (key, answer, now, now, len(answer.encode())))
+        self._remember(key, answer, now)
+        with self._lock:
+            self._puts += 1
+            due = self._puts % PRUNE_EVERY == 0
+        if due: self.prune()
+
+    def prune(self):
+        """Drop expired rows, then least-recently-hit rows until under max_bytes."""
+        pool = db.get_pool()
+        with pool.write() as c:
+            n = c.execute('DELETE FROM ai_cache WHERE created < ?', (time.time() - self.ttl,)).rowcount
+            total = c.execute('SELECT COALESCE(SUM(size), 0) FROM ai_cache').fetchone()[0]
+            while total > self.max_bytes:
+                victims = c.execute('SELECT key, size FROM ai_cache ORDER BY last_hit LIMIT 100').fetchall()
+                if not victims: break
+                c.executemany('DELETE FROM ai_cache WHERE key=?', [(k,) for k, _ in victims])
+                total -= sum(s for _, s in victims)
+                n += len(victims)
+        with self._lock: self.counters["evictions"] += n
+        return n
+
+    def stats(self):
+        with self._lock:
+            out = dict(self.counters, mem_items=len(self._mem))
+        lookups = out["mem_hits"] + out["disk_hits"] + out["misses"]
+        out["hit_rate"] = (out["mem_hits"] + out["disk_hits"]) / lookups if lookups else 0.0
+        return out
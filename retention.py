@@ -0,0 +1,208 @@
+"""Consultation retention: compress old consultations into an archive table and reclaim the space.
+
+    python retention.py run [--days 180]        archive, then incremental vacuum
+    python retention.py report                  space used, reclaimed and history read latency
+    python retention.py vacuum --full           one-time switch of an older file to auto_vacuum=INCREMENTAL
+
+Rows older than the retention age move, oldest id first and in short
+transactions, into consultations_archive with question and answer
+compressed (zlib, or zstd when MEDICARE_ARCHIVE_CODEC=zstd and zstandard is
+installed). History reads in db.py decompress them transparently, and
+search.py indexes the archive separately so Records search still finds
+them. Freed pages are handed back to the filesystem
+with PRAGMA incremental_vacuum a few at a time.
+"""
+import argparse
+import datetime
+import os
+import threading
+import time
+
+import db
+import rollups
+import search
+import telemetry
+
+# --- RETENTION & ARCHIVAL ---
+RETENTION_DAYS = int(os.environ.get("MEDICARE_RETENTION_DAYS", "180"))
+RUN_EVERY = float(os.environ.get("MEDICARE_RETENTION_EVERY", str(6 * 3600)))
+BATCH = 500
+VACUUM_PAGES = 1000
+PAUSE = 0.05
+AUTO_VACUUM = {0: "none", 1: "full", 2: "incremental"}
+
+_run_lock = threading.Lock()
+LAST_RUN = {}
+
+
+def _cutoff(days, now=None):
+    return ((now or datetime.datetime.now()) - datetime.timedelta(days=days)).strftime("%Y-%m-%d %H:%M")
+
+def _ceiling(c):
+    # Rows the FTS backfill has not reached were never indexed; deleting them
+    # would hand the index's delete trigger terms it never saw, so they wait.
+    if not c.execute("SELECT 1 FROM sqlite_master WHERE name='consultations_fts'").fetchone(): return None
+    nxt, end = search.backfill_bounds(c)
+    return nxt if nxt < end else None
+
+def archive_step(pool, cutoff, after=0, batch=BATCH, codec=None):
+    """Archive the next batch of the shard's rows dated before cutoff with id > after.
+
+    Returns (moved, last_id, raw_bytes, stored_bytes); moved is 0 once the
+    oldest remaining live row is inside the retention window.
+    """
+    codec = codec or db.archive_codec()
+    ceiling = _ceiling(pool.connection())
+    # Ids grow with dates, so walking the primary key finds old rows without a date index.
+    rows = pool.read('SELECT id, username, date, question, answer FROM consultations WHERE id > ? ORDER BY id LIMIT ?',
+                     (after, batch))
+    rows = [r for r in rows if r[2] < cutoff and (ceiling is None or r[0] <= ceiling)]
+    if not rows: return 0, after, 0, 0
+    # Compress outside the write lock; consultations are never updated in place.
+    packed = [(i, u, d, codec, db.pack(q, codec), db.pack(a, codec), len((q or "").encode()) + len((a or "").encode()))
+              for i, u, d, q, a in rows]
+    with pool.write() as c:
+        c.executemany('INSERT OR IGNORE INTO consultations_archive VALUES (?,?,?,?,?,?,?)', packed)
+        c.executemany('DELETE FROM consultations WHERE id=?', [(r[0],) for r in rows])
+    raw = sum(p[6] for p in packed)
+    stored = sum(len(p[4] or b"") + len(p[5] or b"") for p in packed)
+    return len(rows), rows[-1][0], raw, stored
+
+def vacuum_step(pool, pages=VACUUM_PAGES):
+    """Return up to `pages` free pages to the filesystem; returns pages freed (0 if none or not incremental)."""
+    with pool.write() as c:
+        before = c.execute('PRAGMA freelist_count').fetchone()[0]
+        if not before: return 0
+        c.execute(f'PRAGMA incremental_vacuum({int(pages)})').fetchall()
+        return before - c.execute('PRAGMA freelist_count').fetchone()[0]
+
+def full_vacuum():
+    """Rewrite every file with auto_vacuum=INCREMENTAL; blocks writers to each file while it runs."""
+    db.flush_writes()
+    modes = set()
+    for pool in db.get_backend().pools():
+        c = pool.connection()
+        c.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        c.execute('VACUUM')
+        modes.add(AUTO_VACUUM[c.execute('PRAGMA auto_vacuum').fetchone()[0]])
+    return ", ".join(sorted(modes))
+
+def _file_bytes():
+    paths = [pool.path for pool in db.get_backend().pools()]
+    return sum(os.path.getsize(p) for path in paths for p in (path, path + "-wal") if os.path.exists(p))
+
+@telemetry.timed("db.retention.run")
+def run(days=RETENTION_DAYS, batch=BATCH, pause=PAUSE, now=None):
+    """One archival pass followed by incremental vacuum; returns the run's stats (also kept in LAST_RUN)."""
+    if not _run_lock.acquire(blocking=False): return None
+    try:
+        db.flush_writes()
+        # The rollups fold from the live tables only, so count every row before any of it moves.
+        rollups.refresh(force=True)
+        stats = {"started": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "cutoff": _cutoff(days, now),
+                 "codec": db.archive_codec(), "archived": 0, "raw_bytes": 0, "stored_bytes": 0,
+                 "pages_freed": 0, "bytes_reclaimed": 0, "file_bytes_before": _file_bytes()}
+        t0 = time.perf_counter()
+        for pool in db.shard_pools():
+            after = 0
+            while True:
+                n, after, raw, stored = archive_step(pool, stats["cutoff"], after, batch, stats["codec"])
+                if not n: break
+                stats["archived"] += n
+                stats["raw_bytes"] += raw
+                stats["stored_bytes"] += stored
+                time.sleep(pause)
+            page_size = pool.read('PRAGMA page_size')[0][0]
+            while True:
+                freed = vacuum_step(pool)
+                if not freed: break
+                stats["pages_freed"] += freed
+                stats["bytes_reclaimed"] += freed * page_size
+                time.sleep(pause)
+            # Truncate the WAL too, or the pages just copied into it keep the disk usage up.
+            pool.connection().execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchall()
+        stats["file_bytes_after"] = _file_bytes()
+        stats["seconds"] = time.perf_counter() - t0
+        telemetry.incr("retention.archived", stats["archived"])
+        LAST_RUN.clear()
+        LAST_RUN.update(stats)
+        return stats
+    finally: _run_lock.release()
+
+def start(every=RUN_EVERY, days=RETENTION_DAYS):
+    """Run archival on a daemon thread every `every` seconds, starting with one pass now."""
+    def loop():
+        while True:
+            try: run(days)
+            except Exception as e:
+                telemetry.incr("retention.failed")
+                LAST_RUN["error"] = repr(e)
+            time.sleep(every)
+    t = threading.Thread(target=loop, name="retention", daemon=True)
+    t.start()
+    return t
+
+
+def report():
+    """Space accounting summed over every database file plus history read latency from telemetry. Scans both tables."""
+    backend = db.get_backend()
+    pages = free = 0
+    for pool in backend.pools():
+        pages += pool.read('PRAGMA page_count')[0][0]
+        free += pool.read('PRAGMA freelist_count')[0][0]
+    live, arch = [0, 0], [0, 0, 0, None]
+    for pool in backend.shards():
+        n, size = pool.read('SELECT COUNT(*), COALESCE(SUM(length(CAST(question AS BLOB)) + length(CAST(answer AS BLOB))), 0) '
+                            'FROM consultations')[0]
+        live = [live[0] + n, live[1] + size]
+        row = pool.read('SELECT COUNT(*), COALESCE(SUM(raw_bytes), 0), COALESCE(SUM(length(question) + length(answer)), 0), '
+                        'MAX(date) FROM consultations_archive')[0]
+        arch = [x + y for x, y in zip(arch[:3], row[:3])] + [max(filter(None, (arch[3], row[3])), default=None)]
+    hists = telemetry.snapshot()["histograms"]
+    latency = {name: {k: round(hists[name][k], 2) for k in ("count", "p50", "p95")}
+               for name in ("db.get_history_chat", "db.get_history_chat_page") if name in hists}
+    return {
+        "storage": backend.kind, "files": len(backend.pools()), "file_bytes": _file_bytes(),
+        "page_size": backend.main.read('PRAGMA page_size')[0][0], "pages": pages, "free_pages": free,
+        "auto_vacuum": AUTO_VACUUM[backend.main.read('PRAGMA auto_vacuum')[0][0]],
+        "live_rows": live[0], "live_text_bytes": live[1],
+        "archived_rows": arch[0], "archived_raw_bytes": arch[1], "archived_stored_bytes": arch[2],
+        "compression_ratio": round(arch[1] / arch[2], 2) if arch[2] else None, "newest_archived": arch[3],
+        "retention_days": RETENTION_DAYS, "last_run": dict(LAST_RUN), "read_latency_ms": latency,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Archive old consultations and reclaim database space.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run")
+    r.add_argument("--days", type=int, default=RETENTION_DAYS)
+    r.add_argument("--batch", type=int, default=BATCH)
+    sub.add_parser("report")
+    v = sub.add_parser("vacuum")
+    v.add_argument("--full", action="store_true", help="rewrite the file to enable incremental vacuum")
+    ap.add_argument("--db", help="database path (default: MEDICARE_DB or medicare_pro.db)")
+    args = ap.parse_args(argv)
+    if args.db: db.set_pool(db.ConnectionPool(args.db))
+    db.init_db()
+    rollups.init_rollups()
+    if args.cmd == "run":
+        s = run(args.days, args.batch, pause=0)
+        print(f"archived {s['archived']} rows ({s['raw_bytes'] / 2 ** 20:.1f} MB -> {s['stored_bytes'] / 2 ** 20:.1f} MB), "
+              f"reclaimed {s['bytes_reclaimed'] / 2 ** 20:.1f} MB in {s['seconds']:.2f}s")
+    elif args.cmd == "vacuum":
+        if args.full: print(f"auto_vacuum={full_vacuum()}")
+        else:
+            n = 0
+            for pool in db.get_backend().pools():
+                while True:
+                    freed = vacuum_step(pool)
+                    if not freed: break
+                    n += freed
+            print(f"freed {n} pages")
+    else:
+        for k, v in report().items(): print(f"{k}: {v}")
+
+
+if __name__ == "__main__":
+    main()
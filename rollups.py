@@ -0,0 +1,90 @@
+import threading
+import time
+
+import db
+import telemetry
+
+# --- DAILY ROLLUPS (incremental, watermark-driven) ---
+SYSTEM = "*"
+REFRESH_EVERY = 5.0
+
+_refresh_lock = threading.Lock()
+_last_refresh = 0.0
+
+
+def init_rollups():
+    # Rollups live next to their source rows on every shard, so a fold and its watermark commit together.
+    for pool in db.shard_pools():
+        with pool.write() as c:
+            c.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+            c.execute('''CREATE TABLE IF NOT EXISTS daily_usage
+                         (day TEXT, username TEXT, consultations INTEGER DEFAULT 0, screenings INTEGER DEFAULT 0,
+                          score_sum INTEGER DEFAULT 0, PRIMARY KEY (username, day)) WITHOUT ROWID''')
+            c.execute('''CREATE TABLE IF NOT EXISTS daily_categories
+                         (day TEXT, username TEXT, category TEXT, n INTEGER DEFAULT 0,
+                          PRIMARY KEY (username, day, category)) WITHOUT ROWID''')
+
+def _watermark(c, key):
+    row = c.execute('SELECT value FROM meta WHERE key=?', (key,)).fetchone()
+    return int(row[0]) if row else 0
+
+def _fold(c, table, key, statements):
+    lo = _watermark(c, key)
+    hi = c.execute(f'SELECT COALESCE(MAX(id), 0) FROM {table}').fetchone()[0]
+    if hi <= lo: return 0
+    for sql in statements:
+        for who in ("username", f"'{SYSTEM}'"): c.execute(sql.format(who=who), (lo, hi))
+    c.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', (key, str(hi)))
+    return hi - lo
+
+_CONSULT_SQL = ['''INSERT INTO daily_usage(day, username, consultations)
+                   SELECT substr(date, 1, 10), {who}, COUNT(*) FROM consultations WHERE id > ? AND id <= ? GROUP BY 1, 2
+                   ON CONFLICT(username, day) DO UPDATE SET consultations = consultations + excluded.consultations''']
+_MENTAL_SQL = ['''INSERT INTO daily_usage(day, username, screenings, score_sum)
+                  SELECT substr(date, 1, 10), {who}, COUNT(*), SUM(score) FROM mental_logs WHERE id > ? AND id <= ? GROUP BY 1, 2
+                  ON CONFLICT(username, day) DO UPDATE SET screenings = screenings + excluded.screenings,
+                                                           score_sum = score_sum + excluded.score_sum''',
+               '''INSERT INTO daily_categories(day, username, category, n)
+                  SELECT substr(date, 1, 10), {who}, category, COUNT(*) FROM mental_logs WHERE id > ? AND id <= ? GROUP BY 1, 2, 3
+                  ON CONFLICT(username, day, category) DO UPDATE SET n = n + excluded.n''']
+
+@telemetry.timed("db.rollups.refresh")
+def refresh(force=False):
+    """Fold rows written since the last watermark into the rollups; returns rows folded.
+
+    Runs at most once per REFRESH_EVERY seconds per process unless forced.
+    """
+    global _last_refresh
+    if not force and time.monotonic() - _last_refresh < REFRESH_EVERY: return 0
+    if not _refresh_lock.acquire(blocking=force): return 0
+    try:
+        n = 0
+        for pool in db.shard_pools():
+            with pool.write() as c:
+                n += _fold(c, "consultations", "rollup_consultations_upto", _CONSULT_SQL)
+                n += _fold(c, "mental_logs", "rollup_mental_upto", _MENTAL_SQL)
+        _last_refresh = time.monotonic()
+        return n
+    finally: _refresh_lock.release()
+
+def _read(username, sql, params):
+    """A user's rows from their shard; SYSTEM rows from every shard, to be merged by the caller."""
+    if username != SYSTEM: return db.pool_for(username).read(sql, params)
+    return [r for pool in db.shard_pools() for r in pool.read(sql, params)]
+
+def usage(username, since):
+    """Daily rows (day, consultations, screenings, score_sum) from `since` (YYYY-MM-DD) on."""
+    rows = _read(username, '''SELECT day, consultations, screenings, score_sum FROM daily_usage
+                               WHERE username=? AND day >= ? ORDER BY day''', (username, since))
+    if len(db.shard_pools()) == 1 or username != SYSTEM: return rows
+    days = {}
+    for day, *counts in rows: days[day] = [a + b for a, b in zip(days.get(day, (0, 0, 0)), counts)]
+    return [(day, *days[day]) for day in sorted(days)]
+
+def categories(username, since):
+    rows = _read(username, '''SELECT category, SUM(n) FROM daily_categories
+                               WHERE username=? AND day >= ? GROUP BY category ORDER BY 2 DESC''', (username, since))
+    if len(db.shard_pools()) == 1 or username != SYSTEM: return rows
+    totals = {}
+    for cat, n in rows: totals[cat] = totals.get(cat, 0) + n
+    return sorted(totals.items(), key=lambda kv: -kv[1])
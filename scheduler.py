@@ -0,0 +1,277 @@
+import atexit
+import hashlib
+import os
+import queue
+import random
+import threading
+import time
+
+import ai
+import telemetry
+
+# --- AI REQUEST SCHEDULER (shared worker pool in front of Gemini) ---
+WORKERS = int(os.environ.get("MEDICARE_AI_WORKERS", "4"))
+MAX_QUEUE = 64
+RATE_PER_MIN = float(os.environ.get("MEDICARE_AI_RATE", "10"))
+BURST = int(os.environ.get("MEDICARE_AI_BURST", "5"))
+DEADLINE = 90.0
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+MAX_BUCKETS = 10000
+
+# google.api_core exception names / HTTP codes worth retrying (quota and transient server errors).
+RETRYABLE = {"ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+             "DeadlineExceeded", "Aborted"}
+RETRYABLE_CODES = {429, 500, 502, 503, 504}
+
+_STOP = object()
+
+
+class SchedulerError(Exception):
+    pass
+
+class RateLimited(SchedulerError):
+    def __init__(self, retry_after):
+        super().__init__(f"rate limited, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+class Overloaded(SchedulerError):
+    pass
+
+class DeadlineExceeded(SchedulerError):
+    pass
+
+
+def is_retryable(exc):
+    if type(exc).__name__ in RETRYABLE: return True
+    return getattr(exc, "code", None) in RETRYABLE_CODES
+
+def prompt_key(content):
+    """Stable hash of a generate_content payload (text parts and inline blobs)."""
+    h = hashlib.sha256()
+    for part in content if isinstance(content, (list, tuple)) else [content]:
+        if isinstance(part, dict): h.update(part.get("mime_type", "").encode() + b"\0" + bytes(part.get("data", b"")))
+        elif isinstance(part, bytes): h.update(part)
+        else: h.update(str(part).encode("utf-8"))
+        h.update(b"\x1e")
+    return h.hexdigest()
+
+
+class TokenBucket:
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.stamp = now
+
+    def take(self, now):
+        """Spend one token; returns 0 on success, else seconds until one is available."""
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class _Job:
+    __slots__ = ("key", "content", "deadline", "submitted", "chunks", "done", "error", "subscribers",
+                 "cancelled", "cond")
+
+    def __init__(self, key, content, deadline):
+        self.key = key
+        self.content = content
+        self.deadline = deadline
+        self.submitted = time.monotonic()
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.subscribers = 1
+        self.cancelled = False
+        self.cond = threading.Condition()
+
+
+class Scheduler:
+    """Process-wide front door to the model.
+
+    A bounded queue feeds a fixed pool of workers, so concurrent upstream
+    calls never exceed `workers`. Each user has a token bucket. Identical
+    in-flight prompts share one upstream stream, and every subscriber replays
+    its chunks from the start. A job is cancelled once its last subscriber
+    leaves. Quota and transient errors are retried with full-jitter
+    exponential backoff, but only before the first chunk and only within
+    the job's deadline.
+    """
+
+    def __init__(self, model, workers=WORKERS, maxsize=MAX_QUEUE, rate_per_min=RATE_PER_MIN, burst=BURST,
+                 deadline=DEADLINE, max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE, backoff_cap=BACKOFF_CAP):
+        self.model = model
+        self.rate = rate_per_min / 60
+        self.burst = burst
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._q = queue.Queue(maxsize)
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._buckets = {}
+        self.busy = 0
+        self.stats = {"submitted": 0, "coalesced": 0, "completed": 0, "failed": 0, "retries": 0,
+                      "rate_limited": 0, "rejected": 0, "expired": 0, "cancelled": 0, "last_error": None}
+        self._threads = [threading.Thread(target=self._run, name=f"ai-worker-{i}", daemon=True) for i in range(workers)]
+        for t in self._threads: t.start()
+        atexit.register(self.close)
+
+    def depth(self):
+        return self._q.qsize()
+
+    def snapshot(self):
+        with self._lock:
+            return {**self.stats, "queued": self._q.qsize(), "busy": self.busy, "workers": len(self._threads),
+                    "in_flight": len(self._inflight)}
+
+    def _count(self, key, error=None):
+        with self._lock:
+            self.stats[key] += 1
+            if error is not None: self.stats["last_error"] = repr(error)
+
+    def _bucket(self, username, now):
+        b = self._buckets.get(username)
+        if b is None:
+            if len(self._buckets) >= MAX_BUCKETS:
+                # Buckets that would have refilled completely carry no state worth keeping.
+                idle = self.burst / self.rate
+                self._buckets = {u: x for u, x in self._buckets.items() if now - x.stamp < idle}
+            b = self._buckets[username] = TokenBucket(self.rate, self.burst, now)
+        return b
+
+    def _submit(self, username, content, timeout):
+        key = prompt_key(content)
+        now = time.monotonic()
+        with self._lock:
+            job = self._inflight.get(key)
+            if job is not None:
+                with job.cond:
+                    if not job.cancelled and not job.done:
+                        job.subscribers += 1
+                        self.stats["coalesced"] += 1
+                        return job
+            bucket = self._bucket(username, now)
+            wait = bucket.take(now)
+            if wait:
+                self.stats["rate_limited"] += 1
+                raise RateLimited(wait)
+            job = _Job(key, content, now + timeout)
+            try: self._q.put_nowait(job)
+            except queue.Full:
+                bucket.tokens += 1
+                self.stats["rejected"] += 1
+                raise Overloaded("AI request queue is full")
+            self._inflight[key] = job
+            self.stats["submitted"] += 1
+        return job
+
+    def _leave(self, job):
+        with job.cond:
+            job.subscribers -= 1
+            if job.subscribers > 0 or job.done: return
+            job.cancelled = True
+        with self._lock:
+            if self._inflight.get(job.key) is job: del self._inflight[job.key]
+
+    def stream(self, username, content, stats, timeout=None):
+        """Yield answer chunks through the shared pool (ai.stream_reply is the direct, unscheduled equivalent).
+
+        Raises RateLimited / Overloaded on admission, DeadlineExceeded if the
+        answer does not finish in time, or the model's own error.
+        """
+        job = self._submit(username, content, timeout or self.deadline)
+        seen = 0
+        try:
+            while True:
+                with job.cond:
+                    job.cond.wait_for(lambda: seen < len(job.chunks) or job.done,
+                                      max(0.0, job.deadline - time.monotonic()))
+                    new, done, error = job.chunks[seen:], job.done, job.error
+                for text in new:
+                    if stats.ttft is None: stats.ttft = time.perf_counter() - stats.started
+                    stats.chunks += 1
+                    seen += 1
+                    yield text
+                if done:
+                    if error is not None: raise error
+                    stats.completed = True
+                    return
+                if not new and time.monotonic() >= job.deadline:
+                    raise DeadlineExceeded(f"no answer within {timeout or self.deadline:g}s")
+        finally:
+            ai.finish_stats(stats)
+            self._leave(job)
+
+    def _finish(self, job, error=None):
+        with job.cond:
+            job.error = error
+            job.done = True
+            job.cond.notify_all()
+
+    def _attempt(self, job):
+        resp = self.model.generate_content(job.content, stream=True)
+        for chunk in resp:
+            text = chunk.text
+            if not text: continue
+            with job.cond:
+                job.chunks.append(text)
+                job.cond.notify_all()
+            if job.cancelled or time.monotonic() >= job.deadline:
+                ai.cancel_stream(resp)
+                return
+
+    def _execute(self, job):
+        attempt = 0
+        while True:
+            if job.cancelled: return self._count("cancelled")
+            if time.monotonic() >= job.deadline:
+                self._count("expired")
+                return self._finish(job, DeadlineExceeded("deadline passed before the model answered"))
+            try:
+                self._attempt(job)
+            except Exception as e:
+                # Retrying after chunks went out would duplicate text for subscribers.
+                delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+                if job.chunks or not is_retryable(e) or attempt >= self.max_retries \
+                        or time.monotonic() + delay >= job.deadline:
+                    self._count("failed", e)
+                    return self._finish(job, e)
+                # Backing off on the worker also throttles upstream while quota is exhausted.
+                attempt += 1
+                self._count("retries", e)
+                time.sleep(delay)
+                continue
+            if job.cancelled: return self._count("cancelled")
+            if time.monotonic() >= job.deadline and not job.done:
+                self._count("expired")
+                return self._finish(job, DeadlineExceeded("answer did not finish before the deadline"))
+            self._count("completed")
+            return self._finish(job)
+
+    def _run(self):
+        while True:
+            job = self._q.get()
+            if job is _STOP: return
+            telemetry.observe("ai.queue_wait", (time.monotonic() - job.submitted) * 1000)
+            with self._lock: self.busy += 1
+            try: self._execute(job)
+            except Exception as e: self._finish(job, e)
+            finally:
+                with self._lock:
+                    self.busy -= 1
+                    if self._inflight.get(job.key) is job: del self._inflight[job.key]
+
+    def close(self, timeout=1.0):
+        alive = [t for t in self._threads if t.is_alive()]
+        for _ in alive:
+            try: self._q.put(_STOP, timeout=timeout)
+            except queue.Full: break
+        for t in alive: t.join(timeout)
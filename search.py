@@ -0,0 +1,159 @@
+import html
+import re
+import sqlite3
+import threading
+import time
+
+import db
+import telemetry
+
+# --- FULL-TEXT SEARCH OVER CONSULTATIONS (SQLite FTS5) ---
+# Queries CROSS JOIN from the FTS table so SQLite evaluates MATCH once instead
+# of probing it per consultation row of the user.
+BACKFILL_BATCH = 5000
+BACKFILL_PAUSE = 0.05
+SEARCH_PAGE = 10
+_HL_OPEN, _HL_CLOSE = "\x02", "\x03"
+
+# Archived rows have their own index (see _init_index); both are searched and
+# ranked together. bm25 statistics are per index, so ranks across them are approximate.
+SQL_SEARCH = f'''SELECT * FROM (
+                   SELECT c.id, c.date,
+                          highlight(consultations_fts, 1, '{_HL_OPEN}', '{_HL_CLOSE}'),
+                          snippet(consultations_fts, 2, '{_HL_OPEN}', '{_HL_CLOSE}', ' … ', 48),
+                          bm25(consultations_fts, 0.0, 2.0, 1.0)
+                   FROM consultations_fts CROSS JOIN consultations c ON c.id = consultations_fts.rowid
+                   WHERE consultations_fts MATCH :q AND c.username = :user
+                   UNION ALL
+                   SELECT a.id, a.date,
+                          highlight(consultations_archive_fts, 1, '{_HL_OPEN}', '{_HL_CLOSE}'),
+                          snippet(consultations_archive_fts, 2, '{_HL_OPEN}', '{_HL_CLOSE}', ' … ', 48),
+                          bm25(consultations_archive_fts, 0.0, 2.0, 1.0)
+                   FROM consultations_archive_fts CROSS JOIN consultations_archive a ON a.id = consultations_archive_fts.rowid
+                   WHERE consultations_archive_fts MATCH :q AND a.username = :user)
+                 ORDER BY 5 LIMIT :n OFFSET :offset'''
+SQL_COUNT = '''SELECT (SELECT COUNT(*) FROM consultations_fts CROSS JOIN consultations c ON c.id = consultations_fts.rowid
+                       WHERE consultations_fts MATCH :q AND c.username = :user)
+                    + (SELECT COUNT(*) FROM consultations_archive_fts
+                       CROSS JOIN consultations_archive a ON a.id = consultations_archive_fts.rowid
+                       WHERE consultations_archive_fts MATCH :q AND a.username = :user)'''
+
+def fts5_available():
+    try:
+        sqlite3.connect(":memory:").execute("CREATE VIRTUAL TABLE t USING fts5(x)")
+        return True
+    except sqlite3.OperationalError: return False
+
+def init_search():
+    """Create the FTS index and sync triggers on every shard; returns True if a backfill is pending."""
+    for pool in db.shard_pools(): _init_index(pool)
+    return backfill_remaining() > 0
+
+def _init_index(pool):
+    with pool.write() as c:
+        c.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        exists = c.execute("SELECT 1 FROM sqlite_master WHERE name='consultations_fts'").fetchone()
+        c.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS consultations_fts USING fts5(
+                         username, question, answer, content='consultations', content_rowid='id',
+                         tokenize='unicode61 remove_diacritics 2', prefix='2 3')''')
+        c.execute('''CREATE TRIGGER IF NOT EXISTS consultations_fts_ai AFTER INSERT ON consultations BEGIN
+                         INSERT INTO consultations_fts(rowid, username, question, answer)
+                         VALUES (new.id, new.username, new.question, new.answer);
+                     END''')
+        c.execute('''CREATE TRIGGER IF NOT EXISTS consultations_fts_ad AFTER DELETE ON consultations BEGIN
+                         INSERT INTO consultations_fts(consultations_fts, rowid, username, question, answer)
+                         VALUES ('delete', old.id, old.username, old.question, old.answer);
+                     END''')
+        c.execute('''CREATE TRIGGER IF NOT EXISTS consultations_fts_au AFTER UPDATE ON consultations BEGIN
+                         INSERT INTO consultations_fts(consultations_fts, rowid, username, question, answer)
+                         VALUES ('delete', old.id, old.username, old.question, old.answer);
+                         INSERT INTO consultations_fts(rowid, username, question, answer)
+                         VALUES (new.id, new.username, new.question, new.answer);
+                     END''')
+        # Archived rows are indexed through a view that decompresses them, so they stay
+        # searchable once retention.py moves them out of consultations.
+        archived = c.execute("SELECT 1 FROM sqlite_master WHERE name='consultations_archive_fts'").fetchone()
+        c.execute('''CREATE VIEW IF NOT EXISTS consultations_archive_text AS
+                     SELECT id, username, unpack(codec, question) AS question, unpack(codec, answer) AS answer
+                     FROM consultations_archive''')
+        c.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS consultations_archive_fts USING fts5(
+                         username, question, answer, content='consultations_archive_text', content_rowid='id',
+                         tokenize='unicode61 remove_diacritics 2', prefix='2 3')''')
+        c.execute('''CREATE TRIGGER IF NOT EXISTS consultations_archive_fts_ai AFTER INSERT ON consultations_archive BEGIN
+                         INSERT INTO consultations_archive_fts(rowid, username, question, answer)
+                         VALUES (new.id, new.username, unpack(new.codec, new.question), unpack(new.codec, new.answer));
+                     END''')
+        c.execute('''CREATE TRIGGER IF NOT EXISTS consultations_archive_fts_ad AFTER DELETE ON consultations_archive BEGIN
+                         INSERT INTO consultations_archive_fts(consultations_archive_fts, rowid, username, question, answer)
+                         VALUES ('delete', old.id, old.username, unpack(old.codec, old.question), unpack(old.codec, old.answer));
+                     END''')
+        # The archive only grows through retention runs, so indexing what is already there is a one-off.
+        if not archived: c.execute("INSERT INTO consultations_archive_fts(consultations_archive_fts) VALUES ('rebuild')")
+        if not exists:
+            # Rows written before the index existed are backfilled up to this id;
+            # everything after it arrives through the insert trigger.
+            end = c.execute('SELECT COALESCE(MAX(id), 0) FROM consultations').fetchone()[0]
+            c.executemany('INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                          [("fts_backfill_next", "0"), ("fts_backfill_end", str(end))])
+
+def _meta(c, key):
+    row = c.execute('SELECT value FROM meta WHERE key=?', (key,)).fetchone()
+    return int(row[0]) if row else 0
+
+def backfill_bounds(c):
+    """(next, end) ids of the shard's pending backfill on connection c; indexed once next >= end."""
+    return _meta(c, "fts_backfill_next"), _meta(c, "fts_backfill_end")
+
+def backfill_remaining():
+    conns = [pool.connection() for pool in db.shard_pools()]
+    return sum(max(0, end - nxt) for nxt, end in map(backfill_bounds, conns))
+
+def backfill_step(batch=BACKFILL_BATCH):
+    """Index the next id range of pre-existing rows on the first shard that needs it; returns rows indexed (0 when done)."""
+    for pool in db.shard_pools():
+        with pool.write() as c:
+            nxt, end = backfill_bounds(c)
+            if nxt >= end: continue
+            # Step by rows, not id span: ids are sparse on shards and after archiving.
+            hi = c.execute('''SELECT COALESCE(MAX(id), ?) FROM (SELECT id FROM consultations
+                             WHERE id > ? AND id <= ? ORDER BY id LIMIT ?)''', (end, nxt, end, batch)).fetchone()[0]
+            n = c.execute('''INSERT INTO consultations_fts(rowid, username, question, answer)
+                             SELECT id, username, question, answer FROM consultations
+                             WHERE id > ? AND id <= ?''', (nxt, hi)).rowcount
+            c.execute("UPDATE meta SET value=? WHERE key='fts_backfill_next'", (str(hi),))
+        return max(n, 1)
+    return 0
+
+def start_backfill(pause=BACKFILL_PAUSE):
+    """Backfill in short transactions on a daemon thread so writers are never starved."""
+    def run():
+        while backfill_step(): time.sleep(pause)
+    t = threading.Thread(target=run, name="fts-backfill", daemon=True)
+    t.start()
+    return t
+
+
+def build_query(text, username=None):
+    """Turn free text into a safe FTS5 query: quoted terms ANDed, the last one prefix-matched."""
+    terms = re.findall(r"\w+", text.lower())
+    if not terms: return None
+    parts = [f'"{t}"' for t in terms[:-1]] + [f'"{terms[-1]}"*']
+    q = "{question answer} : (" + " AND ".join(parts) + ")"
+    if username:
+        user_terms = re.findall(r"\w+", username.lower())
+        # Column filter lets FTS intersect on the user's tokens; the join re-checks exactly.
+        if user_terms: q = f'username : "{" ".join(user_terms)}" AND ' + q
+    return q
+
+def render_highlight(text):
+    return html.escape(text).replace(_HL_OPEN, "<mark>").replace(_HL_CLOSE, "</mark>")
+
+@telemetry.timed("db.search_consultations")
+def search_consultations(username, text, page=0, limit=SEARCH_PAGE):
+    """Ranked matches for one user: (rows, total). rows are (id, date, question_hl, answer_snippet, score)."""
+    db.sync(username)
+    q = build_query(text, username)
+    if q is None: return [], 0
+    pool = db.pool_for(username)
+    total = pool.read(SQL_COUNT, {"q": q, "user": username})[0][0]
+    return pool.read(SQL_SEARCH, {"q": q, "user": username, "n": limit, "offset": page * limit}), total
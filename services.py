@@ -0,0 +1,100 @@
+import os
+import streamlit as st
+import bootstrap
+import db
+import labs
+import reference
+import reminders
+import response_cache
+import retention
+import rollups
+import scheduler
+import search
+import telemetry
+
+# --- PROCESS-WIDE RESOURCES (built once, shared by every session) ---
+@st.cache_resource
+def get_storage():
+    with bootstrap.step("storage"):
+        pool = db.get_pool()
+        db.init_db()
+        rollups.init_rollups()
+        db.init_timeseries()
+        labs.init_labs()
+        reminders.init_reminders()
+    return pool
+
+@st.cache_resource
+def get_search():
+    """True once the FTS index exists; pre-existing rows are backfilled in the background."""
+    get_storage()
+    if not search.fts5_available(): return False
+    with bootstrap.step("search"):
+        if search.init_search(): search.start_backfill()
+    return True
+
+@st.cache_resource
+def get_reference():
+    with bootstrap.step("reference"):
+        return reference.ReferenceStore()
+
+@st.cache_resource
+def get_facilities():
+    import facilities
+    with bootstrap.step("facilities"):
+        return facilities.build()
+
+@st.cache_resource
+def get_lab_pipeline():
+    get_storage()
+    return labs.Pipeline()
+
+@st.cache_resource
+def get_response_cache():
+    get_storage()
+    return response_cache.ResponseCache()
+
+@st.cache_resource
+def get_theme():
+    return bootstrap.load_theme()
+
+def _secret(name, default=""):
+    # st.secrets raises when no secrets.toml exists at all.
+    try: return st.secrets[name] if name in st.secrets else default
+    except Exception: return default
+
+@st.cache_resource
+def get_model():
+    try: return bootstrap.build_model(_secret("API_KEY"))
+    except Exception: return None
+
+@st.cache_resource
+def get_scheduler():
+    sched = scheduler.Scheduler(get_model())
+    telemetry.gauge("ai.queue_depth", sched.depth)
+    telemetry.gauge("ai.busy_workers", lambda: sched.busy)
+    return sched
+
+@st.cache_resource
+def get_reminder_engine():
+    get_storage()
+    engine = reminders.ReminderEngine().start()
+    telemetry.gauge("reminders.window", engine.__len__)
+    return engine
+
+@st.cache_resource
+def start_retention():
+    get_storage()
+    return retention.start()
+
+@st.cache_resource
+def start_telemetry():
+    return telemetry.start_dumper()
+
+def admin_users():
+    raw = _secret("ADMIN_USERS") or os.environ.get("MEDICARE_ADMINS", "")
+    if isinstance(raw, str): raw = raw.split(",")
+    return {u.strip() for u in raw if u.strip()}
+
+def is_admin():
+    return st.session_state.get('is_logged_in', False) and st.session_state.get('username') in admin_users()
@@ -0,0 +1,138 @@
+import functools
+import json
+import math
+import os
+import threading
+import time
+
+# --- PERFORMANCE TELEMETRY (in-memory latency histograms) ---
+MIN_MS = 0.01
+GROWTH = 1.1
+DUMP_PATH = os.environ.get("MEDICARE_METRICS_FILE", "")
+DUMP_INTERVAL = float(os.environ.get("MEDICARE_METRICS_INTERVAL", "60"))
+
+
+class Histogram:
+    """Log-bucketed latency histogram (~5% relative error, O(1) insert)."""
+
+    __slots__ = ("count", "total", "max", "buckets", "lock")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def clear(self):
+        with self.lock:
+            self.count, self.total, self.max = 0, 0.0, 0.0
+            self.buckets = {}
+
+    def add(self, ms):
+        b = 0 if ms <= MIN_MS else int(math.log(ms / MIN_MS, GROWTH)) + 1
+        with self.lock:
+            self.count += 1
+            self.total += ms
+            if ms > self.max: self.max = ms
+            self.buckets[b] = self.buckets.get(b, 0) + 1
+
+    def quantile(self, q):
+        with self.lock:
+            if not self.count: return 0.0
+            rank, seen = q * self.count, 0
+            for b in sorted(self.buckets):
+                seen += self.buckets[b]
+                if seen >= rank: return min(MIN_MS * GROWTH ** (b - 0.5) if b else MIN_MS, self.max)
+            return self.max
+
+    def summary(self):
+        return {"count": self.count, "mean": self.total / self.count if self.count else 0.0,
+                "p50": self.quantile(0.50), "p95": self.quantile(0.95), "p99": self.quantile(0.99),
+                "max": self.max}
+
+
+_hist = {}
+_counters = {}
+_gauges = {}
+_lock = threading.Lock()
+
+def histogram(name):
+    h = _hist.get(name)
+    if h is None:
+        with _lock: h = _hist.setdefault(name, Histogram())
+    return h
+
+def histograms():
+    """The live histograms by name, e.g. to merge buckets gathered in several processes."""
+    with _lock: return dict(_hist)
+
+def observe(name, ms):
+    histogram(name).add(ms)
+
+def incr(name, n=1):
+    with _lock: _counters[name] = _counters.get(name, 0) + n
+
+def gauge(name, fn):
+    """Register a zero-argument callable sampled on every snapshot (queue depths etc.)."""
+    with _lock: _gauges[name] = fn
+
+def _sample(fn):
+    try: return fn()
+    except Exception: return None
+
+
+class timed:
+    """Time a block (`with timed("db.query"):`) or a function (`@timed("db.query")`) in ms."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, (time.perf_counter() - self._t0) * 1000)
+
+    def __call__(self, fn):
+        h = histogram(self.name)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            try: return fn(*args, **kwargs)
+            finally: h.add((time.perf_counter() - t0) * 1000)
+        return wrapper
+
+
+def snapshot():
+    with _lock:
+        names, counters, gauges = list(_hist.items()), dict(_counters), dict(_gauges)
+    return {"at": time.time(), "histograms": {n: h.summary() for n, h in sorted(names)}, "counters": counters,
+            "gauges": {n: _sample(fn) for n, fn in sorted(gauges.items())}}
+
+def reset():
+    # Clear in place: @timed wrappers hold on to their Histogram objects.
+    with _lock:
+        for h in _hist.values(): h.clear()
+        _counters.clear()
+
+
+_dumper = None
+
+def start_dumper(path=DUMP_PATH, interval=DUMP_INTERVAL):
+    """Append a JSON snapshot to path every interval seconds (no-op without a path)."""
+    global _dumper
+    if not path or _dumper is not None: return _dumper
+
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                with open(path, "a", encoding="utf-8") as f: f.write(json.dumps(snapshot()) + "\n")
+            except OSError: pass
+
+    _dumper = threading.Thread(target=run, name="metrics-dump", daemon=True)
+    _dumper.start()
+    return _dumper
@@ -0,0 +1,16 @@
+import json
+
+import reference
+
+
+def test_browse_reaches_every_duplicate_term(tmp_path):
+    source = tmp_path / "corpus.jsonl"
+    terms = ["Anemia"] * 5 + ["acne", "Zoster", "anemia"]
+    source.write_text("".join(json.dumps({"category": "A", "term": t, "body": "x"}) + "\n" for t in terms))
+    store = reference.ReferenceStore(str(source))
+    seen, cursor = [], ("", 0)
+    while cursor is not None:
+        rows, cursor = store.browse("A", cursor, limit=2)
+        seen += [term for _, term, _ in rows]
+    assert sorted(seen) == sorted(terms)
+    assert seen[0] == "acne" and seen[-1] == "Zoster"
@@ -0,0 +1,16 @@
+import response_cache
+
+
+def test_name_parts_replaced_as_whole_words():
+    shared = response_cache.anonymize("Hello Ann, your Annual review looks fine, Ann Lee.", "Ann Lee")
+    assert shared == f"Hello {response_cache.NAME_SLOT}, your Annual review looks fine, {response_cache.NAME_SLOT}."
+    assert response_cache.personalize(shared, "Bob Ray") == "Hello Bob Ray, your Annual review looks fine, Bob Ray."
+
+
+def test_first_name_greeting_is_anonymized():
+    shared = response_cache.anonymize("Hello John, rest and drink water.", "John Smith")
+    assert "John" not in shared
+
+
+def test_answer_with_leftover_name_is_not_cached():
+    assert response_cache.anonymize("HELLO JOHN, rest and drink water.", "John Smith") is None
@@ -0,0 +1,29 @@
+import io
+
+import pytest
+
+import db
+import timeseries
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "WRITE_BEHIND", False)
+    db.set_pool(db.ConnectionPool(str(tmp_path / "ts.db")))
+    db.init_db()
+    db.init_timeseries()
+    yield
+    db.get_backend().close()
+
+
+@pytest.mark.parametrize("stamps", [
+    ["2024-03-01T10:00:00Z", "2024-03-01T10:01:00Z"],
+    [1709287200, 1709287260],
+    [1709287200000, 1709287260000],
+])
+def test_ingest_time_column_formats(storage, stamps):
+    csv = "ts,steps\n" + "".join(f"{t},{n}\n" for t, n in zip(stamps, (10, 20)))
+    stats = timeseries.ingest_csv("ann", io.StringIO(csv))
+    assert stats["samples"] == 2 and stats["skipped"] == 0
+    rows = db.get_pool().read("SELECT ts, value FROM samples ORDER BY ts")
+    assert rows == [(1709287200, 10.0), (1709287260, 20.0)]
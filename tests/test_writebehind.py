@@ -0,0 +1,16 @@
+import db
+import telemetry
+from writebehind import WriteBehind
+
+
+def test_failed_row_is_dead_lettered_not_dropped(tmp_path):
+    pool = db.ConnectionPool(str(tmp_path / "wb.db"))
+    with pool.write() as c: c.execute("CREATE TABLE t (x INTEGER NOT NULL)")
+    writer = WriteBehind(lambda username: pool)
+    for x in (1, None, 3): writer.submit("ann", "INSERT INTO t VALUES (?)", (x,))
+    assert writer.flush()
+    writer.close()
+    assert [r[0] for r in pool.read("SELECT x FROM t ORDER BY x")] == [1, 3]
+    assert pool.read("SELECT username, params FROM write_failures") == [("ann", "[null]")]
+    assert writer.stats["dead_lettered"] == 1
+    assert telemetry.snapshot()["counters"]["writebehind.failed"] >= 1
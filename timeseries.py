@@ -0,0 +1,136 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+import db
+import telemetry
+
+# --- WEARABLE / NUTRITION TIME SERIES ---
+CHUNK_ROWS = 100000
+HOUR, DAY = 3600, 86400
+CHART_POINTS = 240
+EPOCH = pd.Timestamp(0, tz="UTC")
+
+# Compact integer codes keep the clustered (username, metric, ts) key small.
+METRICS = {"steps": 1, "active_calories": 2, "heart_rate": 3, "distance_km": 4,
+           "calories": 10, "protein_g": 11, "carbs_g": 12, "fat_g": 13}
+ALIASES = {"step_count": "steps", "step": "steps", "active_kcal": "active_calories", "kcal_burned": "active_calories",
+           "hr": "heart_rate", "bpm": "heart_rate", "heartrate": "heart_rate", "distance": "distance_km",
+           "kcal": "calories", "energy_kcal": "calories", "protein": "protein_g", "carbs": "carbs_g",
+           "carbohydrates": "carbs_g", "fat": "fat_g"}
+TIME_COLUMNS = ("timestamp", "time", "datetime", "date", "start_time", "ts")
+# Cumulative metrics chart as per-bucket totals; the rest as mean with min/max envelope.
+SUMMED = {"steps", "active_calories", "distance_km", "calories", "protein_g", "carbs_g", "fat_g"}
+
+
+def _metric_name(col):
+    key = str(col).strip().lower().replace(" ", "_").replace("-", "_")
+    key = ALIASES.get(key, key)
+    return key if key in METRICS else None
+
+def _epoch_seconds(col):
+    """Epoch seconds from date/time strings or numeric epochs (seconds or milliseconds); NaN where unparseable."""
+    if pd.api.types.is_numeric_dtype(col):
+        # Numbers past 1e11 would be seconds after the year 5000, so they are milliseconds.
+        return col.where(col.abs() < 1e11, col / 1000) // 1
+    # Epoch seconds regardless of the datetime64 unit pandas picked for the column.
+    return (pd.to_datetime(col, errors="coerce", utc=True) - EPOCH) // pd.Timedelta(seconds=1)
+
+def _long_chunk(chunk):
+    """Normalize a wide (timestamp + metric columns) or long (timestamp, metric, value) chunk.
+
+    Returns (frame with epoch/metric/value, rows before dropping unparseable ones).
+    """
+    cols = {str(c).strip().lower(): c for c in chunk.columns}
+    tcol = next((cols[c] for c in TIME_COLUMNS if c in cols), None)
+    if tcol is None: raise ValueError(f"no timestamp column (expected one of {', '.join(TIME_COLUMNS)})")
+    ts = _epoch_seconds(chunk[tcol])
+    if "metric" in cols and "value" in cols:
+        long = pd.DataFrame({"epoch": ts, "metric": chunk[cols["metric"]].map(_metric_name),
+                             "value": pd.to_numeric(chunk[cols["value"]], errors="coerce")})
+    else:
+        named = {c: _metric_name(c) for c in chunk.columns if c != tcol}
+        named = {c: m for c, m in named.items() if m}
+        if not named: raise ValueError("no recognised metric columns")
+        wide = chunk[list(named)].apply(pd.to_numeric, errors="coerce").rename(columns=named)
+        wide["epoch"] = ts
+        long = wide.melt(id_vars="epoch", var_name="metric", value_name="value")
+    return long.dropna(), len(long)
+
+def _refresh_tiers(c, username, code, lo, hi):
+    # Recompute only the affected hours/days from the tier below; idempotent on re-upload.
+    lo_h, hi_h = lo - lo % HOUR, hi - hi % HOUR + HOUR
+    c.execute('''INSERT OR REPLACE INTO samples_hourly
+                 SELECT username, metric, ts - ts % 3600, MIN(value), MAX(value), SUM(value), COUNT(*)
+                 FROM samples WHERE username=? AND metric=? AND ts >= ? AND ts < ? GROUP BY 3''',
+              (username, code, lo_h, hi_h))
+    lo_d, hi_d = lo - lo % DAY, hi - hi % DAY + DAY
+    c.execute('''INSERT OR REPLACE INTO samples_daily
+                 SELECT username, metric, ts - ts % 86400, MIN(vmin), MAX(vmax), SUM(vsum), SUM(n)
+                 FROM samples_hourly WHERE username=? AND metric=? AND ts >= ? AND ts < ? GROUP BY 3''',
+              (username, code, lo_d, hi_d))
+
+@telemetry.timed("db.timeseries.ingest")
+def ingest_csv(username, source, chunk_rows=CHUNK_ROWS, progress=None):
+    """Parse a CSV (path or file object) in chunks and bulk-insert it; returns ingest stats.
+
+    Re-uploading the same file is idempotent: samples are keyed on (user, metric, ts).
+    """
+    stats = {"rows": 0, "samples": 0, "skipped": 0, "metrics": set()}
+    t0 = time.perf_counter()
+    for chunk in pd.read_csv(source, chunksize=chunk_rows):
+        long, total = _long_chunk(chunk)
+        long["code"] = long["metric"].map(METRICS).astype("int64")
+        long["epoch"] = long["epoch"].astype("int64")
+        stats["rows"] += len(chunk)
+        stats["skipped"] += total - len(long)
+        with db.get_pool().write() as c:
+            c.executemany('INSERT OR REPLACE INTO samples VALUES (?,?,?,?)',
+                          zip([username] * len(long), long["code"].tolist(), long["epoch"].tolist(),
+                              long["value"].tolist()))
+            for code, grp in long.groupby("code")["epoch"]:
+                _refresh_tiers(c, username, int(code), int(grp.min()), int(grp.max()))
+        stats["samples"] += len(long)
+        stats["metrics"].update(long["metric"].unique().tolist())
+        if progress: progress(stats)
+    stats["seconds"] = time.perf_counter() - t0
+    stats["samples_per_s"] = stats["samples"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+def extent(username, metric):
+    row = db.get_pool().read('SELECT MIN(ts), MAX(ts) FROM samples_daily WHERE username=? AND metric=?',
+                             (username, METRICS[metric]))[0]
+    return (row[0], row[1] + DAY) if row[0] is not None else None
+
+@telemetry.timed("db.timeseries.series")
+def series(username, metric, start, end, points=CHART_POINTS):
+    """Downsample [start, end) epoch seconds to about `points` buckets.
+
+    Reads the coarsest tier whose resolution still fits the bucket width and
+    returns a DataFrame indexed by bucket start with min/max/mean/sum/count.
+    """
+    width = max(1, -(-(end - start) // points))
+    tier, res = ("samples_daily", DAY) if width >= DAY else ("samples_hourly", HOUR) if width >= HOUR else ("samples", 1)
+    width = max(width, res)
+    cols = "ts, value, value, value, 1" if tier == "samples" else "ts, vmin, vmax, vsum, n"
+    rows = db.get_pool().read(f'SELECT {cols} FROM {tier} WHERE username=? AND metric=? AND ts >= ? AND ts < ? ORDER BY ts',
+                              (username, METRICS[metric], start - start % res, end))
+    if not rows: return pd.DataFrame(columns=["min", "max", "mean", "sum", "count"])
+    arr = np.asarray(rows, dtype="float64")
+    bucket = ((arr[:, 0] - start) // width).astype("int64")
+    df = pd.DataFrame({"bucket": bucket, "min": arr[:, 1], "max": arr[:, 2], "sum": arr[:, 3], "count": arr[:, 4]})
+    g = df.groupby("bucket").agg({"min": "min", "max": "max", "sum": "sum", "count": "sum"})
+    g["mean"] = g["sum"] / g["count"]
+    g.index = pd.to_datetime(start + g.index.to_numpy() * width, unit="s")
+    return g[["min", "max", "mean", "sum", "count"]]
+
+def daily_totals(username, metrics, days):
+    """Per-day sums for the last `days` days (UTC), one column per metric, zero-filled."""
+    end = int(time.time()) // DAY * DAY + DAY
+    idx = pd.date_range(end=pd.to_datetime(end - DAY, unit="s"), periods=days, freq="D")
+    out = pd.DataFrame(index=idx)
+    for m in metrics:
+        s = series(username, m, end - days * DAY, end, points=days)
+        out[m] = s["sum"].reindex(idx, fill_value=0.0) if len(s) else 0.0
+    return out
@@ -0,0 +1,52 @@
+import importlib
+
+import telemetry
+
+# --- PAGE REGISTRY (lazy page modules + render timing) ---
+
+
+class Page:
+    """A navigation entry; its module is imported the first time it is rendered."""
+
+    def __init__(self, name, icon, entry, requires_auth=True, requires_admin=False):
+        self.name = name
+        self.icon = icon
+        self.entry = entry
+        self.requires_auth = requires_auth
+        self.requires_admin = requires_admin
+        self._render = None
+
+    def load(self):
+        if self._render is None:
+            mod, func = self.entry.split(":")
+            self._render = getattr(importlib.import_module(f"{__name__}.{mod}"), func)
+        return self._render
+
+    def render(self):
+        render = self.load()
+        with telemetry.timed(f"page.{self.name}"): render()
+
+
+PAGES = [
+    Page("Dashboard", "grid", "dashboard:f1_dashboard", requires_auth=False),
+    Page("AI Consult", "cpu", "ai_consult:f2_ai_consult"),
+    Page("BMI Check", "calculator", "bmi:f3_bmi"),
+    Page("Hydration", "droplet", "hydration:f4_hydration"),
+    Page("Mental Test", "activity", "mental_test:f5_mental_test"),
+    Page("Dictionary", "book", "dictionary:f6_dictionary"),
+    Page("Records", "folder", "records:f7_medical_records"),
+    Page("Appointments", "calendar", "appointments:f8_appointments"),
+    Page("Medication", "capsule", "medication:f9_medication"),
+    Page("Lab Results", "file-medical", "lab_results:f10_lab_results"),
+    Page("Telehealth", "camera-video", "telehealth:f11_telehealth"),
+    Page("Activity Log", "graph-up", "activity:f12_activity"),
+    Page("Nutrition", "egg-fried", "nutrition:f13_nutrition"),
+    Page("Find Hospital", "geo-alt", "hospital:f14_hospital"),
+    Page("Insurance", "shield-check", "insurance:f15_insurance"),
+    Page("Settings", "gear", "settings:f16_settings"),
+    Page("System Metrics", "speedometer2", "metrics:f17_metrics", requires_admin=True),
+]
+BY_NAME = {p.name: p for p in PAGES}
+
+def visible(is_admin):
+    return [p for p in PAGES if is_admin or not p.requires_admin]
@@ -0,0 +1,35 @@
+import streamlit as st
+import time
+import timeseries
+from views.components import csv_import
+
+RANGES = {"24 Hours": 86400, "7 Days": 7 * 86400, "30 Days": 30 * 86400, "1 Year": 365 * 86400, "All": None}
+
+def f12_activity():
+    st.title("Physical Activity Metrics")
+    user = st.session_state['username']
+    with st.expander("Import wearable data"):
+        csv_import("activity_csv", "Wearable export (CSV)",
+                   help="A timestamp column plus steps / heart_rate / active_calories / distance_km columns, "
+                        "or long format with timestamp, metric, value.")
+    span = timeseries.extent(user, "steps") or timeseries.extent(user, "heart_rate")
+    if span is None:
+        st.info("No wearable data yet. Import a CSV export from your device to see your activity.")
+        return
+    
+    today = timeseries.daily_totals(user, ["steps"], 8)["steps"]
+    avg = today.iloc[:-1].mean()
+    st.metric("Daily Steps", f"{int(today.iloc[-1]):,}", f"{int(today.iloc[-1] - avg):+,} vs 7-day Average")
+    
+    choice = st.radio("Range", list(RANGES), index=1, horizontal=True, label_visibility="collapsed")
+    end = min(span[1], int(time.time()) + 1)
+    start = span[0] if RANGES[choice] is None else max(span[0], end - RANGES[choice])
+    steps = timeseries.series(user, "steps", start, end)
+    hr = timeseries.series(user, "heart_rate", start, end)
+    if len(steps):
+        st.subheader("Steps")
+        st.bar_chart(steps[["sum"]].rename(columns={"sum": "Steps Recorded"}))
+    if len(hr):
+        st.subheader("Heart Rate (bpm)")
+        st.line_chart(hr[["min", "mean", "max"]].rename(columns={"min": "Min", "mean": "Average", "max": "Max"}))
+    if not len(steps) and not len(hr): st.caption("No samples in this range.")
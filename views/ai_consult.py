@@ -0,0 +1,93 @@
+import streamlit as st
+from contextlib import closing
+import ai
+import conversation
+import imaging
+import response_cache
+import scheduler
+import telemetry
+from db import save_consultation
+from services import get_response_cache, get_scheduler
+
+def f2_ai_consult():
+    st.title("Dr. AI Clinical Consultant")
+    st.caption("Advanced AI diagnostic preliminary support.")
+    
+    if "conv" not in st.session_state: st.session_state.conv = conversation.Conversation()
+    if "ai_visible" not in st.session_state: st.session_state.ai_visible = conversation.VISIBLE
+    conv = st.session_state.conv
+    
+    # Only the tail is drawn; older messages are revealed a page at a time.
+    chat_box = st.container(height=400, border=True)
+    with chat_box:
+        hidden = len(conv) - st.session_state.ai_visible
+        if hidden > 0:
+            if st.button(f"Show {min(hidden, conversation.VISIBLE)} earlier messages", key="ai_show_earlier"):
+                st.session_state.ai_visible += conversation.VISIBLE
+                st.rerun()
+        elif conv.total > len(conv): st.caption("Older messages from this session are saved in Patient Records.")
+        for m in conv.tail(st.session_state.ai_visible):
+            with st.chat_message(m["role"]):
+                st.write(m["content"])
+    
+    with st.container(border=True):
+        c1, c2 = st.columns([1, 5])
+        with c1: upl = st.file_uploader("Image Analysis", type=["jpg","png"], label_visibility="collapsed")
+        with c2: txt = st.chat_input("Input clinical symptoms or inquiries...")
+        img = None
+        if upl:
+            try: img = imaging.session_preprocess(st.session_state, upl.getvalue())
+            except Exception: st.error("Unreadable image. Please upload a valid JPG or PNG.")
+        if img: st.image(img.thumb, width=150)
+        fresh = st.toggle("Bypass answer cache", key="ai_bypass_cache")
+        
+    if txt:
+        with chat_box:
+            with st.chat_message("user"): st.write(txt)
+        # Cached answers are context-free, so they only stand in for an opening question.
+        context = conv.context()
+        cacheable = not context
+        st.session_state.ai_visible = conversation.VISIBLE
+        
+        name = st.session_state.get('nama', 'Patient')
+        cache = get_response_cache()
+        key = response_cache.make_key(txt, img.hash if img else None)
+        cached = cache.get(key) if cacheable and not fresh else None
+        if cached is not None:
+            ai_reply = response_cache.personalize(cached, name)
+            with chat_box:
+                with st.chat_message("assistant"): st.write(ai_reply)
+            conv.add("user", txt)
+            conv.add("assistant", ai_reply)
+            save_consultation(st.session_state['username'], txt, ai_reply)
+            st.caption("Served from answer cache")
+            return
+        
+        stats = ai.StreamStats()
+        try:
+            content = [ai.build_prompt(name, txt, img is not None, context)]
+            if img: content.append(img.blob())
+            
+            # Closing the generator on rerun/navigation cancels the stream; only a
+            # completed answer is kept and persisted.
+            with closing(get_scheduler().stream(st.session_state['username'], content, stats)) as chunks:
+                with chat_box:
+                    with st.chat_message("assistant"): ai_reply = st.write_stream(chunks)
+            # The patient's turn joins the conversation only with its answer, so a
+            # failed or cancelled request leaves no unanswered message in the context.
+            if stats.completed:
+                conv.add("user", txt)
+                conv.add("assistant", ai_reply)
+                save_consultation(st.session_state['username'], txt, ai_reply)
+                shared = response_cache.anonymize(ai_reply, name) if cacheable else None
+                if shared is not None: cache.put(key, shared)
+                st.caption(f"First token {stats.ttft or 0:.2f}s · Total {stats.total:.2f}s"
+                           f" · Prompt ~{conversation.estimate_tokens(content[0])} tokens")
+        except scheduler.RateLimited as e:
+            st.warning(f"You are sending questions faster than the engine allows. Please wait {e.retry_after:.0f}s and try again.")
+        except scheduler.SchedulerError:
+            telemetry.incr("ai.errors")
+            st.error("The diagnostic engine is busy right now. Please try again shortly.")
+        except Exception as e:
+            telemetry.incr("ai.errors")
+            st.error("Engine failure. Please verify connection.")
@@ -0,0 +1,44 @@
+import streamlit as st
+import datetime
+import time
+import pandas as pd
+import reminders
+from services import get_reminder_engine
+
+REMIND = {"1 hour before": 3600, "3 hours before": 3 * 3600, "1 day before": 86400}
+
+def f8_appointments():
+    st.title("Appointment Scheduling")
+    user = st.session_state['username']
+    with st.form("appt_add", clear_on_submit=True):
+        c1, c2 = st.columns(2)
+        day = c1.date_input("Select proposed consultation date", datetime.datetime.now())
+        at = c2.time_input("Time", datetime.time(9, 0))
+        practitioner = st.text_input("Practitioner", placeholder="e.g. Dr. Smith, MD")
+        reason = st.text_input("Reason for visit")
+        remind = st.selectbox("Reminder", list(REMIND))
+        if st.form_submit_button("Book Appointment"):
+            when = int(datetime.datetime.combine(day, at).timestamp())
+            if when <= time.time(): st.error("Choose a time in the future.")
+            elif not practitioner.strip(): st.error("Enter a practitioner.")
+            else:
+                appt_id, due = reminders.add_appointment(user, practitioner.strip(), reason.strip(), when, REMIND[remind])
+                get_reminder_engine().notify(reminders.APPT, appt_id, due)
+                st.success(f"Booked with {practitioner} on {day:%d %b %Y} at {at:%H:%M}.")
+    
+    rows = reminders.appointments(user)
+    if not rows:
+        st.caption("No appointments yet.")
+        return
+    now = time.time()
+    status = lambda at, s: "Fulfilled" if s == "scheduled" and at <= now else s.capitalize()
+    st.table(pd.DataFrame({"Practitioner": [r[1] for r in rows], "Reason": [r[2] for r in rows],
+                           "When": [f"{datetime.datetime.fromtimestamp(r[3]):%a %d %b %Y %H:%M}" for r in rows],
+                           "Status": [status(r[3], r[4]) for r in rows]}))
+    upcoming = [r for r in rows if r[4] == "scheduled" and r[3] > now]
+    if upcoming:
+        pick = st.selectbox("Cancel an appointment", upcoming, index=None,
+                            format_func=lambda r: f"{r[1]} · {datetime.datetime.fromtimestamp(r[3]):%d %b %H:%M}")
+        if pick and st.button("Cancel Appointment"):
+            reminders.cancel_appointment(user, pick[0])
+            st.rerun()
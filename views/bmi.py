@@ -0,0 +1,14 @@
+import streamlit as st
+
+def f3_bmi():
+    st.title("Body Mass Index Analysis")
+    st.write("Calculate and track your BMI index.")
+    c_a, c_b = st.columns(2)
+    bb = c_a.number_input("Weight (kg)", 30.0, 200.0, 60.0)
+    tb = c_b.number_input("Height (cm)", 100.0, 250.0, 170.0)
+    if st.button("Execute Calculation"):
+        bmi = bb / ((tb/100)**2)
+        st.metric("Calculated BMI", f"{bmi:.2f}")
+        if bmi < 18.5: st.warning("Status: Underweight")
+        elif 18.5 <= bmi < 25: st.success("Status: Normal Weight")
+        else: st.error("Status: Overweight / Obese")
@@ -0,0 +1,34 @@
+import streamlit as st
+
+def page_nav(key, next_cursor, back="Newer", forward="Load older"):
+    """Back / forward buttons over a keyset cursor stack kept in session_state[key].
+
+    The last entry of the stack is the cursor the current page starts after.
+    """
+    cursors = st.session_state[key]
+    c_a, c_b, c_c = st.columns([1, 1, 3])
+    if len(cursors) > 1 and c_a.button(back, key=f"{key}_newer", use_container_width=True):
+        cursors.pop()
+        st.rerun()
+    if next_cursor is not None and c_b.button(forward, key=f"{key}_older", use_container_width=True):
+        cursors.append(next_cursor)
+        st.rerun()
+    c_c.caption(f"Page {len(cursors)}")
+
+def csv_import(key, label, help=None):
+    """CSV uploader feeding timeseries.ingest_csv; each uploaded file is ingested once per session."""
+    import timeseries
+    upl = st.file_uploader(label, type=["csv"], key=key, help=help)
+    if upl is None or st.session_state.get(f"{key}_done") == upl.file_id: return
+    bar = st.progress(0.0, "Importing...")
+    size = upl.size or 1
+    try:
+        stats = timeseries.ingest_csv(st.session_state['username'], upl,
+                                      progress=lambda s: bar.progress(min(upl.tell() / size, 1.0), f"{s['samples']:,} samples"))
+    except ValueError as e:
+        bar.empty()
+        st.error(f"Could not import {upl.name}: {e}")
+        return
+    st.session_state[f"{key}_done"] = upl.file_id
+    bar.progress(1.0, f"{stats['samples']:,} samples ({', '.join(sorted(stats['metrics']))}) in {stats['seconds']:.1f}s"
+                      + (f" · {stats['skipped']:,} unreadable values skipped" if stats['skipped'] else ""))
@@ -0,0 +1,97 @@
+import streamlit as st
+import datetime
+import random
+import pandas as pd
+import numpy as np
+import reminders
+import rollups
+import telemetry
+
+HUGE_TIPS = [
+    "Drinking water 20 minutes before meals helps control portion sizes.",
+    "Walking barefoot on natural surfaces can reduce stress indicators.",
+    "Replacing refined sugar with natural alternatives stabilizes blood glucose.",
+    "A left-side sleeping position is recommended for acid reflux management.",
+    "Consuming cooked tomatoes increases Lycopene bioavailability.",
+    "Resistance training increases bone density and prevents osteoporosis.",
+    "Morning sun exposure regulates circadian rhythms and provides Vitamin D.",
+    "Reducing screen time before sleep significantly improves sleep quality."
+]
+
+
+WINDOW = 30
+
+
+def _usage_frame(who, days=WINDOW):
+    """Two windows of daily rollups (previous + current), gap-filled to one row per day."""
+    end = pd.Timestamp.today().normalize()
+    idx = pd.date_range(end=end, periods=2 * days, freq="D")
+    df = pd.DataFrame(rollups.usage(who, idx[0].strftime("%Y-%m-%d")),
+                      columns=["day", "consultations", "screenings", "score_sum"])
+    df["day"] = pd.to_datetime(df["day"])
+    return df.set_index("day").reindex(idx, fill_value=0).astype("int64")
+
+def _avg(score_sum, screenings):
+    return np.divide(score_sum, screenings, out=np.full(np.shape(score_sum), np.nan, dtype=float),
+                     where=np.asarray(screenings) > 0)
+
+def f1_dashboard():
+    st.title("Health Operations Dashboard")
+    logged = st.session_state.get('is_logged_in', False)
+    if not logged:
+        st.info("Guest View Mode Active. Limited functionality.")
+    
+    st.markdown("<p style='color:#64748b;'>Overview of your clinical and systemic metrics.</p>", unsafe_allow_html=True)
+    rollups.refresh()
+    who = st.session_state['username'] if logged else rollups.SYSTEM
+    df = _usage_frame(who)
+    cur, prev = df.iloc[-WINDOW:], df.iloc[:-WINDOW]
+    c_now, c_prev = cur.sum(), prev.sum()
+    avg_now = float(_avg(c_now["score_sum"], c_now["screenings"]))
+    avg_prev = float(_avg(c_prev["score_sum"], c_prev["screenings"]))
+    scope = "Your" if logged else "Platform"
+    
+    # CLINICAL METRICS (Clean Look)
+    m1, m2, m3, m4 = st.columns(4)
+    with m1: st.metric(f"{scope} Consultations ({WINDOW}d)", int(c_now["consultations"]),
+                       f"{int(c_now['consultations'] - c_prev['consultations']):+d} vs prior {WINDOW}d")
+    with m2: st.metric(f"{scope} Screenings ({WINDOW}d)", int(c_now["screenings"]),
+                       f"{int(c_now['screenings'] - c_prev['screenings']):+d} vs prior {WINDOW}d")
+    with m3: st.metric("Avg Screening Score", "—" if np.isnan(avg_now) else f"{avg_now:.1f}/9",
+                       None if np.isnan(avg_now) or np.isnan(avg_prev) else f"{avg_now - avg_prev:+.1f}",
+                       delta_color="inverse")
+    if logged:
+        n_appt, first = reminders.upcoming_appointments(st.session_state['username'])
+        with m4: st.metric("Upcoming Appointments", n_appt,
+                           f"Next {datetime.datetime.fromtimestamp(first):%d %b, %H:%M}" if first else "No actions required",
+                           delta_color="off")
+    else:
+        with m4: st.metric("Upcoming Appointments", "—", "Sign in to book", delta_color="off")
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+    
+    # DASHBOARD CHARTS & INSIGHTS
+    col1, col2 = st.columns([1, 2])
+    
+    with col1:
+        st.subheader("Clinical Insight")
+        st.markdown(f"<div class='clinical-note'><strong>Daily Recommendation:</strong><br>{random.choice(HUGE_TIPS)}</div>", unsafe_allow_html=True)
+        
+        st.subheader("Screening Outcomes")
+        cats = rollups.categories(who, cur.index[0].strftime("%Y-%m-%d"))
+        if cats: st.bar_chart(pd.DataFrame(cats, columns=["Category", "Screenings"]).set_index("Category"))
+        else: st.caption("No screenings in this period.")
+        
+        st.subheader("System Status")
+        ai_lat = telemetry.histogram("ai.generate_content").summary()
+        engine = f"p95 {ai_lat['p95'] / 1000:.1f}s over {ai_lat['count']} answers" if ai_lat['count'] else "Awaiting first consultation"
+        st.markdown(f"<div class='clinical-note'><strong>AI Diagnostic Engine:</strong> {engine}<br><strong>Database Connection:</strong> Secure<br><strong>Last Sync:</strong> {datetime.datetime.now().strftime('%H:%M %p')}</div>", unsafe_allow_html=True)
+
+    with col2:
+        st.subheader(f"Clinical Activity ({WINDOW} Days)")
+        st.bar_chart(cur[["consultations", "screenings"]].rename(
+            columns={"consultations": "AI Consultations", "screenings": "PHQ Screenings"}))
+        st.subheader("Screening Score Trend (7-day average)")
+        trend = _avg(cur["score_sum"].rolling(7, min_periods=1).sum().to_numpy(),
+                     cur["screenings"].rolling(7, min_periods=1).sum().to_numpy())
+        st.line_chart(pd.DataFrame({"Average Score": trend}, index=cur.index))
@@ -0,0 +1,27 @@
+import streamlit as st
+from services import get_reference
+from views.components import page_nav
+
+def f6_dictionary():
+    st.title("Medical Reference Database")
+    st.write("Access verified medical terminology and disease information.")
+    store = get_reference()
+    
+    query = st.text_input("Search references", key="dict_query", placeholder="Condition, symptom or term (typos are tolerated)").strip()
+    if query:
+        hits = store.search(query)
+        if not hits: st.info("No reference entries match your search.")
+        for _, cat, term, body in hits:
+            with st.expander(f"Reference: {term} · {cat}"): st.write(body)
+        return
+    
+    tabs = st.tabs([cat for cat, _ in store.categories])
+    for tab, (cat, count) in zip(tabs, store.categories):
+        with tab:
+            key = f"dict_cursor_{cat}"
+            if key not in st.session_state: st.session_state[key] = [("", 0)]
+            rows, nxt = store.browse(cat, st.session_state[key][-1])
+            st.caption(f"{count} entries")
+            for _, term, body in rows:
+                with st.expander(f"Reference: {term}"): st.write(body)
+            page_nav(key, nxt, back="Previous", forward="Next")
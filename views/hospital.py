@@ -0,0 +1,36 @@
+import streamlit as st
+import pandas as pd
+from services import get_facilities
+
+HOME = (-6.8, 108.5)
+ME_COLOR, SITE_COLOR = "#0ea5e9", "#ef4444"
+
+def f14_hospital():
+    st.title("Facility Locator")
+    st.write("Proximity map for affiliated healthcare facilities.")
+    index = get_facilities()
+    
+    c1, c2, c3 = st.columns(3)
+    lat = c1.number_input("Latitude", -90.0, 90.0, HOME[0], format="%.5f")
+    lon = c2.number_input("Longitude", -180.0, 180.0, HOME[1], format="%.5f")
+    mode = c3.radio("Search", ["Nearest", "Within radius"], horizontal=True)
+    if mode == "Nearest":
+        k = st.slider("Facilities", 1, 50, 10)
+        found = index.rows(index.nearest(lat, lon, k))
+    else:
+        radius = st.slider("Radius (km)", 1, 100, 25)
+        found = index.rows(index.within(lat, lon, radius))
+    
+    kinds = sorted(found["type"].dropna().unique())
+    if len(kinds) > 1:
+        keep = st.multiselect("Facility type", kinds, default=kinds)
+        found = found[found["type"].isin(keep)]
+    st.caption(f"{len(found)} of {len(index):,} facilities")
+    pins = pd.concat([pd.DataFrame({"lat": [lat], "lon": [lon], "color": [ME_COLOR]}),
+                      found[["lat", "lon"]].assign(color=SITE_COLOR)], ignore_index=True)
+    st.map(pins, color="color")
+    if len(found):
+        st.dataframe(found[["name", "type", "address", "distance_km"]].round({"distance_km": 1}).rename(columns={
+            "name": "Facility", "type": "Type", "address": "Address", "distance_km": "Distance (km)"}),
+            hide_index=True, use_container_width=True)
+    else: st.info("No facilities in range. Try a larger radius.")
@@ -0,0 +1,9 @@
+import streamlit as st
+
+def f4_hydration():
+    st.title("Hydration Target Tracker")
+    st.write("Calculate optimal daily fluid intake based on body mass.")
+    bb = st.number_input("Current Weight (kg)", 30.0, 200.0, 60.0)
+    if st.button("Calculate Requirement"):
+        air = bb * 30
+        st.markdown(f"<div class='clinical-note'><strong>Recommended Intake:</strong> {air} ml per day.</div>", unsafe_allow_html=True)
@@ -0,0 +1,6 @@
+import streamlit as st
+
+def f15_insurance():
+    st.title("Policy Administration")
+    st.write("**Active Provider:** HealthCare Pro Corporate")
+    st.progress(70, "Annual Coverage Utilization (70%)")
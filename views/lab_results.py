@@ -0,0 +1,69 @@
+import streamlit as st
+import pandas as pd
+import labs
+from services import get_lab_pipeline
+
+POLL = 2
+STATUS = {"queued": "⏳ Queued", "running": "⚙️ Extracting", "done": "✅ Parsed", "failed": "⚠️ Failed", None: "—"}
+
+def _ingest(user, uploads):
+    done = st.session_state.setdefault("lab_ingested", set())
+    pipeline = get_lab_pipeline()
+    for upl in uploads:
+        if upl.file_id in done: continue
+        upl.seek(0)
+        sha, size, stored = labs.store_blob(upl)
+        labs.add_document(user, sha, upl.name, size)
+        pipeline.submit(sha)
+        done.add(upl.file_id)
+        if not stored: st.toast(f"{upl.name} was already on file; reusing its results.")
+
+def _document(doc):
+    _, name, size, uploaded, status, pages, n_values, error, sha = doc
+    with st.expander(f"{name} · {STATUS.get(status, status)}", expanded=status == "done"):
+        st.caption(f"Uploaded {uploaded} · {size / 1024:.0f} KB" + (f" · {pages} pages · {n_values} values" if status == "done" else ""))
+        if status == "failed":
+            st.error(error or "Extraction failed.")
+            if st.button("Retry", key=f"lab_retry_{sha}"):
+                get_lab_pipeline().submit(sha, retry=True)
+                st.rerun()
+        elif status == "done":
+            rows = labs.values(sha)
+            if not rows:
+                st.info("No lab values recognised in this document.")
+                return
+            df = pd.DataFrame(rows, columns=["Page", "Test", "Value", "Unit", "Ref Low", "Ref High", "Flag"])
+            st.dataframe(df.style.apply(lambda r: ["color:#dc2626;font-weight:600" if r["Flag"] else ""] * len(r), axis=1),
+                         hide_index=True, use_container_width=True)
+
+def _status(user):
+    docs = labs.documents(user)
+    if not docs:
+        st.caption("No documents uploaded yet.")
+        return
+    if st.session_state.get("lab_polling") and not any(d[4] in labs.PENDING for d in docs):
+        # Everything finished: one full rerun turns polling off.
+        st.session_state.lab_polling = False
+        st.rerun()
+    for doc in docs: _document(doc)
+
+def f10_lab_results():
+    st.title("Laboratory Results")
+    st.info("Secure document upload for assay results.")
+    user = st.session_state['username']
+    uploads = st.file_uploader("Upload PDF Document", type=["pdf"], accept_multiple_files=True)
+    if uploads: _ingest(user, uploads)
+    
+    pending = any(d[4] in labs.PENDING for d in labs.documents(user))
+    st.session_state.lab_polling = pending
+    st.subheader("Documents")
+    st.fragment(_status, run_every=POLL if pending else None)(user)
+    
+    tests = labs.tests(user)
+    if tests:
+        st.subheader("Trends")
+        counts = dict(tests)
+        test = st.selectbox("Test", list(counts), format_func=lambda t: f"{t} ({counts[t]})")
+        trend = pd.DataFrame(labs.trend(user, test), columns=["Uploaded", "Value", "Unit", "Flag"])
+        if len(trend) > 1: st.line_chart(trend.set_index(pd.to_datetime(trend["Uploaded"]))[["Value"]])
+        else: st.caption(f"One result so far: {trend['Value'].iloc[0]:g} {trend['Unit'].iloc[0] or ''}")
@@ -0,0 +1,48 @@
+import streamlit as st
+import datetime
+import reminders
+from services import get_reminder_engine
+
+def _add_form(user):
+    with st.form("med_add", clear_on_submit=True):
+        c1, c2 = st.columns(2)
+        name = c1.text_input("Medication or supplement")
+        dose = c2.text_input("Dose", placeholder="e.g. 500mg")
+        times = st.text_input("Dose times", "08:00", help="24-hour HH:MM, comma separated, e.g. 08:00, 20:00")
+        c3, c4 = st.columns(2)
+        start = c3.date_input("Start", datetime.date.today())
+        end = c4.date_input("End (optional)", None)
+        if not st.form_submit_button("Add to Schedule"): return
+    if not name.strip():
+        st.error("Enter a medication name.")
+        return
+    try: med_id, due = reminders.add_medication(user, name.strip(), dose.strip(), times, start.isoformat(),
+                                                 end.isoformat() if end else None)
+    except ValueError as e:
+        st.error(f"Invalid dose times: {e}")
+        return
+    get_reminder_engine().notify(reminders.MED, med_id, due)
+    st.success(f"{name} added." + (f" Next dose {datetime.datetime.fromtimestamp(due):%a %H:%M}." if due else ""))
+
+def f9_medication():
+    st.title("Pharmacology Tracker")
+    st.write("Active prescriptions and supplements.")
+    user = st.session_state['username']
+    with st.expander("Add medication"): _add_form(user)
+    
+    st.subheader("Today")
+    doses = reminders.doses_on(user, datetime.date.today())
+    if not doses: st.caption("No doses scheduled today.")
+    for med_id, name, dose, due, taken in doses:
+        label = f"{name} {dose} - {datetime.datetime.fromtimestamp(due):%I:%M %p}"
+        checked = st.checkbox(label, value=taken is not None, key=f"dose_{med_id}_{due}")
+        if checked != (taken is not None): reminders.mark_dose(med_id, due, checked)
+    
+    st.subheader("Schedule")
+    for med_id, name, dose, times, start, end, next_due in reminders.medications(user):
+        c1, c2 = st.columns([5, 1])
+        nxt = f"next {datetime.datetime.fromtimestamp(next_due):%a %d %b %H:%M}" if next_due else "course finished"
+        c1.markdown(f"**{name}** {dose} · {times.replace(',', ', ')} · from {start}" + (f" to {end}" if end else "") + f" · {nxt}")
+        if c2.button("Remove", key=f"med_del_{med_id}"):
+            reminders.delete_medication(user, med_id)
+            st.rerun()
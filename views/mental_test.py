@@ -0,0 +1,33 @@
+import streamlit as st
+from db import save_mental_test
+
+def f5_mental_test():
+    st.title("Psychological Screening (PHQ-2)")
+    st.write("Preliminary screening for depression indicators.")
+    st.caption("Note: This does not replace formal psychiatric evaluation.")
+    
+    with st.form("mental_test"):
+        opts = ["Not at all", "Several days", "More than half the days", "Nearly every day"]
+        q1 = st.selectbox("1. Over the last 2 weeks, how often have you been bothered by feeling down, depressed, or hopeless?", opts)
+        q2 = st.selectbox("2. How often have you had little interest or pleasure in doing things?", opts)
+        q3 = st.selectbox("3. Have you felt excessively tired or lacked energy?", opts)
+        
+        if st.form_submit_button("Process Evaluation"):
+            mapping = {"Not at all":0, "Several days":1, "More than half the days":2, "Nearly every day":3}
+            score = mapping[q1] + mapping[q2] + mapping[q3]
+            
+            st.divider()
+            st.metric("Evaluation Score", f"{score}/9")
+            
+            kategori = ""
+            if score <= 2:
+                kategori = "Nominal"
+                st.success(f"Result: {kategori}. No significant indicators detected.")
+            elif score <= 5:
+                kategori = "Mild Indicators"
+                st.warning(f"Result: {kategori}. Monitor symptoms and consider stress management.")
+            else:
+                kategori = "Elevated Indicators"
+                st.error(f"Result: {kategori}. Clinical consultation recommended.")
+            
+            save_mental_test(st.session_state['username'], score, kategori)
@@ -0,0 +1,71 @@
+import streamlit as st
+import time
+import bootstrap
+import db
+import retention
+import telemetry
+from services import get_response_cache, get_scheduler
+
+GROUPS = [("Pages", "page."), ("Database", "db."), ("AI Engine", "ai."), ("Auth", "auth.")]
+
+
+def _table(hists, prefix):
+    rows = {n: h for n, h in hists.items() if n.startswith(prefix) and h["count"]}
+    if not rows:
+        st.info("No samples recorded yet.")
+        return
+    st.dataframe({
+        "Metric": [n[len(prefix):] for n in rows],
+        "Calls": [h["count"] for h in rows.values()],
+        "Mean (ms)": [round(h["mean"], 2) for h in rows.values()],
+        "p50 (ms)": [round(h["p50"], 2) for h in rows.values()],
+        "p95 (ms)": [round(h["p95"], 2) for h in rows.values()],
+        "p99 (ms)": [round(h["p99"], 2) for h in rows.values()],
+        "Max (ms)": [round(h["max"], 2) for h in rows.values()],
+    }, use_container_width=True, hide_index=True)
+
+def _storage():
+    st.caption(f"Consultations older than {retention.RETENTION_DAYS} days are compressed into the archive "
+               f"every {retention.RUN_EVERY / 3600:g} h; freed pages are returned with incremental vacuum.")
+    c1, c2 = st.columns(2)
+    with c1:
+        if st.button("Run Retention Now"):
+            with st.spinner("Archiving..."): stats = retention.run(pause=0)
+            if stats is None: st.info("A retention pass is already running.")
+            else: st.success(f"Archived {stats['archived']} consultations, reclaimed {stats['bytes_reclaimed'] / 2 ** 20:.1f} MB.")
+    with c2: show = st.button("Compute Space Report")
+    # The report scans both consultation tables, so it only runs on request.
+    if show: st.json(retention.report())
+    elif retention.LAST_RUN: st.json({"last_run": retention.LAST_RUN})
+
+def f17_metrics():
+    st.title("System Metrics")
+    st.caption("Process-local latency histograms since the server started. Admin only.")
+    snap = telemetry.snapshot()
+    hists = snap["histograms"]
+    
+    rep = bootstrap.REPORT
+    sched = get_scheduler().snapshot()
+    m1, m2, m3, m4, m5 = st.columns(5)
+    with m1: st.metric("Uptime", f"{(time.time() - rep['process_start']) / 60:.0f} min")
+    with m2: st.metric("Reruns", rep["reruns"], f"{rep['rerun_ms'] or 0:.1f} ms overhead", delta_color="off")
+    with m3: st.metric("Answer Cache Hit Rate", f"{get_response_cache().stats()['hit_rate']:.0%}")
+    with m4: st.metric("Queued Writes", db.get_writer().pending() if db.WRITE_BEHIND else 0)
+    with m5: st.metric("AI Queue", sched["queued"], f"{sched['busy']}/{sched['workers']} workers busy", delta_color="off")
+    
+    tabs = st.tabs([g for g, _ in GROUPS] + ["Storage", "Startup & Counters"])
+    for tab, (_, prefix) in zip(tabs, GROUPS):
+        with tab: _table(hists, prefix)
+    with tabs[-2]: _storage()
+    with tabs[-1]:
+        st.write("**Bootstrap steps (cold start)**")
+        st.table({"Step": list(rep["steps"]), "ms": [f"{v:.1f}" for v in rep["steps"].values()]})
+        st.write("**Counters**")
+        backend = db.get_backend()
+        st.json({**snap["counters"], **snap["gauges"], "answer_cache": get_response_cache().stats(), "ai_scheduler": sched,
+                 "storage": {"backend": backend.kind, "shards": len(backend.shards())},
+                 "write_behind": db.get_writer().stats if db.WRITE_BEHIND else {}})
+    
+    if st.button("Reset Histograms"):
+        telemetry.reset()
+        st.rerun()
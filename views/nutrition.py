@@ -0,0 +1,27 @@
+import streamlit as st
+import timeseries
+from views.components import csv_import
+
+DAYS = 14
+MACROS = {"protein_g": "Protein (g)", "carbs_g": "Carbs (g)", "fat_g": "Fat (g)"}
+
+def f13_nutrition():
+    st.title("Nutritional Intake")
+    st.write("Caloric tracking module.")
+    with st.expander("Import food log"):
+        csv_import("nutrition_csv", "Food log export (CSV)",
+                   help="A timestamp column plus calories / protein_g / carbs_g / fat_g columns, "
+                        "or long format with timestamp, metric, value.")
+    df = timeseries.daily_totals(st.session_state['username'], ["calories", *MACROS], DAYS)
+    if not df.to_numpy().any():
+        st.info("No meals logged yet. Import a CSV export from your food diary.")
+        return
+    
+    logged = df[df["calories"] > 0]
+    m1, m2 = st.columns(2)
+    with m1: st.metric("Today (kcal)", f"{df['calories'].iloc[-1]:,.0f}")
+    with m2: st.metric(f"Average per Logged Day ({DAYS}d)", f"{logged['calories'].mean():,.0f}" if len(logged) else "—")
+    st.subheader(f"Caloric Intake ({DAYS} Days)")
+    st.bar_chart(df[["calories"]].rename(columns={"calories": "Calories (kcal)"}))
+    st.subheader("Macronutrients")
+    st.bar_chart(df[list(MACROS)].rename(columns=MACROS))
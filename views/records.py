@@ -0,0 +1,88 @@
+import streamlit as st
+import os
+import tempfile
+import export
+import search
+from db import get_history_chat_page, get_history_mental_page
+from services import get_search
+from views.components import page_nav
+
+def _search_results(user, query):
+    if st.session_state.get("rec_search_last") != query:
+        st.session_state.rec_search_last, st.session_state.rec_search_page = query, 0
+    page = st.session_state.rec_search_page
+    rows, total = search.search_consultations(user, query, page)
+    if not rows:
+        st.info("No consultations match your search.")
+        return
+    pages = (total + search.SEARCH_PAGE - 1) // search.SEARCH_PAGE
+    st.caption(f"{total} matching consultations, ranked by relevance")
+    for r in rows:
+        with st.container(border=True):
+            st.markdown(f"**{search.render_highlight(r[2])}**", unsafe_allow_html=True)
+            st.markdown(f"<span style='color:#64748b;'>{r[1]}</span> · {search.render_highlight(r[3])}", unsafe_allow_html=True)
+    c_a, c_b, c_c = st.columns([1, 1, 3])
+    if page > 0 and c_a.button("Previous", key="rec_search_prev", use_container_width=True):
+        st.session_state.rec_search_page -= 1
+        st.rerun()
+    if page + 1 < pages and c_b.button("Next", key="rec_search_next", use_container_width=True):
+        st.session_state.rec_search_page += 1
+        st.rerun()
+    c_c.caption(f"Page {page + 1} of {pages}")
+
+def _export_panel(user):
+    st.write("Download a complete copy of your records. Files are streamed from the database in chunks.")
+    c_a, c_b = st.columns(2)
+    dataset = c_a.selectbox("Dataset", ["consultations", "mental_logs"],
+                            format_func=lambda d: {"consultations": "Diagnostic Queries", "mental_logs": "Psychological Logs"}[d])
+    fmt = c_b.selectbox("Format", list(export.FORMATS), format_func=str.upper)
+    if st.button("Prepare Export"):
+        bar = st.progress(0, "Exporting...")
+        fd, path = tempfile.mkstemp(suffix=f".{fmt}")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                stats = export.export(dataset, out, fmt, user,
+                                      progress=lambda done, total: bar.progress(min(1.0, done / total) if total else 1.0, f"{done}/{total} rows"))
+            bar.progress(1.0, f"{stats['rows']} rows · {stats['bytes'] / 1024:.0f} KB · {stats['rows_per_s']:.0f} rows/s")
+            # st.download_button buffers the payload, so only per-user exports are offered
+            # here; full-system dumps go through `python export.py`.
+            with open(path, "rb") as f:
+                st.download_button("Download", f, file_name=f"{user}_{dataset}.{fmt}", mime=export.FORMATS[fmt])
+        except RuntimeError as e: st.error(str(e))
+        finally: os.remove(path)
+
+def f7_medical_records():
+    st.title("Patient Records")
+    user = st.session_state['username']
+    for key in ("rec_chat_cursor", "rec_mental_cursor"):
+        if key not in st.session_state: st.session_state[key] = [None]
+    
+    tab_chat, tab_mental, tab_export = st.tabs(["Diagnostic Queries", "Psychological Logs", "Export"])
+    
+    with tab_chat:
+        query = st.text_input("Search consultations", key="rec_search", placeholder="e.g. headache fever").strip() if get_search() else ""
+        if query: _search_results(user, query)
+        else:
+            hist, nxt = get_history_chat_page(user, st.session_state.rec_chat_cursor[-1])
+            if hist:
+                for h in hist:
+                    with st.expander(f"Query Log: {h[1]}"):
+                        st.write(f"**Input:** {h[2]}")
+                        st.write(f"**Output:** {h[3]}")
+                page_nav("rec_chat_cursor", nxt)
+            else: st.info("No records found in database.")
+
+    with tab_mental:
+        hist_m, nxt_m = get_history_mental_page(user, st.session_state.rec_mental_cursor[-1])
+        if hist_m:
+            for m in hist_m:
+                with st.container(border=True):
+                    c_a, c_b = st.columns([1, 4])
+                    with c_a: st.metric("Score", f"{m[2]}")
+                    with c_b:
+                        st.write(f"**Timestamp:** {m[1]}")
+                        st.write(f"**Clinical Status:** {m[3]}")
+            page_nav("rec_mental_cursor", nxt_m)
+        else: st.info("No records found in database.")
+
+    with tab_export: _export_panel(user)
@@ -0,0 +1,7 @@
+import streamlit as st
+
+def f16_settings():
+    st.title("System Preferences")
+    st.text_input("Registered Email Address")
+    st.toggle("Enable System Notifications", value=True)
+    st.button("Update Configuration")
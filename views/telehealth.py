@@ -0,0 +1,6 @@
+import streamlit as st
+
+def f11_telehealth():
+    st.title("Telehealth Interface")
+    st.markdown("<div class='clinical-note'>System ready for secure video transmission. Waiting for practitioner connection.</div>", unsafe_allow_html=True)
+    st.button("Terminate Connection")
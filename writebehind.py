@@ -0,0 +1,159 @@
+import atexit
+import json
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+
+import telemetry
+
+# --- WRITE-BEHIND QUEUE (batched background inserts) ---
+MAX_QUEUE = 10000
+BATCH_SIZE = 500
+LINGER = 0.02
+PUT_TIMEOUT = 2.0
+SYNC_TIMEOUT = 5.0
+# A batch that keeps hitting a locked file backs off for up to RETRY_FOR seconds before it is dead-lettered.
+RETRY_FOR = 60.0
+RETRY_BASE = 0.1
+RETRY_MAX = 5.0
+
+_STOP = object()
+log = logging.getLogger(__name__)
+
+
+def _is_busy(exc):
+    msg = str(exc).lower()
+    return "locked" in msg or "busy" in msg
+
+
+class WriteBehind:
+    """Bounded queue of INSERTs drained by one worker into batched transactions.
+
+    Items carry the username they belong to, so readers can wait for just
+    their own pending writes (read-your-writes) instead of the whole queue.
+    pool_for(username) picks the storage shard; each shard in a batch gets
+    its own transaction. Rows that cannot be written are kept in the shard's
+    write_failures table (or, failing that, logged in full) rather than lost.
+    """
+
+    def __init__(self, pool_for, maxsize=MAX_QUEUE, batch_size=BATCH_SIZE, linger=LINGER):
+        self.pool_for = pool_for
+        self.batch_size = batch_size
+        self.linger = linger
+        self._q = queue.Queue(maxsize)
+        self._pending = defaultdict(int)
+        self._cond = threading.Condition()
+        self.stats = {"enqueued": 0, "written": 0, "batches": 0, "inline": 0, "failed": 0,
+                      "retries": 0, "dead_lettered": 0, "max_depth": 0, "last_error": None}
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, username, sql, params):
+        with self._cond: self._pending[username] += 1
+        try:
+            self._q.put((username, sql, params), timeout=PUT_TIMEOUT)
+        except queue.Full:
+            # Backpressure gave up: write inline on the caller rather than drop it.
+            self._apply([(username, sql, params)])
+            with self._cond: self.stats["inline"] += 1
+            return
+        with self._cond:
+            self.stats["enqueued"] += 1
+            self.stats["max_depth"] = max(self.stats["max_depth"], self._q.qsize())
+
+    def pending(self, username=None):
+        with self._cond:
+            return self._pending.get(username, 0) if username is not None else sum(self._pending.values())
+
+    def sync(self, username, timeout=SYNC_TIMEOUT):
+        """Block until every write queued for username is committed."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending.get(username), timeout)
+
+    def flush(self, timeout=SYNC_TIMEOUT):
+        with self._cond:
+            return self._cond.wait_for(lambda: not any(self._pending.values()), timeout)
+
+    def close(self):
+        if not self._thread.is_alive(): return
+        self._q.put(_STOP)
+        self._thread.join()
+
+    def _write(self, items):
+        """Commit items in one transaction, backing off while the file stays locked; returns the error or None."""
+        delay, deadline = RETRY_BASE, time.monotonic() + RETRY_FOR
+        while True:
+            try:
+                with self.pool_for(items[0][0]).write() as c:
+                    for _, sql, params in items: c.execute(sql, params)
+                return None
+            except Exception as e:
+                self.stats["last_error"] = repr(e)
+                if not _is_busy(e) or time.monotonic() + delay > deadline: return e
+                self.stats["retries"] += 1
+                time.sleep(delay)
+                delay = min(delay * 2, RETRY_MAX)
+
+    def _apply(self, items):
+        err = self._write(items)
+        ok = 0 if err else len(items)
+        if err and len(items) > 1 and not _is_busy(err):
+            # Isolate the bad row(s) so one failure doesn't lose the batch.
+            for item in items:
+                e = self._write([item])
+                if e: self._dead_letter([item], e)
+                else: ok += 1
+        elif err: self._dead_letter(items, err)
+        self.stats["failed"] += len(items) - ok
+        self.stats["written"] += ok
+        self.stats["batches"] += 1
+        with self._cond:
+            for username, _, _ in items:
+                self._pending[username] -= 1
+                if self._pending[username] <= 0: del self._pending[username]
+            self._cond.notify_all()
+
+    def _dead_letter(self, items, error):
+        telemetry.incr("writebehind.failed", len(items))
+        rows = [(u, sql, json.dumps(list(params), default=str), repr(error), time.time()) for u, sql, params in items]
+        log.error("write-behind could not write %d row(s): %r", len(items), error)
+        try:
+            with self.pool_for(items[0][0]).write() as c:
+                c.execute('''CREATE TABLE IF NOT EXISTS write_failures
+                             (id INTEGER PRIMARY KEY, username TEXT, sql TEXT, params TEXT, error TEXT, failed_at REAL)''')
+                c.executemany('INSERT INTO write_failures(username, sql, params, error, failed_at) VALUES (?,?,?,?,?)', rows)
+            self.stats["dead_lettered"] += len(items)
+        except Exception as e:
+            # Last resort: the log line is then the only copy of the rows.
+            telemetry.incr("writebehind.lost", len(items))
+            log.error("write-behind dead letter failed (%r); rows: %s", e, json.dumps(rows))
+
+    def _run(self):
+        while True:
+            item = self._q.get()
+            stop = item is _STOP
+            batch = [] if stop else [item]
+            deadline = time.monotonic() + self.linger
+            while not stop and len(batch) < self.batch_size:
+                try: item = self._q.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty: break
+                if item is _STOP: stop = True
+                else: batch.append(item)
+            if stop:
+                # Drain whatever is still queued before exiting.
+                while True:
+                    try: item = self._q.get_nowait()
+                    except queue.Empty: break
+                    if item is not _STOP: batch.append(item)
+            for group in self._by_pool(batch):
+                for i in range(0, len(group), self.batch_size):
+                    self._apply(group[i:i + self.batch_size])
+            if stop: return
+
+    def _by_pool(self, batch):
+        groups = {}
+        for item in batch: groups.setdefault(id(self.pool_for(item[0])), []).append(item)
+        return groups.values()